@@ -1,17 +1,36 @@
-from flask import Flask, request, jsonify
+import time
+STARTED = time.perf_counter()
+
+from flask import Flask, request, jsonify, Response, stream_with_context
+import os
+import json
+import gc
+import hmac
+import math
+import uuid
+from contextlib import ExitStack
 from datetime import datetime
 from services.chat_service import ChatService
-from services.data_service import DataService
-from services.langgraph_service import chatbot
-from langchain_community.chat_message_histories import ChatMessageHistory
-from collections import defaultdict
+from services.change_feed import ChangeFeed
+from services.chat_stack import LazyChatStack
+from services.data_service import DataService, PLACE_CATEGORIES, SEARCH_CATEGORIES, standings_payload
+from services.dataset import DataValidationError
+from services.data_watcher import DataWatcher
+from services.response_cache import ResponseCache
+from services import fast_json
+from services.concurrency import ConcurrencyLimiter, QueueFullError
+from services.answer_cache import AnswerCache
+from services.metrics import metrics, request_id
 from flask_cors import CORS
-from langchain_core.tools import tool
 
+# LangChain, LangGraph and OpenAI are only imported by the chat stack, on the first
+# chat request; with DALIL_SERVE=data the chat endpoints are not served at all
+SERVE_CHAT = os.environ.get("DALIL_SERVE", "all") != "data"
+startup_seconds = {"imports": time.perf_counter() - STARTED}
 
 app = Flask(__name__)
+app.json = fast_json.FastJSONProvider(app)
 CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
-user_histories = defaultdict(lambda: ChatMessageHistory())
 
 SIMULATED_DATE = "2034-06-13"
 
@@ -47,53 +66,120 @@ If a user asks for restaurants use the tool 'get_restaurants_by_city' to provide
 If a user asks for attractions use the tool 'get_attractions_by_city' to provide recommendations based on the city they are in.
 If a user asks for what to do or for an itinerary make sure to call both tools 'get_restaurants_by_city' and 'get_attractions_by_city' and provide a combined response.
 If a user asks for information about the games use the tool 'get_games_within_this_week' to provide information about the games.
+If a user asks for places near their hotel, a stadium or an attraction use the tool 'get_places_near' with that place's name.
+If a user asks how a team is doing, about group tables or who is still in the tournament use the tool 'get_team_standing'.
+If a user asks how far a place is, how long it takes to get somewhere or how to get to their next game use the tool 'get_travel_time'.
+If a user asks for something specific (a dish, a cuisine, an amenity, a landmark or a place by name) use the tool 'search_places' with those keywords.
 
 DO NOT RECOMMEND RESTAURANTS OR ATTRACTIONS OUTSIDE OF THE RESULTS FETCHED FROM THE TOOLS.
 """
 
-data_service = DataService(SIMULATED_DATE)
+data_started = time.perf_counter()
+data_service = DataService(
+    SIMULATED_DATE,
+    data_dir=os.environ.get("DALIL_DATA_DIR"),
+    compact=os.environ.get("DALIL_COMPACT_RECORDS", "0") == "1",
+    snapshot=os.environ.get("DALIL_DATA_SNAPSHOT") or None
+)
 chat_service = ChatService(data_service)
-
-@tool
-def get_restaurants_by_city(city: str) -> list[dict]:
-    """Get restaurants by city
-
-    Args:
-        city (str): The city name, one of ["Abha", "Al Baha", "Al Hofuf", "Al-Ula", "Asir", "Dammam", "Hafar Al-Batin", "Hail", "Jeddah", "Khobar", "Makkah", "Medina", "NEOM", "Najran", "Riyadh", "Tabuk", "Taif"]
-
-    Returns:
-        list[dict]: List of restaurants in the specified city
-    """
-    return chat_service._get_restaurants_by_city(city)
-
-@tool
-def get_attractions_by_city(city: str) -> list[dict]:
-    """Get attractions by city
-    
-    Args:
-        city (str): The city name, one of ["Abha", "Al Baha", "Al Hofuf", "Al Khobar", "Al-Ula", "Asir", "Dammam", "Hafar Al-Batin", "Hail", "Jeddah", "Makkah", "Medina", "NEOM", "Najran", "Riyadh", "Tabuk", "Taif"]
-    
-    Returns:
-        list[dict]: List of attractions in the specified city
+startup_seconds["data"] = time.perf_counter() - data_started
+chat_stack = LazyChatStack(chat_service)
+if SERVE_CHAT and os.environ.get("DALIL_CHAT_PRELOAD", "0") == "1":
+    chat_stack.get()
+if data_service.snapshot:
+    # Keep the collector off the objects built at import, so workers forked from a
+    # preloading master (gunicorn --preload) do not copy their pages on every collection
+    gc.freeze()
+if os.environ.get("DALIL_DATA_WATCH", "0") == "1":
+    DataWatcher(data_service, interval=float(os.environ.get("DALIL_DATA_WATCH_INTERVAL", 2))).start()
+
+chat_limiter = ConcurrencyLimiter(
+    max_concurrent=int(os.environ.get("DALIL_LLM_CONCURRENCY", 32)),
+    max_queue=int(os.environ.get("DALIL_LLM_QUEUE", 128)),
+    queue_timeout=float(os.environ.get("DALIL_LLM_QUEUE_TIMEOUT", 30))
+)
+answer_cache = None
+if os.environ.get("DALIL_ANSWER_CACHE", "1") != "0":
+    answer_cache = AnswerCache(
+        ttl_seconds=float(os.environ.get("DALIL_ANSWER_CACHE_TTL", 600)),
+        similarity=float(os.environ.get("DALIL_ANSWER_CACHE_SIMILARITY", 0.8))
+    )
+    data_service.subscribe(lambda event, **details: answer_cache.invalidate())
+change_feed = ChangeFeed(data_service, max_events=int(os.environ.get("DALIL_CHANGE_FEED_EVENTS", 1000)))
+CHANGE_FEED_KEEPALIVE = float(os.environ.get("DALIL_CHANGE_FEED_KEEPALIVE", 15))
+response_cache = ResponseCache(
+    lambda data: fast_json.dumps(data) + b"\n",
+    gzip_min_size=None if os.environ.get("DALIL_GZIP_RESPONSES", "1") == "0" else 1024
+)
+
+metrics.gauge("dalil_startup_seconds", "Seconds spent starting this worker by phase (chat_stack: first chat request)",
+              lambda: {**startup_seconds, "chat_stack": chat_stack.load_seconds}, label="phase")
+metrics.gauge("dalil_change_feed_subscribers", "Clients streaming /api/changes", lambda: change_feed.subscribers)
+metrics.gauge("dalil_data_version", "Version of the loaded data", lambda: data_service.data_version)
+metrics.gauge("dalil_llm_slots", "Upstream LLM slots by state",
+              lambda: {"active": chat_limiter.active, "waiting": chat_limiter.waiting}, label="state")
+metrics.gauge("dalil_llm_rejected", "Chat requests rejected for lack of an LLM slot", lambda: chat_limiter.rejected)
+metrics.gauge("dalil_cache_hits", "Cache hits by cache", lambda: {
+    "response": response_cache.hits, "fan_context": chat_service.fan_context_hits,
+    "answer": answer_cache.hits if answer_cache else 0}, label="cache")
+metrics.gauge("dalil_cache_misses", "Cache misses by cache", lambda: {
+    "response": response_cache.misses, "fan_context": chat_service.fan_context_misses,
+    "answer": answer_cache.misses if answer_cache else 0}, label="cache")
+
+@app.before_request
+def _start_request_timer():
+    if metrics.enabled:
+        request.environ["dalil.started"] = time.perf_counter()
+        request.environ["dalil.request_id"] = request_id.set(request.headers.get("X-Request-ID") or uuid.uuid4().hex)
+
+@app.after_request
+def _record_request(response):
+    started = request.environ.get("dalil.started")
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe("dalil_http_request_duration_seconds", time.perf_counter() - started,
+                        route=route, method=request.method)
+        metrics.inc("dalil_http_requests_total", route=route, method=request.method, status=response.status_code)
+        response.headers["X-Request-ID"] = request_id.get()
+    return response
+
+@app.teardown_request
+def _clear_request_id(exc):
+    token = request.environ.pop("dalil.request_id", None)
+    if token is not None:
+        request_id.reset(token)
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics"""
+    if not metrics.enabled:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+def _cached_json(name, producer, per_date=False):
+    """Serve a read-only JSON body from the response cache, honoring If-None-Match and gzip.
+
+    The producer gets the (dataset, simulated_date, games) state the cache key was
+    built from, so a date change or reload in between cannot mix them up.
     """
-    return chat_service._get_attractions_by_city(city)
-
-@tool
-def get_games_within_this_week(simulated_date: str) -> list[dict]:
-    """Get all games within the current weeks from the simulated date
-    
-    Args:
-        simulated_date (str): The simulated date in YYYY-MM-DD format
-    
-    Returns:
-        list[dict]: List of games within the current week
-    """
-    return chat_service._get_games_within_this_week(simulated_date)
+    state = data_service.state
+    dataset, simulated_date, _ = state
+    key = (name, dataset.version, simulated_date if per_date else None)
+    cached = response_cache.get(key, lambda: producer(state))
+
+    use_gzip = cached.gzipped is not None and 'gzip' in request.accept_encodings
+    response = Response(cached.gzipped if use_gzip else cached.body, mimetype='application/json')
+    response.set_etag(cached.etag + ('-gzip' if use_gzip else ''))
+    if cached.gzipped is not None:
+        response.headers['Vary'] = 'Accept-Encoding'
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response.make_conditional(request)
 
 @app.route('/api/games', methods=['GET'])
 def get_games():
     """Get all games, processed based on the current simulated date"""
-    return jsonify(data_service.games)
+    return _cached_json('games', lambda state: state[2], per_date=True)
 
 @app.route('/api/game/<int:game_id>', methods=['GET'])
 def get_game(game_id):
@@ -104,18 +190,96 @@ def get_game(game_id):
     
     return jsonify(game)
 
+BATCH_MAX_LIMIT = 500
+TRAVEL_MAX_LIMIT = 100
+
+def _batch_args():
+    """Read batch parameters from a JSON body (POST) or the query string (GET, lists comma-separated).
+
+    Raises TypeError or ValueError for a body that is not an object or parameters of the wrong type.
+    """
+    if request.method == 'POST':
+        args = request.get_json(silent=True) or {}
+        if not isinstance(args, dict):
+            raise TypeError("the body must be a JSON object")
+    else:
+        args = request.args.to_dict()
+    for name in ('ids', 'fields'):
+        if isinstance(args.get(name), str):
+            args[name] = [v for v in args[name].split(',') if v]
+        elif args.get(name) is not None and not isinstance(args[name], list):
+            raise TypeError(f"{name} must be a list")
+    ids = args.get('ids')
+    if ids is not None:
+        ids = [int(i) for i in ids]
+    fields = args.get('fields')
+    if fields is not None and not all(isinstance(f, str) for f in fields):
+        raise TypeError("fields must be field names")
+    for name in ('team', 'city', 'stage', 'date_from', 'date_to'):
+        if args.get(name) is not None and not isinstance(args[name], str):
+            raise TypeError(f"{name} must be a string")
+    limit = min(max(int(args.get('limit', 50)), 1), BATCH_MAX_LIMIT)
+    offset = max(int(args.get('offset', 0)), 0)
+    return args, ids, fields, limit, offset
+
+def _batch_page(records, ids, fields, limit, offset, get_by_id):
+    """One page of projected records with the total count and the requested ids that do not exist"""
+    page = records[offset:offset + limit]
+    if fields:
+        keep = set(fields) | {'id'}
+        page = [{k: v for k, v in record.items() if k in keep} for record in page]
+    body = {
+        "items": page,
+        "total": len(records),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < len(records) else None,
+    }
+    if ids is not None:
+        body["missing"] = [i for i in ids if get_by_id(i) is None]
+    return jsonify(body)
+
+@app.route('/api/games/batch', methods=['GET', 'POST'])
+def get_games_batch():
+    """Get many games at once by ids and/or filters (date_from, date_to, team, stage, city), paginated and projected"""
+    try:
+        args, ids, fields, limit, offset = _batch_args()
+        for date in (args.get('date_from'), args.get('date_to')):
+            if date:
+                datetime.strptime(date, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return jsonify({"error": "Expected a JSON object with ids (integers), fields (names), integer limit "
+                                 "and offset, and dates YYYY-MM-DD"}), 400
+
+    games = data_service.query_games(ids, args.get('date_from'), args.get('date_to'),
+                                     args.get('team'), args.get('stage'), args.get('city'))
+    return _batch_page(games, ids, fields, limit, offset, data_service.get_game_by_id)
+
+@app.route('/api/fans/batch', methods=['GET', 'POST'])
+def get_fans_batch():
+    """Get many fans at once by ids and/or filters (team, city, game_id), paginated and projected"""
+    try:
+        args, ids, fields, limit, offset = _batch_args()
+        game_id = int(args['game_id']) if args.get('game_id') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "Expected a JSON object with ids (integers), fields (names), and integer "
+                                 "game_id, limit and offset"}), 400
+    if ids is None and not (args.get('team') or args.get('city') or game_id is not None):
+        return jsonify({"error": "Provide ids or at least one of team, city, game_id"}), 400
+
+    fans = data_service.query_fans(ids, args.get('team'), args.get('city'), game_id)
+    return _batch_page(fans, ids, fields, limit, offset, data_service.get_fan_by_id)
+
 @app.route('/api/stadiums', methods=['GET'])
 def get_stadiums():
     """Get all stadiums"""
-    stadiums = data_service.stadiums
-    return jsonify(stadiums)
+    return _cached_json('stadiums', lambda state: state[0].stadiums)
 
 
 @app.route('/api/fans', methods=['GET'])
 def get_fans():
     """Get all fans"""
-    fans = data_service.fans
-    return jsonify(fans)
+    return _cached_json('fans', lambda state: state[0].fans)
 
 @app.route('/api/fans/<int:fan_id>', methods=['GET'])
 def get_fan(fan_id):
@@ -128,8 +292,7 @@ def get_fan(fan_id):
 @app.route('/api/hotels', methods=['GET'])
 def get_hotels():
     """Get all hotels"""
-    hotels = data_service.hotels
-    return jsonify(hotels)
+    return _cached_json('hotels', lambda state: state[0].hotels)
 
 @app.route('/api/date', methods=['GET'])
 def get_date():
@@ -151,49 +314,188 @@ def update_date():
             return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
     return jsonify({"error": "Date not provided"}), 400
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
-    data = request.json
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_data():
+    """Reload the data files and swap them in atomically"""
+    token = os.environ.get("DALIL_ADMIN_TOKEN")
+    if not token or not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+        return jsonify({"error": "Forbidden"}), 403
+    try:
+        version = data_service.reload()
+    except DataValidationError as e:
+        return jsonify({"error": "Invalid data, keeping the current version",
+                        "version": data_service.data_version, "details": e.errors}), 422
+    return jsonify({"version": version})
+
+def _chat_route(rule, endpoint=None, **options):
+    """Register a chat endpoint, or on data-only instances (DALIL_SERVE=data) a stub answering 404"""
+    def register(view):
+        app.add_url_rule(rule, endpoint=endpoint or view.__name__,
+                         view_func=view if SERVE_CHAT else _chat_not_served, **options)
+        return view
+    return register
+
+def _chat_not_served(**kwargs):
+    return jsonify({"error": "Chat is not served by this instance"}), 404
+
+def _begin_chat(data):
+    """Validate a chat request and prepare the turn.
+
+    Returns (error, reply, turn): an error response for invalid input or an
+    unknown fan; a reply when the message is answered without the model (the
+    welcome message or a cached answer); otherwise the turn to run, as
+    (user_id, user_turn, messages, config, answer_context).
+    """
     if not data or 'message' not in data or 'user_id' not in data:
-        return jsonify({"error": "Message and user_id are required"}), 400
+        return (jsonify({"error": "Message and user_id are required"}), 400), None, None
 
+    stack = chat_stack.get()
     user_id = data['user_id']
     user_message = data['message']
 
     if user_message == "__welcome_message__":
         welcome_message = "Hello! I'm your World Cup 2034 assistant. How can I help you today?"
-        history = user_histories[user_id]
-        history.add_ai_message(welcome_message)
-        return jsonify({"response": welcome_message})
+        stack.histories.append(user_id, [stack.AIMessage(content=welcome_message)])
+        return None, welcome_message, None
 
     fan = data_service.get_fan_by_id(user_id)
     if not fan:
-        return jsonify({"error": "Fan not found"}), 404
-
-    prompt_inputs = chat_service._prepare_fan_data(fan, SIMULATED_DATE)
-    sys_msg = system_message.format(**prompt_inputs)
-
-    history = user_histories[user_id]
-    history.add_user_message(user_message)
+        return (jsonify({"error": "Fan not found"}), 404), None, None
+
+    user_turn = stack.HumanMessage(content=user_message)
+    answer_context = chat_service._get_answer_context(fan, SIMULATED_DATE)
+    cached_reply = answer_cache.lookup(user_message, answer_context, user_id) if answer_cache else None
+    if cached_reply is not None:
+        stack.histories.append(user_id, [user_turn, stack.AIMessage(content=cached_reply)])
+        return None, cached_reply, None
+
+    config = _chat_config(fan, user_id)
+    with metrics.span("history"):
+        messages = stack.context.build(user_id, stack.histories.get_messages(user_id) + [user_turn])
+    return None, None, (user_id, user_turn, messages, config, answer_context)
+
+def _finish_chat(turn, assistant_reply):
+    """Record a completed turn in the fan's history and the answer cache"""
+    user_id, user_turn, _, _, answer_context = turn
+    stack = chat_stack.get()
+    stack.histories.append(user_id, [user_turn, stack.AIMessage(content=assistant_reply)])
+    if answer_cache:
+        answer_cache.store(user_turn.content, answer_context, assistant_reply, user_id)
+
+def _too_busy(error):
+    return jsonify({"error": str(error)}), 429, {"Retry-After": str(error.retry_after)}
 
-    graph = chatbot(sys_msg, [get_restaurants_by_city, get_attractions_by_city, get_games_within_this_week])
-    messages = history.messages
+def chat():
+    error, reply, turn = _begin_chat(request.json)
+    if error is not None:
+        return error
+    if reply is not None:
+        return jsonify({"response": reply})
+    user_id, user_turn, messages, config, _ = turn
+
+    stack = chat_stack.get()
+    graph = stack.graph()
     
     try:
-        response = graph.invoke(
-            {"messages": messages},
-            config={"configurable": {"thread_id": user_id}}
-        )
-        print(response)
+        with chat_limiter.slot(), metrics.span("graph"):
+            response = graph.invoke(
+                {"messages": messages},
+                config=config
+            )
         assistant_reply = response["messages"][-1].content
-        history.add_ai_message(assistant_reply)
+        _finish_chat(turn, assistant_reply)
 
-        return jsonify({"response": assistant_reply})
+        with metrics.span("serialize"):
+            return jsonify({"response": assistant_reply})
 
+    except QueueFullError as e:
+        return _too_busy(e)
     except Exception as e:
+        stack.histories.append(user_id, [user_turn])
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/chat_history', methods=['GET'])
+_chat_route('/api/chat', methods=['POST'])(chat)
+
+@_chat_route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Stream the assistant reply as Server-Sent Events.
+
+    Emits `token` events as the model generates text, `tool_call` and
+    `tool_result` events while tools run, then a final `done` event with the
+    full reply (or an `error` event).
+    """
+    error, reply, turn = _begin_chat(request.json)
+    if error is not None:
+        return error
+    if reply is not None:
+        return _sse_response([_sse("token", {"content": reply}), _sse("done", {"response": reply})])
+    user_id, user_turn, messages, config, _ = turn
+
+    stack = chat_stack.get()
+    graph = stack.graph()
+
+    # The slot is taken before the stream starts, so a full queue still answers 429,
+    # and is held until the response is closed
+    held = ExitStack()
+    try:
+        held.enter_context(chat_limiter.slot())
+    except QueueFullError as e:
+        return _too_busy(e)
+
+    def generate():
+        assistant_reply = ""
+        try:
+            for mode, chunk in graph.stream(
+                {"messages": messages},
+                config=config,
+                stream_mode=["messages", "updates"]
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if (metadata.get("langgraph_node") == "assistant"
+                            and isinstance(message, stack.AIMessage) and message.content):
+                        yield _sse("token", {"content": message.content})
+                    continue
+
+                for node, update in chunk.items():
+                    for message in (update or {}).get("messages", []):
+                        if node == "tools":
+                            yield _sse("tool_result", {"name": message.name})
+                        elif message.tool_calls:
+                            calls = [{"name": c["name"], "args": c["args"]} for c in message.tool_calls]
+                            yield _sse("tool_call", {"tool_calls": calls})
+                        else:
+                            assistant_reply = message.content
+
+            _finish_chat(turn, assistant_reply)
+            yield _sse("done", {"response": assistant_reply})
+
+        except Exception as e:
+            stack.histories.append(user_id, [user_turn])
+            yield _sse("error", {"error": str(e)})
+
+    response = _sse_response(stream_with_context(generate()))
+    response.call_on_close(held.close)
+    return response
+
+def _chat_config(fan, user_id):
+    """Build the graph run config, including the fan's system prompt"""
+    prompt_inputs = chat_service._prepare_fan_data(fan, SIMULATED_DATE)
+    sys_msg = system_message.format(**prompt_inputs)
+    return chat_stack.get().chatbot_config(sys_msg, user_id, fan_id=fan['id'])
+
+def _sse(event, data, event_id=None):
+    """Format a single Server-Sent Event"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {app.json.dumps(data)}\n\n"
+
+def _sse_response(events):
+    return Response(events, mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+@_chat_route('/api/chat_history', methods=['GET'])
 def get_chat_history():
     """Get the chat history for a specific user"""
     user_id = request.args.get('user_id')
@@ -202,14 +504,14 @@ def get_chat_history():
     
     try:
         user_id = int(user_id)
-        history = user_histories.get(user_id, ChatMessageHistory())
+        messages = chat_stack.get().histories.get_messages(user_id)
         
         formatted_messages = []
         
         welcome_message_count = 0
         welcome_message = "Hello! I'm your World Cup 2034 assistant. How can I help you today?"
         
-        for msg in history.messages:
+        for msg in messages:
             if msg.content == welcome_message and msg.type == 'ai':
                 welcome_message_count += 1
                 if welcome_message_count > 1:
@@ -239,7 +541,7 @@ def get_games_by_date(date):
     games = data_service.get_games_for_date(date)
     return jsonify(games)
 
-@app.route('/api/delete_chat_history', methods=['POST'])
+@_chat_route('/api/delete_chat_history', methods=['POST'])
 def delete_chat_history():
     """Delete the chat history for a specific user"""
     data = request.json
@@ -248,7 +550,8 @@ def delete_chat_history():
     
     try:
         user_id = int(data['user_id'])
-        user_histories[user_id] = ChatMessageHistory()
+        stack = chat_stack.get()
+        stack.histories.clear(user_id)
         return jsonify({"success": True})
     except ValueError:
         return jsonify({"error": "Invalid user_id format"}), 400
@@ -258,12 +561,191 @@ def delete_chat_history():
 @app.route('/api/restaurants', methods=['GET'])
 def get_restaurants():
     """Return all restaurants data"""
-    return jsonify(data_service.get_restaurants())
+    return _cached_json('restaurants', lambda state: state[0].restaurants)
 
 @app.route('/api/attractions', methods=['GET'])
 def get_attractions():
     """Return all attractions data"""
-    return jsonify(data_service.get_attractions())
+    return _cached_json('attractions', lambda state: state[0].attractions)
+
+NEARBY_MAX_LIMIT = 100
+NEARBY_MAX_RADIUS_KM = 2500.0
+
+def _valid_point(lat, lon):
+    return math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180
+
+@app.route('/api/nearby/<category>', methods=['GET'])
+def get_nearby(category):
+    """Get the closest places of a category to a point (lat/lon) or to a place (near=hotels:1)"""
+    if category not in PLACE_CATEGORIES:
+        return jsonify({"error": f"Unknown category. Use one of {list(PLACE_CATEGORIES)}"}), 400
+
+    limit = min(max(request.args.get('limit', 5, type=int), 1), NEARBY_MAX_LIMIT)
+    radius_km = request.args.get('radius_km', type=float)
+    if radius_km is not None:
+        if not math.isfinite(radius_km):
+            return jsonify({"error": "radius_km must be a number of kilometres"}), 400
+        radius_km = min(max(radius_km, 0.0), NEARBY_MAX_RADIUS_KM)
+    near = request.args.get('near')
+
+    if near:
+        near_category, _, near_id = near.partition(':')
+        if near_category not in PLACE_CATEGORIES or not near_id.isdigit():
+            return jsonify({"error": "near must look like <category>:<id>, e.g. hotels:1"}), 400
+        places = data_service.get_places_near_place(category, near_category, int(near_id), limit, radius_km)
+        if places is None:
+            return jsonify({"error": "Place not found"}), 404
+        return jsonify(places)
+
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    if lat is None or lon is None:
+        return jsonify({"error": "lat and lon, or near, are required"}), 400
+    if not _valid_point(lat, lon):
+        return jsonify({"error": "lat must be within -90..90 and lon within -180..180"}), 400
+    return jsonify(data_service.get_nearby_places(category, lat, lon, limit, radius_km))
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Full-text search (q=...) over restaurants, attractions, hotels, stadiums and teams, with optional category= and city="""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    categories = [c for c in request.args.get('category', '').split(',') if c]
+    unknown = [c for c in categories if c not in SEARCH_CATEGORIES]
+    if unknown:
+        return jsonify({"error": f"Unknown category. Use any of {list(SEARCH_CATEGORIES)}"}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    results = data_service.search(query, categories or None, limit, request.args.get('city'))
+    return jsonify({"query": query, "results": results})
+
+@app.route('/api/standings', methods=['GET'])
+def get_standings():
+    """Group tables and the knockout bracket as of date= (default: the simulated date), optionally for one group= or team="""
+    date = request.args.get('date')
+    group = request.args.get('group')
+    team = request.args.get('team')
+    try:
+        if team:
+            standing = data_service.get_team_standing(team, date)
+            if standing is None:
+                return jsonify({"error": "Team not found"}), 404
+            return jsonify(standing)
+        if date is None and group is None:
+            return _cached_json('standings', lambda state: standings_payload(state[0], state[1]), per_date=True)
+        return jsonify(data_service.get_standings(date, group))
+    except ValueError:
+        return jsonify({"error": "date must be YYYY-MM-DD"}), 400
+
+def _place_ref(value):
+    """Parse a <category>:<id> (or bare <category>) place reference into (category, id or None)"""
+    category, _, place_id = (value or '').partition(':')
+    if category not in PLACE_CATEGORIES or (place_id and not place_id.isdigit()):
+        raise ValueError(value)
+    return category, int(place_id) if place_id else None
+
+@app.route('/api/travel', methods=['GET'])
+def get_travel():
+    """Distance and estimated travel time from a place (from=hotels:1) to another (to=stadiums:4) or to a whole category (to=stadiums)"""
+    try:
+        from_category, from_id = _place_ref(request.args.get('from'))
+        to_category, to_id = _place_ref(request.args.get('to'))
+        if from_id is None:
+            raise ValueError('from')
+    except ValueError:
+        return jsonify({"error": "from must look like <category>:<id> and to like <category> or <category>:<id>, "
+                                 f"with a category in {list(PLACE_CATEGORIES)}"}), 400
+    limit = min(max(request.args.get('limit', TRAVEL_MAX_LIMIT, type=int), 1), TRAVEL_MAX_LIMIT)
+    trips = data_service.get_travel(from_category, from_id, to_category, to_id, limit)
+    if trips is None:
+        return jsonify({"error": "Place not found or without coordinates"}), 404
+    return jsonify(trips if to_id is None else trips[0])
+
+@app.route('/api/travel/fans', methods=['GET', 'POST'])
+def get_fan_trips():
+    """For many fans at once (ids and/or team, city, game_id; all fans by default), the trip from their hotel to their next game on date="""
+    try:
+        args, ids, _, limit, offset = _batch_args()
+        game_id = int(args['game_id']) if args.get('game_id') is not None else None
+        if args.get('date'):
+            datetime.strptime(args['date'], "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return jsonify({"error": "ids, game_id, limit and offset must be integers and date YYYY-MM-DD"}), 400
+
+    if ids is None and not (args.get('team') or args.get('city') or game_id is not None):
+        fans = data_service.fans
+    else:
+        fans = data_service.query_fans(ids, args.get('team'), args.get('city'), game_id)
+    page = data_service.get_fan_trips(fans[offset:offset + limit], args.get('date'))
+    return jsonify({
+        "items": page,
+        "total": len(fans),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < len(fans) else None,
+    })
+
+def _feed_event(sequence, name, payload):
+    return {"id": change_feed.event_id(sequence), "event": name, "data": payload}
+
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """Changes to the games view as Server-Sent Events: `date` (with the games whose teams or results
+    were revealed, or that were hidden again) and `reload`.
+
+    Reconnecting with Last-Event-ID (or last_event_id=) replays the events missed in between; an
+    unknown or expired id gets a `reset` event, after which the client should refetch /api/games.
+    With poll=1 the events since last_event_id are returned once as JSON instead.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if request.args.get('poll'):
+        events, reset = change_feed.since(last_event_id)
+        items = [_feed_event(*e) for e in events]
+        if items:
+            cursor = items[-1]["id"]
+        else:
+            cursor = change_feed.last_event_id if reset or not last_event_id else last_event_id
+        return jsonify({"events": items, "reset": reset, "last_event_id": cursor})
+
+    def state():
+        return {"date": data_service.simulated_date, "data_version": data_service.data_version}
+
+    def generate():
+        change_feed.add_subscriber()
+        try:
+            cursor = last_event_id
+            if not cursor:
+                cursor = change_feed.last_event_id
+                yield _sse("ready", state(), cursor)
+            while True:
+                events, reset = change_feed.wait(cursor, CHANGE_FEED_KEEPALIVE)
+                if reset:
+                    cursor = change_feed.last_event_id
+                    yield _sse("reset", state(), cursor)
+                elif not events:
+                    yield ": keepalive\n\n"
+                for sequence, name, payload in events:
+                    cursor = change_feed.event_id(sequence)
+                    yield _sse(name, payload, cursor)
+        finally:
+            change_feed.add_subscriber(-1)
+
+    return _sse_response(generate())
+
+@app.route('/api/map/places', methods=['GET'])
+def get_map_places():
+    """Get the places inside a bounding box (bbox=south,west,north,east) for the map view"""
+    try:
+        south, west, north, east = (float(v) for v in request.args.get('bbox', '').split(','))
+    except ValueError:
+        return jsonify({"error": "bbox must be south,west,north,east"}), 400
+    if not (_valid_point(south, west) and _valid_point(north, east)) or south > north or west > east:
+        return jsonify({"error": "bbox must be south,west,north,east with south <= north, west <= east, "
+                                 "latitudes within -90..90 and longitudes within -180..180"}), 400
+
+    types = request.args.get('types')
+    categories = types.split(',') if types else list(PLACE_CATEGORIES)
+    return jsonify(data_service.get_places_in_bbox(categories, south, west, north, east))
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
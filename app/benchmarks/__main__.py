@@ -0,0 +1,96 @@
+"""
+Run the whole benchmark suite on a synthetic dataset and write one JSON
+report. With --compare, each p50/p95/p99 is checked against an earlier
+report and the run fails if any grew by more than --threshold.
+
+    cd app && python -m benchmarks --fans 100000 --output bench.json
+    cd app && python -m benchmarks --fans 100000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_data, load_test, synthetic
+from benchmarks.stats import write_results
+from services import fast_json
+
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float,
+            min_delta_ms: float = 0.05) -> List[str]:
+    """Describe every latency metric that grew by more than `threshold` (a fraction) and `min_delta_ms`"""
+    regressions = []
+    for section, key in (('data', 'cases'), ('load', 'routes')):
+        before_cases = previous.get(section, {}).get(key, {})
+        for name, after in current.get(section, {}).get(key, {}).items():
+            before = before_cases.get(name)
+            if not before:
+                continue
+            for metric in COMPARED_METRICS:
+                grew = after[metric] - before.get(metric, 0)
+                if before.get(metric) and after[metric] > before[metric] * (1 + threshold) and grew > min_delta_ms:
+                    regressions.append(f"{section}.{name}.{metric}: {before[metric]:.3f} -> {after[metric]:.3f} "
+                                       f"(+{(after[metric] / before[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    synthetic.add_scale_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=2000, help="calls per data benchmark")
+    parser.add_argument('--requests', type=int, default=500, help="requests per route")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--fake-latency', type=float, default=0.0, help="seconds per fake LLM call")
+    parser.add_argument('--compact', action='store_true', help="use compact record tables")
+    parser.add_argument('--skip-load', action='store_true', help="only run the data benchmarks")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--compare', help="earlier JSON report to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed growth before a regression")
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help="ignore smaller absolute growth")
+    args = parser.parse_args()
+
+    scale = synthetic.scale_from_args(args)
+    if args.compact:
+        os.environ["DALIL_COMPACT_RECORDS"] = "1"
+    with tempfile.TemporaryDirectory(prefix="dalil-bench-") as data_dir:
+        report = {
+            "meta": {
+                "commit": _git_commit(), "python": platform.python_version(),
+                "json_backend": fast_json.BACKEND, "compact": args.compact,
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S"), "scale": scale,
+            },
+            "records": synthetic.write_dataset(data_dir, **scale),
+            "data": bench_data.run(data_dir, args.iterations, args.compact),
+        }
+        if not args.skip_load:
+            report["load"] = load_test.run(data_dir, requests=args.requests, concurrency=args.concurrency,
+                                           fake_latency=args.fake_latency)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(json.load(f), report, args.threshold, args.min_delta_ms)
+    write_results(report, args.output)
+    if report.get("regressions"):
+        print("Regressions:\n  " + "\n  ".join(report["regressions"]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
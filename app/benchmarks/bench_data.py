@@ -0,0 +1,79 @@
+"""
+Microbenchmarks of the DataService queries and ChatService._prepare_fan_data
+against a data directory (the bundled data or a synthetic one).
+
+    cd app && python -m benchmarks.bench_data --data-dir /tmp/dalil-data
+"""
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stats import time_calls, write_results
+from services.chat_service import ChatService
+from services.data_service import DataService
+
+
+def _tournament_dates(games, count=30):
+    first = date.fromisoformat(min(g['date'] for g in games))
+    last = date.fromisoformat(max(g['date'] for g in games))
+    step = max(1, (last - first).days // count)
+    return [(first + timedelta(days=d)).isoformat() for d in range(-3, (last - first).days + 4, step)]
+
+
+def run(data_dir=None, iterations: int = 2000, compact: bool = False):
+    data_service = DataService("2034-06-13", data_dir=data_dir, compact=compact)
+    chat_service = ChatService(data_service)
+    fans = data_service.fans
+    dates = _tournament_dates(data_service.raw_games)
+    teams = sorted({g['team_a'] for g in data_service.raw_games if g['stage'] == 'group'})
+    cities = sorted({h['city'] for h in data_service.hotels})
+    hotels = data_service.hotels
+
+    def fan(i):
+        return fans[i * 7919 % len(fans)]
+
+    def day(i):
+        return dates[i % len(dates)]
+
+    def prepare_cold(i):
+        chat_service.invalidate_fan_context()
+        chat_service._prepare_fan_data(fan(i), day(i))
+
+    cases = {
+        "get_fan_by_id": lambda i: data_service.get_fan_by_id(fan(i)['id']),
+        "get_game_by_id": lambda i: data_service.get_game_by_id(data_service.raw_games[i % len(data_service.raw_games)]['id']),
+        "get_games_for_date": lambda i: data_service.get_games_for_date(day(i)),
+        "get_games_for_team": lambda i: data_service.get_games_for_team(teams[i % len(teams)], day(i)),
+        "get_games_within_this_week": lambda i: data_service.get_games_within_this_week(day(i)),
+        "get_restaurants_by_city": lambda i: data_service.get_restaurants_by_city(cities[i % len(cities)]),
+        "get_fan_current_hotel": lambda i: data_service.get_fan_current_hotel(fan(i), day(i)),
+        "get_fan_attending_games": lambda i: data_service.get_fan_attending_games(fan(i), day(i)),
+        "get_nearby_places": lambda i: data_service.get_nearby_places(
+            'restaurants', hotels[i % len(hotels)]['lat'], hotels[i % len(hotels)]['lon'], 5),
+        "update_simulated_date": lambda i: data_service.update_simulated_date(day(i)),
+        "prepare_fan_data_cold": prepare_cold,
+        "prepare_fan_data_warm": lambda i: chat_service._prepare_fan_data(fan(i % 50), dates[0]),
+    }
+    return {
+        "records": {name: len(getattr(data_service, name))
+                    for name in ('raw_games', 'stadiums', 'fans', 'hotels', 'restaurants', 'attractions')},
+        "cases": {name: time_calls(func, iterations) for name, func in cases.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', help="data directory (defaults to the bundled data)")
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--compact', action='store_true', help="use compact record tables")
+    parser.add_argument('--output', help="write the JSON results to this file")
+    args = parser.parse_args()
+    results = run(args.data_dir, args.iterations, args.compact)
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare the dict record path with the compact RecordTable path, and the
+stdlib JSON codec with the fast one, on the fan, hotel and game data scaled
+up to `--scale` copies.
+
+    cd app && python -m benchmarks.bench_records --scale 2000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stats import write_results
+from services import fast_json
+from services.data_service import DEFAULT_DATA_DIR
+from services.records import RecordTable
+
+
+def _scaled(records, scale):
+    """`scale` copies of the records with fresh ids"""
+    out = []
+    for copy in range(scale):
+        for record in records:
+            out.append({**record, 'id': copy * len(records) + record['id']})
+    return out
+
+
+def _measure_memory(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def _best_of(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(scale: int):
+    results = {"backend": fast_json.BACKEND, "scale": scale, "collections": {}}
+    for name in ('fans', 'hotels', 'games'):
+        with open(os.path.join(DEFAULT_DATA_DIR, f'{name}.json'), 'rb') as f:
+            raw = json.dumps(_scaled(json.loads(f.read()), scale)).encode()
+
+        dicts, dict_bytes = _measure_memory(lambda: json.loads(raw))
+        table, table_bytes = _measure_memory(lambda: RecordTable(fast_json.loads(raw)))
+        fields = list(dicts[0])
+
+        results["collections"][name] = {
+            "records": len(dicts),
+            "memory_bytes": {"dicts": dict_bytes, "compact": table_bytes},
+            "decode_seconds": {
+                "json": _best_of(lambda: json.loads(raw)),
+                "fast": _best_of(lambda: fast_json.loads(raw)),
+            },
+            "encode_seconds": {
+                "json_dicts": _best_of(lambda: json.dumps(dicts)),
+                "fast_dicts": _best_of(lambda: fast_json.dumps(dicts)),
+                "fast_compact": _best_of(lambda: fast_json.dumps(table)),
+            },
+            "scan_seconds": {
+                "dicts": _best_of(lambda: [r.get(f) for r in dicts for f in fields]),
+                "compact": _best_of(lambda: [r.get(f) for r in table for f in fields]),
+            },
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1000, help="copies of each data file")
+    parser.add_argument('--output', help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    write_results(run(args.scale), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Measure the cold start of a worker: a fresh interpreter importing app.py
+until it can serve its first catalogue request, in the data-only mode
+(DALIL_SERVE=data) and the full mode, plus the first chat request in the
+full mode, which loads the LLM stack.
+
+    cd app && python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stats import summarize, write_results
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child: imports the app, serves one request, and reports the app's own
+# phase timings and which LLM libraries ended up imported
+_CHILD = """
+import json, sys
+import app
+client = app.app.test_client()
+assert client.get('/api/games').status_code == 200
+if {load_chat}:
+    app.chat_stack.get()
+print(json.dumps({{
+    "phases": {{**app.startup_seconds, "chat_stack": app.chat_stack.load_seconds}},
+    "llm_imported": sorted(m for m in ("langchain_core", "langgraph", "langchain_openai", "openai") if m in sys.modules),
+}}))
+"""
+
+
+def _cold_start(mode: str, load_chat: bool, data_dir: Optional[str]) -> Dict:
+    env = {**os.environ, "DALIL_SERVE": mode, "DALIL_FAKE_LLM": "1", "DALIL_METRICS": "1"}
+    if data_dir:
+        env["DALIL_DATA_DIR"] = data_dir
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", _CHILD.format(load_chat=load_chat)], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    return {"wall": wall, **json.loads(result.stdout.strip().splitlines()[-1])}
+
+
+def run(runs: int, data_dir: Optional[str] = None) -> Dict:
+    results = {}
+    for name, mode, load_chat in (("data_only", "data", False), ("full", "all", False), ("full_first_chat", "all", True)):
+        samples = [_cold_start(mode, load_chat, data_dir) for _ in range(runs)]
+        results[name] = {
+            "wall": summarize([s["wall"] for s in samples]),
+            "phases_ms": {
+                phase: round(sum(s["phases"][phase] for s in samples) / runs * 1000, 1)
+                for phase in samples[0]["phases"]
+            },
+            "llm_imported": samples[-1]["llm_imported"],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="cold starts per mode")
+    parser.add_argument('--data-dir', help="data directory to start with (default app/data)")
+    parser.add_argument('--output', help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    write_results(run(args.runs, args.data_dir), args.output)
+
+
+if __name__ == '__main__':
+    main()
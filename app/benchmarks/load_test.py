@@ -0,0 +1,140 @@
+"""
+Load test of the Flask API, including /api/chat against the deterministic
+fake LLM. Starts the app in-process on a free port unless --url points at a
+running server (which should then be started with DALIL_FAKE_LLM=1).
+
+    cd app && python -m benchmarks.load_test --data-dir /tmp/dalil-data --concurrency 32
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stats import summarize, write_results
+
+CHAT_MESSAGES = [
+    "Which restaurants do you recommend in Jeddah?",
+    "What attractions should I visit in Riyadh?",
+    "What games are on this week?",
+    "Plan an itinerary for my day in Dammam",
+    "Hi, how are you?",
+]
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+def _request(route: str, fans: List[Dict[str, Any]], games: List[Dict[str, Any]], rng: random.Random) -> Request:
+    if route == 'chat':
+        fan = rng.choice(fans)
+        return 'POST', '/api/chat', {"user_id": fan['id'], "message": rng.choice(CHAT_MESSAGES)}
+    if route == 'fan':
+        return 'GET', f"/api/fans/{rng.choice(fans)['id']}", None
+    if route == 'team_games':
+        return 'GET', f"/api/team/{urllib.parse.quote(rng.choice(games)['team_a'])}/games", None
+    if route == 'nearby':
+        stays = rng.choice(fans).get('hotel_stays') or [{"hotel_id": 1}]
+        return 'GET', f"/api/nearby/restaurants?near=hotels:{stays[0]['hotel_id']}&limit=5", None
+    return 'GET', f"/api/{route}", None
+
+
+def _start_server(data_dir: Optional[str], fake_latency: float, answer_cache: bool):
+    os.environ.update(DALIL_FAKE_LLM="1", DALIL_FAKE_LLM_LATENCY=str(fake_latency),
+                      DALIL_ANSWER_CACHE="1" if answer_cache else "0")
+    if data_dir:
+        os.environ["DALIL_DATA_DIR"] = data_dir
+    import app as dalil
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", 0, dalil.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", dalil.data_service
+
+
+def _send(base_url: str, request: Request, timeout: float) -> Tuple[float, int]:
+    method, path, body = request
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method,
+                                 headers={"Content-Type": "application/json"} if data else {})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return time.perf_counter() - started, status
+
+
+def run_route(base_url: str, route: str, requests: int, concurrency: int,
+              fans, games, timeout: float = 60.0, seed: int = 0) -> Dict[str, Any]:
+    """Send `requests` requests for one route with `concurrency` clients and summarize the latencies"""
+    rng = random.Random(seed)
+    batch = [_request(route, fans, games, rng) for _ in range(requests)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda r: _send(base_url, r, timeout), batch))
+    wall = time.perf_counter() - started
+
+    statuses: Dict[str, int] = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    ok = [latency for latency, status in results if 200 <= status < 400]
+    return {**summarize(ok, wall), "requests": requests, "concurrency": concurrency,
+            "errors": requests - len(ok), "statuses": statuses}
+
+
+def run(data_dir: Optional[str] = None, url: Optional[str] = None,
+        routes: Tuple[str, ...] = ('games', 'hotels', 'fan', 'team_games', 'nearby', 'chat'),
+        requests: int = 500, concurrency: int = 16, fake_latency: float = 0.0,
+        answer_cache: bool = False) -> Dict[str, Any]:
+    server = None
+    if url:
+        base_url = url.rstrip('/')
+        fans = json.loads(urllib.request.urlopen(base_url + '/api/fans').read())
+        games = json.loads(urllib.request.urlopen(base_url + '/api/games').read())
+    else:
+        server, base_url, data_service = _start_server(data_dir, fake_latency, answer_cache)
+        fans, games = list(data_service.fans), list(data_service.raw_games)
+    games = [g for g in games if g['stage'] == 'group'] or games
+
+    try:
+        return {
+            "target": url or "in-process",
+            "fake_llm_latency": fake_latency,
+            "routes": {route: run_route(base_url, route, requests, concurrency, fans, games)
+                       for route in routes},
+        }
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', help="data directory for the in-process server")
+    parser.add_argument('--url', help="base URL of an already running server")
+    parser.add_argument('--routes', default='games,hotels,fan,team_games,nearby,chat')
+    parser.add_argument('--requests', type=int, default=500, help="requests per route")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--fake-latency', type=float, default=0.0, help="seconds per fake LLM call")
+    parser.add_argument('--answer-cache', action='store_true', help="leave the answer cache on")
+    parser.add_argument('--output', help="write the JSON results to this file")
+    args = parser.parse_args()
+    results = run(args.data_dir, args.url, tuple(args.routes.split(',')), args.requests,
+                  args.concurrency, args.fake_latency, args.answer_cache)
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
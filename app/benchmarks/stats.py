@@ -0,0 +1,51 @@
+import json
+import math
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples: List[float], wall_seconds: Optional[float] = None) -> Dict[str, float]:
+    """Latency summary in milliseconds of samples given in seconds, with throughput if the wall time is known"""
+    ordered = sorted(samples)
+    count = len(ordered)
+    summary = {
+        "count": count,
+        "mean_ms": sum(ordered) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000 if count else 0.0,
+    }
+    if wall_seconds:
+        summary["throughput_rps"] = count / wall_seconds
+    return summary
+
+
+def time_calls(func: Callable[[int], object], iterations: int, warmup: int = 10) -> Dict[str, float]:
+    """Time `iterations` calls of func(i) one by one and summarize them"""
+    for i in range(min(warmup, iterations)):
+        func(i)
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - call_started)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def write_results(results: Dict, path: Optional[str] = None):
+    """Print results as JSON and also write them to path if given"""
+    text = json.dumps(results, indent=2)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,217 @@
+"""
+Generate a synthetic dataset in the same JSON schemas as app/data, at any
+scale, for benchmarks and load tests.
+
+    cd app && python -m benchmarks.synthetic /tmp/dalil-data --fans 100000 --games 1000
+"""
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Any
+
+CITIES = {
+    'Riyadh': (24.7136, 46.6753), 'Jeddah': (21.5433, 39.1728), 'Dammam': (26.4207, 50.0888),
+    'Al Khobar': (26.2172, 50.1971), 'Abha': (18.2164, 42.5053), 'Medina': (24.5247, 39.5692),
+    'Makkah': (21.3891, 39.8579), 'Tabuk': (28.3838, 36.5550), 'Hail': (27.5114, 41.7208),
+    'Najran': (17.5656, 44.2289),
+}
+TEAMS = [
+    'Saudi Arabia', 'Australia', 'England', 'Spain', 'Morocco', 'Japan', 'France', 'Brazil',
+    'Argentina', 'Germany', 'Portugal', 'Netherlands', 'Mexico', 'USA', 'Canada', 'Korea Republic',
+    'Turkey', 'Algeria', 'Egypt', 'Senegal', 'Nigeria', 'Ghana', 'Qatar', 'Iran', 'Croatia',
+    'Belgium', 'Italy', 'Uruguay', 'Colombia', 'Ecuador', 'Switzerland', 'Denmark',
+]
+KNOCKOUT_STAGES = ['round_of_32', 'round_of_16', 'quarter_final', 'semi_final', 'third_place', 'final']
+CUISINES = ['Arabic', 'Seafood', 'Italian', 'Japanese', 'Indian', 'Lebanese', 'Fast Food',
+            'International', 'Saudi Traditional', 'Café', 'Burgers', 'Chinese']
+ATTRACTION_TYPES = ['Museum', 'Historical Site', 'Beach', 'Shopping', 'Urban Park', 'Landmark',
+                    'Cultural Center', 'Traditional Market', 'National Park']
+ACTIVITIES = ['Shopping', 'Cultural tours', 'Beaches', 'Nightlife', 'Sports events',
+              'Art galleries', 'Luxury experiences', 'Technology tours']
+FOODS = ['Arabic', 'International', 'Seafood', 'British', 'Spanish', 'Mediterranean',
+         'Japanese', 'French', 'Fine dining', 'Italian', 'Indian']
+TRANSPORT = ['Rental car', 'Taxi', 'Public transport', 'Organized tours', 'Chauffeur']
+AMENITIES = ['pool', 'spa', 'gym', 'restaurant', 'wifi', 'room_service', 'parking', 'beach_access']
+TOURNAMENT_START = date(2034, 6, 12)
+TOURNAMENT_DAYS = 80
+
+
+def _point(rng: random.Random, city: str, spread: float = 0.08):
+    lat, lon = CITIES[city]
+    return round(lat + rng.uniform(-spread, spread), 4), round(lon + rng.uniform(-spread, spread), 4)
+
+
+def _location(rng: random.Random, city: str) -> Dict[str, Any]:
+    lat, lon = _point(rng, city)
+    return {"latitude": lat, "longitude": lon, "address": f"{city}, Saudi Arabia"}
+
+
+def generate_stadiums(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    stadiums = []
+    for i in range(1, count + 1):
+        city = list(CITIES)[(i - 1) % len(CITIES)]
+        lat, lon = _point(rng, city)
+        stadiums.append({
+            "id": i, "name": f"{city} Stadium {i}", "city": city, "lat": lat, "lon": lon,
+            "capacity": rng.randrange(30000, 95000, 250),
+            "description": f"Venue number {i} in {city}.", "image_path": f"/stadiums/stadium_{i}.jpg",
+        })
+    return stadiums
+
+
+def generate_games(rng: random.Random, count: int, stadiums: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    games = []
+    group_games = int(count * 0.7)
+    for i in range(1, count + 1):
+        if i <= group_games:
+            stage = 'group'
+            day = (i - 1) * (TOURNAMENT_DAYS // 2) // max(group_games, 1)
+        else:
+            knockout = (i - group_games - 1) / max(count - group_games, 1)
+            stage = KNOCKOUT_STAGES[min(int(knockout * len(KNOCKOUT_STAGES)), len(KNOCKOUT_STAGES) - 1)]
+            day = TOURNAMENT_DAYS // 2 + int(knockout * (TOURNAMENT_DAYS // 2 - 1))
+        team_a, team_b = rng.sample(TEAMS, 2)
+        score_a, score_b = rng.randint(0, 4), rng.randint(0, 4)
+        if stage != 'group' and score_a == score_b:
+            score_a += 1
+        game = {
+            "id": i, "team_a": team_a, "team_b": team_b,
+            "date": (TOURNAMENT_START + timedelta(days=day)).isoformat(),
+            "time": rng.choice(["16:00", "19:00"]), "stage": stage,
+            "stadium_id": rng.choice(stadiums)["id"],
+            "result": {"score_a": score_a, "score_b": score_b},
+            "winner": team_a if score_a > score_b else team_b if score_b > score_a else None,
+        }
+        if stage == 'group':
+            game["group"] = chr(ord('A') + (i - 1) % 12)
+        games.append(game)
+    return games
+
+
+def generate_hotels(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    hotels = []
+    for i in range(1, count + 1):
+        city = rng.choice(list(CITIES))
+        lat, lon = _point(rng, city)
+        hotels.append({
+            "id": i, "name": f"Hotel {i} {city}", "city": city, "lat": lat, "lon": lon,
+            "description": f"Hotel in {city} close to the stadiums.", "rating": rng.randint(2, 5),
+            "amenities": rng.sample(AMENITIES, rng.randint(2, 6)), "image_path": f"/hotels/hotel_{i}.jpg",
+        })
+    return hotels
+
+
+def generate_restaurants(rng: random.Random, count: int, stadiums: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    restaurants = []
+    for i in range(1, count + 1):
+        city = rng.choice(list(CITIES))
+        cuisine = rng.choice(CUISINES)
+        restaurants.append({
+            "id": i, "name": f"{cuisine} Kitchen {i}", "cuisine": cuisine,
+            "price_range": rng.choice(["$", "$$", "$$$", "$$$$"]), "rating": round(rng.uniform(3.0, 5.0), 1),
+            "location": _location(rng, city), "description": f"{cuisine} food in {city}.",
+            "image_url": f"/restaurants/restaurant_{i}.jpg", "hours": "12:00 PM - 12:00 AM",
+            "near_stadium": rng.choice(stadiums)["name"], "popular_dishes": ["Dish A", "Dish B"],
+            "reservations_required": rng.random() < 0.3, "city": city,
+        })
+    return restaurants
+
+
+def generate_attractions(rng: random.Random, count: int, stadiums: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    attractions = []
+    for i in range(1, count + 1):
+        city = rng.choice(list(CITIES))
+        kind = rng.choice(ATTRACTION_TYPES)
+        attractions.append({
+            "id": i, "name": f"{city} {kind} {i}", "type": kind, "city": city,
+            "rating": round(rng.uniform(3.0, 5.0), 1), "location": _location(rng, city),
+            "description": f"A {kind.lower()} in {city}.", "image_path": f"/attractions/attraction_{i}.jpg",
+            "hours": "9:00 AM - 9:00 PM", "near_stadium": rng.choice(stadiums)["name"],
+            "price_range": rng.choice(["Free", "$", "$$"]), "suggested_visit_length": "2-3 hours",
+            "accessibility": rng.random() < 0.8, "tags": [kind.lower()],
+        })
+    return attractions
+
+
+def generate_fans(rng: random.Random, count: int, games: List[Dict[str, Any]],
+                  hotels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    fans = []
+    for i in range(1, count + 1):
+        team = rng.choice(TEAMS)
+        stays, day = [], rng.randint(0, 10)
+        for _ in range(rng.randint(1, 4)):
+            length = rng.randint(3, 15)
+            stays.append({
+                "hotel_id": rng.choice(hotels)["id"],
+                "check_in": (TOURNAMENT_START + timedelta(days=day)).isoformat(),
+                "check_out": (TOURNAMENT_START + timedelta(days=day + length)).isoformat(),
+            })
+            day += length
+        fans.append({
+            "id": i, "name": f"Fan {i}", "nationality": team, "team_supported": team,
+            "hotel_stays": stays,
+            "attending_games": sorted(g["id"] for g in rng.sample(games, min(len(games), rng.randint(1, 8)))),
+            "preferences": {
+                "food": rng.sample(FOODS, 3), "activities": rng.sample(ACTIVITIES, 3),
+                "transport": rng.choice(TRANSPORT),
+            },
+            "language": rng.choice(["English", "Arabic", "Spanish", "French", "Japanese"]),
+        })
+    return fans
+
+
+def generate_dataset(fans: int = 1000, games: int = 104, hotels: int = 100, restaurants: int = 200,
+                     attractions: int = 200, stadiums: int = 13, seed: int = 2034) -> Dict[str, List[Dict[str, Any]]]:
+    """Build every collection, keyed by the data file name without .json"""
+    rng = random.Random(seed)
+    stadium_list = generate_stadiums(rng, stadiums)
+    game_list = generate_games(rng, games, stadium_list)
+    hotel_list = generate_hotels(rng, hotels)
+    return {
+        'stadiums': stadium_list,
+        'games': game_list,
+        'hotels': hotel_list,
+        'restaurants': generate_restaurants(rng, restaurants, stadium_list),
+        'attractions': generate_attractions(rng, attractions, stadium_list),
+        'fans': generate_fans(rng, fans, game_list, hotel_list),
+    }
+
+
+def write_dataset(data_dir: str, **scale) -> Dict[str, int]:
+    """Generate a dataset into data_dir and return the record count of each file"""
+    os.makedirs(data_dir, exist_ok=True)
+    counts = {}
+    for name, records in generate_dataset(**scale).items():
+        with open(os.path.join(data_dir, f'{name}.json'), 'w') as f:
+            json.dump(records, f)
+        counts[name] = len(records)
+    return counts
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--fans', type=int, default=1000)
+    parser.add_argument('--games', type=int, default=104)
+    parser.add_argument('--hotels', type=int, default=100)
+    parser.add_argument('--restaurants', type=int, default=200)
+    parser.add_argument('--attractions', type=int, default=200)
+    parser.add_argument('--stadiums', type=int, default=13)
+    parser.add_argument('--seed', type=int, default=2034)
+
+
+def scale_from_args(args: argparse.Namespace) -> Dict[str, int]:
+    return {name: getattr(args, name)
+            for name in ('fans', 'games', 'hotels', 'restaurants', 'attractions', 'stadiums', 'seed')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_dir')
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    print(json.dumps(write_dataset(args.data_dir, **scale_from_args(args))))
+
+
+if __name__ == '__main__':
+    main()
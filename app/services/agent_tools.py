@@ -0,0 +1,117 @@
+"""
+The tools the chat agent can call, as LangChain tools bound to a ChatService.
+Imported only when the chat stack is first used.
+"""
+from typing import List
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, tool
+from services.chat_service import ChatService
+
+
+def _tool_fan_id(config: RunnableConfig):
+    """The fan a tool is running for, taken from the graph run config"""
+    return config.get("configurable", {}).get("fan_id")
+
+
+def build_agent_tools(chat_service: ChatService) -> List[BaseTool]:
+    """The agent's tools, answering from a ChatService"""
+
+    @tool
+    def get_restaurants_by_city(city: str, config: RunnableConfig, limit: int = 5) -> list[dict]:
+        """Get restaurants by city, best matches for the fan's food preferences first
+
+        Args:
+            city (str): The city name, one of ["Abha", "Al Baha", "Al Hofuf", "Al-Ula", "Asir", "Dammam", "Hafar Al-Batin", "Hail", "Jeddah", "Khobar", "Makkah", "Medina", "NEOM", "Najran", "Riyadh", "Tabuk", "Taif"]
+            limit (int): Maximum number of restaurants to return
+
+        Returns:
+            list[dict]: List of restaurants in the specified city
+        """
+        return chat_service._get_restaurants_by_city(city, _tool_fan_id(config), limit)
+
+    @tool
+    def get_attractions_by_city(city: str, config: RunnableConfig, limit: int = 5) -> list[dict]:
+        """Get attractions by city, best matches for the fan's activity preferences first
+
+        Args:
+            city (str): The city name, one of ["Abha", "Al Baha", "Al Hofuf", "Al Khobar", "Al-Ula", "Asir", "Dammam", "Hafar Al-Batin", "Hail", "Jeddah", "Makkah", "Medina", "NEOM", "Najran", "Riyadh", "Tabuk", "Taif"]
+            limit (int): Maximum number of attractions to return
+
+        Returns:
+            list[dict]: List of attractions in the specified city
+        """
+        return chat_service._get_attractions_by_city(city, _tool_fan_id(config), limit)
+
+    @tool
+    def get_games_within_this_week(simulated_date: str, config: RunnableConfig, limit: int = 20) -> list[dict]:
+        """Get all games within the current weeks from the simulated date
+
+        Args:
+            simulated_date (str): The simulated date in YYYY-MM-DD format
+            limit (int): Maximum number of games to return, the fan's own games are kept first
+
+        Returns:
+            list[dict]: List of games within the current week
+        """
+        return chat_service._get_games_within_this_week(simulated_date, _tool_fan_id(config), limit)
+
+    @tool
+    def get_places_near(category: str, place_name: str, limit: int = 5, radius_km: float = None) -> list[dict]:
+        """Get the closest restaurants, attractions, hotels or stadiums to a named place, closest first
+
+        Args:
+            category (str): What to look for, one of ["restaurants", "attractions", "hotels", "stadiums"]
+            place_name (str): Name of the hotel, stadium or attraction to search around
+            limit (int): Maximum number of places to return
+            radius_km (float): Optional maximum distance in kilometres
+
+        Returns:
+            list[dict]: The nearby places, each with its distance_km
+        """
+        return chat_service._get_places_near(category, place_name, limit, radius_km)
+
+    @tool
+    def search_places(query: str, category: str = None, city: str = None, limit: int = 5) -> list[dict]:
+        """Search restaurants, attractions, hotels, stadiums and teams by keywords, best match first
+
+        Args:
+            query (str): Keywords, e.g. a dish, cuisine, amenity, landmark or name ("seafood corniche", "spa")
+            category (str): Optional, one of ["restaurants", "attractions", "hotels", "stadiums", "teams"]
+            city (str): Optional city to restrict the results to
+            limit (int): Maximum number of results to return
+
+        Returns:
+            list[dict]: The matching places, each with its category
+        """
+        return chat_service._search(query, category, city, limit)
+
+    @tool
+    def get_team_standing(simulated_date: str, config: RunnableConfig, team: str = None) -> dict:
+        """Get how a team is doing on the simulated date: its group table, status in the tournament, knockout results and next game
+
+        Args:
+            simulated_date (str): The simulated date in YYYY-MM-DD format
+            team (str): The team name; defaults to the team the fan supports
+
+        Returns:
+            dict: The team's group table and standing, status (group_stage, knockout, eliminated, champion, ...) and next game
+        """
+        return chat_service._get_team_standing(simulated_date, team, _tool_fan_id(config))
+
+    @tool
+    def get_travel_time(simulated_date: str, config: RunnableConfig, origin: str = None, destination: str = None) -> dict:
+        """Get the distance and estimated travel time (driving, or flying for long trips) between two places.
+        Without arguments: from the fan's hotel to the stadium of their next game.
+
+        Args:
+            simulated_date (str): The simulated date in YYYY-MM-DD format
+            origin (str): Optional name of a hotel, stadium, attraction or restaurant; defaults to the fan's current hotel
+            destination (str): Optional name of a hotel, stadium, attraction or restaurant; defaults to the stadium of the fan's next game
+
+        Returns:
+            dict: The origin, destination, distance_km, travel_minutes and mode
+        """
+        return chat_service._get_travel_time(simulated_date, origin, destination, _tool_fan_id(config))
+
+    return [get_restaurants_by_city, get_attractions_by_city, get_games_within_this_week, get_places_near, search_places,
+            get_team_standing, get_travel_time]
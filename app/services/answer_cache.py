@@ -0,0 +1,146 @@
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Optional, Tuple
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an the is are was were be been am do does did can could would should will shall may might
+please tell me show give find get any some of in on at to for from with about by this these
+what which who whom whose when where how why there here hi hello hey thanks thank you
+and or but so just also like want need know let lets us our we
+""".split())
+
+# Words that make a question depend on the fan asking it
+PERSONAL = frozenset("my mine myself i im me".split())
+
+# Words that point back into the conversation, so the question cannot be answered on its own
+FOLLOW_UP = frozenset("it its that those them they their same more else another other again instead".split())
+
+SYNONYMS = {
+    "match": "game", "fixture": "game", "kickoff": "game",
+    "restaurant": "eat", "food": "eat",
+    "attraction": "see", "sightseeing": "see", "visit": "see",
+    "tonight": "today",
+}
+
+# Words that do not change what is being asked. A rephrased question may only
+# differ from a cached one in these; any other term (a city, team, cuisine,
+# diet, date, number, price or quality) must match exactly
+FILLER = frozenset("""
+recommend recommendation suggest suggestion idea option place spot list few
+near nearby around really currently now right go going look looking
+""".split())
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return SYNONYMS.get(word, word)
+
+
+def question_terms(question: str) -> Tuple[FrozenSet[str], bool, bool]:
+    """Normalized content terms of a question, plus whether it is personal or a follow-up"""
+    words = _WORD.findall(question.lower().replace("'", ""))
+    personal = any(w in PERSONAL for w in words)
+    follow_up = any(w in FOLLOW_UP for w in words)
+    terms = frozenset(_stem(w) for w in words if w not in STOPWORDS and w not in PERSONAL)
+    return terms, personal, follow_up
+
+
+class AnswerCache:
+    """
+    Cache of assistant answers for standalone fan questions. Questions are
+    reduced to a set of normalized terms and looked up in the bucket for their
+    context (city, simulated date, team, preference profile, plus the fan for
+    personal questions), first exactly and then by cosine similarity of the
+    term sets above `similarity`. A similar question may only add or drop
+    FILLER words, so "italian restaurants in Jeddah" never reuses the answer
+    for "seafood restaurants in Jeddah", nor June 14 the answer for June 15.
+    Follow-up questions are never cached since their meaning depends on the
+    conversation.
+    """
+
+    def __init__(self, ttl_seconds: float = 600, similarity: float = 0.8,
+                 max_contexts: int = 5000, max_per_context: int = 200):
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.max_contexts = max_contexts
+        self.max_per_context = max_per_context
+        self._buckets: "OrderedDict[Hashable, Dict[FrozenSet[str], Tuple[str, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, question: str, context: Hashable, fan_id: Any) -> Optional[Tuple[FrozenSet[str], Hashable]]:
+        terms, personal, follow_up = question_terms(question)
+        if follow_up or len(terms) < 2:
+            return None
+        return terms, (context, fan_id if personal else None)
+
+    def lookup(self, question: str, context: Hashable, fan_id: Any = None) -> Optional[str]:
+        """Get a cached answer to the question (or a close paraphrase) in this context"""
+        key = self._key(question, context, fan_id)
+        if key is None:
+            return None
+        terms, bucket_key = key
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            answer = None
+            if bucket:
+                entry = bucket.get(terms)
+                if entry is None:
+                    entry = self._most_similar(bucket, terms)
+                if entry is not None and now - entry[1] <= self.ttl_seconds:
+                    answer = entry[0]
+                self._buckets.move_to_end(bucket_key)
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return answer
+
+    def _most_similar(self, bucket: Dict[FrozenSet[str], Tuple[str, float]],
+                      terms: FrozenSet[str]) -> Optional[Tuple[str, float]]:
+        best, best_score = None, self.similarity
+        for cached_terms, entry in bucket.items():
+            if not (terms ^ cached_terms) <= FILLER:
+                continue
+            overlap = len(terms & cached_terms)
+            if not overlap:
+                continue
+            score = overlap / math.sqrt(len(terms) * len(cached_terms))
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def store(self, question: str, context: Hashable, answer: str, fan_id: Any = None):
+        """Remember the answer to a standalone question in this context"""
+        key = self._key(question, context, fan_id)
+        if key is None or not answer:
+            return
+        terms, bucket_key = key
+        with self._lock:
+            bucket = self._buckets.setdefault(bucket_key, OrderedDict())
+            bucket[terms] = (answer, time.monotonic())
+            bucket.move_to_end(terms)
+            while len(bucket) > self.max_per_context:
+                bucket.popitem(last=False)
+            self._buckets.move_to_end(bucket_key)
+            while len(self._buckets) > self.max_contexts:
+                self._buckets.popitem(last=False)
+
+    def invalidate(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "contexts": len(self._buckets)}
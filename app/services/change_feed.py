@@ -0,0 +1,107 @@
+import threading
+import uuid
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+# (sequence number, event name, payload)
+FeedEvent = Tuple[int, str, Dict[str, Any]]
+
+
+class ChangeFeed:
+    """
+    Sequence-numbered changes to the games view, for clients that would
+    otherwise re-poll the game lists. When the simulated date moves, only the
+    games the timeline says changed between the two dates are compared, and
+    the event lists the games whose teams or results were revealed (or, when
+    going back in time, hidden again); a reload publishes a "reload" event
+    telling clients to refetch.
+
+    The last `max_events` events are kept so a client reconnecting with the
+    id of the last event it saw gets exactly what it missed. Ids carry the
+    feed's random stream id, so an id from another process or an event that
+    has already been dropped is answered with a "reset" instead.
+    """
+
+    def __init__(self, data_service, max_events: int = 1000):
+        self.data_service = data_service
+        self.stream_id = uuid.uuid4().hex[:8]
+        self.subscribers = 0
+        self._events: deque = deque(maxlen=max_events)
+        self._sequence = 0
+        self._condition = threading.Condition()
+        data_service.subscribe(self._on_change)
+
+    def event_id(self, sequence: int) -> str:
+        return f"{self.stream_id}-{sequence}"
+
+    def _parse(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence number of an event id from this feed, or None"""
+        stream, _, sequence = (last_event_id or '').rpartition('-')
+        if stream != self.stream_id or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def _on_change(self, event: str, **details):
+        if event == "date":
+            self.publish("date", self._date_diff(details["previous_date"], details["date"]))
+        elif event == "reload":
+            self.publish("reload", {"data_version": details["version"], "date": self.data_service.simulated_date})
+
+    def _date_diff(self, previous_date: str, date: str) -> Dict[str, Any]:
+        dataset = self.data_service.dataset
+        timeline = dataset.timeline
+        before, after = timeline.view(previous_date), timeline.view(date)
+        from_epoch, to_epoch = timeline.epoch(previous_date), timeline.epoch(date)
+        changed = sorted(timeline.changed_between(from_epoch, to_epoch))
+        diff = {"previous_date": previous_date, "date": date, "data_version": dataset.version,
+                "teams_revealed": [], "results_revealed": [], "hidden": []}
+        if to_epoch < from_epoch:
+            diff["hidden"] = [after[p]['id'] for p in changed]
+            return diff
+        for position in changed:
+            old, new = before[position], after[position]
+            if (old['team_a'], old['team_b']) != (new['team_a'], new['team_b']):
+                diff["teams_revealed"].append(new)
+            if old['result'] is None and new['result'] is not None:
+                diff["results_revealed"].append(new)
+        return diff
+
+    def publish(self, name: str, payload: Dict[str, Any]) -> int:
+        """Append an event and wake every waiting subscriber, returning its sequence number"""
+        with self._condition:
+            self._sequence += 1
+            self._events.append((self._sequence, name, payload))
+            self._condition.notify_all()
+            return self._sequence
+
+    def since(self, last_event_id: Optional[str]) -> Tuple[List[FeedEvent], bool]:
+        """Events after an event id (none without one: the client starts from now), and whether it must reset"""
+        with self._condition:
+            return self._since(last_event_id)
+
+    def _since(self, last_event_id: Optional[str]) -> Tuple[List[FeedEvent], bool]:
+        if not last_event_id:
+            return [], False
+        sequence = self._parse(last_event_id)
+        oldest = self._events[0][0] if self._events else self._sequence + 1
+        if sequence is None or sequence > self._sequence or sequence < oldest - 1:
+            return [], True
+        return [e for e in self._events if e[0] > sequence], False
+
+    def wait(self, last_event_id: Optional[str], timeout: float) -> Tuple[List[FeedEvent], bool]:
+        """Like since(), but block up to `timeout` seconds for an event when there is none yet"""
+        with self._condition:
+            events, reset = self._since(last_event_id)
+            if events or reset:
+                return events, reset
+            self._condition.wait(timeout)
+            return self._since(last_event_id)
+
+    @property
+    def last_event_id(self) -> str:
+        return self.event_id(self._sequence)
+
+    def add_subscriber(self, delta: int = 1):
+        """Count a streaming client in (or out, with -1)"""
+        with self._condition:
+            self.subscribers += delta
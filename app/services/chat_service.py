@@ -1,6 +1,10 @@
-from datetime import datetime
+import threading
+from collections import OrderedDict
 from services.data_service import DataService
-from typing import Dict, Any
+from services.timeline import date_ordinal
+from services.metrics import metrics
+from services.tool_payloads import rank_restaurants, rank_attractions, select_games, project_standing, PROJECTIONS
+from typing import Dict, Any, Optional
 
 class ChatService:
     """
@@ -8,8 +12,37 @@ class ChatService:
     This centralizes the chat logic and integrates with other services.
     """
     
-    def __init__(self, data_service: DataService):
+    def __init__(self, data_service: DataService, max_cached_fans: int = 50000):
         self.data_service = data_service
+        
+        # Prompt inputs per (fan_id, simulated_date, data_version); they only
+        # change with the fan record, the simulated date or a data reload.
+        self.max_cached_fans = max_cached_fans
+        self._fan_context_cache: OrderedDict = OrderedDict()
+        self._fan_context_lock = threading.Lock()
+        self.fan_context_hits = 0
+        self.fan_context_misses = 0
+        data_service.subscribe(self._on_data_change)
+    
+    def _on_data_change(self, event: str, **details):
+        self.invalidate_fan_context()
+    
+    def invalidate_fan_context(self, fan_id: Any = None):
+        """Drop cached prompt inputs for one fan, or for every fan"""
+        with self._fan_context_lock:
+            if fan_id is None:
+                self._fan_context_cache.clear()
+                return
+            for key in [k for k in self._fan_context_cache if k[0] == fan_id]:
+                del self._fan_context_cache[key]
+    
+    def fan_context_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and size of the fan context cache"""
+        return {
+            "hits": self.fan_context_hits,
+            "misses": self.fan_context_misses,
+            "size": len(self._fan_context_cache),
+        }
     
     def _get_fan_hotel_info(self, fan: Dict[str, Any], simulated_date: str) -> str:
         """Get fan's hotel information based on the current simulated date"""
@@ -38,10 +71,10 @@ class ChatService:
             return "No games found"
         
         game_info = []
-        current_date = datetime.strptime(simulated_date, "%Y-%m-%d")
+        current_date = date_ordinal(simulated_date)
         
         for game in fan_games:
-            game_date = datetime.strptime(game['date'], "%Y-%m-%d")
+            game_date = date_ordinal(game['date'])
             
             teams = f"{game['team_a']} vs {game['team_b']}"
                 
@@ -71,7 +104,26 @@ class ChatService:
         return ", ".join(game_info)
     
     def _prepare_fan_data(self, fan: Dict[str, Any], simulated_date: str) -> Dict[str, Any]:
-        """Prepare all the fan data needed for the prompt"""
+        """Prepare all the fan data needed for the prompt, memoized per fan, date and data version"""
+        key = (fan["id"], simulated_date, self.data_service.data_version)
+        with self._fan_context_lock:
+            cached = self._fan_context_cache.get(key)
+            if cached is not None:
+                self._fan_context_cache.move_to_end(key)
+                self.fan_context_hits += 1
+                return dict(cached)
+            self.fan_context_misses += 1
+        
+        with metrics.span("prepare_fan_data"):
+            fan_data = self._build_fan_data(fan, simulated_date)
+        with self._fan_context_lock:
+            self._fan_context_cache[key] = fan_data
+            if len(self._fan_context_cache) > self.max_cached_fans:
+                self._fan_context_cache.popitem(last=False)
+        return dict(fan_data)
+    
+    def _build_fan_data(self, fan: Dict[str, Any], simulated_date: str) -> Dict[str, Any]:
+        """Build all the fan data needed for the prompt"""
         fan_hotel = self._get_fan_hotel_info(fan, simulated_date)
         
         fan_games = self._get_fan_games_info(fan, simulated_date)
@@ -108,12 +160,82 @@ class ChatService:
             "fan_preferences": preferences,
         }
 
-    def _get_restaurants_by_city(self, city: str):
-        return self.data_service.get_restaurants_by_city(city)
+    def _get_answer_context(self, fan: Dict[str, Any], simulated_date: str) -> tuple:
+        """What a cached answer for this fan depends on: city, date, team, preferences and data version"""
+        stay = (self.data_service.get_fan_current_hotel(fan, simulated_date)
+                or self.data_service.get_fan_next_hotel(fan, simulated_date))
+        city = stay["hotel"]["city"] if stay else None
+        preferences = tuple(sorted(
+            (category, tuple(values) if isinstance(values, list) else values)
+            for category, values in fan.get('preferences', {}).items()
+        ))
+        return (city, simulated_date, fan.get('team_supported'), preferences, self.data_service.data_version)
+
+    def _get_tool_fan(self, fan_id: Any) -> Optional[Dict[str, Any]]:
+        return self.data_service.get_fan_by_id(fan_id) if fan_id is not None else None
+
+    def _get_restaurants_by_city(self, city: str, fan_id: Any = None, limit: int = 5):
+        restaurants = self.data_service.get_restaurants_by_city(city)
+        return rank_restaurants(restaurants, self._get_tool_fan(fan_id), limit)
+
+    def _get_attractions_by_city(self, city: str, fan_id: Any = None, limit: int = 5):
+        attractions = self.data_service.get_attractions_by_city(city)
+        return rank_attractions(attractions, self._get_tool_fan(fan_id), limit)
+
+    def _get_games_within_this_week(self, simulated_date: str, fan_id: Any = None, limit: int = 20):
+        games = self.data_service.get_games_within_this_week(simulated_date)
+        return select_games(games, self._get_tool_fan(fan_id), limit, self.data_service.get_stadium_by_id)
+
+    def _get_places_near(self, category: str, place_name: str, limit: int = 5, radius_km: float = None):
+        match = self.data_service.find_place_by_name(place_name)
+        if not match:
+            return {"error": f"No hotel, stadium or attraction named '{place_name}'"}
+        near_category, place = match
+        places = self.data_service.get_places_near_place(category, near_category, place['id'], limit, radius_km)
+        return [PROJECTIONS[category](p) for p in places or []]
+
+    def _get_team_standing(self, simulated_date: str, team: Optional[str] = None, fan_id: Any = None):
+        if not team:
+            fan = self._get_tool_fan(fan_id)
+            team = fan.get('team_supported') if fan else None
+        if not team:
+            return {"error": "No team given and the fan does not support a team"}
+        standing = self.data_service.get_team_standing(team, simulated_date)
+        if standing is None:
+            return {"error": f"No team named '{team}' in the tournament"}
+        return project_standing(standing, self.data_service.get_stadium_by_id)
+
+    def _get_travel_time(self, simulated_date: str, origin: Optional[str] = None,
+                         destination: Optional[str] = None, fan_id: Any = None):
+        fan = self._get_tool_fan(fan_id)
+        leg = self.data_service.get_fan_trips([fan], simulated_date)[0] if fan else None
+        if origin is None and destination is None:
+            if leg is None or leg["trip"] is None:
+                return {"error": "No upcoming game with a known hotel and stadium; give an origin and a destination"}
+            game = leg["game"]
+            return {"origin": leg["hotel"]["name"], "destination": leg["stadium"]["name"],
+                    "game": f"{game['team_a']} vs {game['team_b']} on {game['date']}", **leg["trip"]}
+
+        if origin is not None:
+            start = self.data_service.find_place_by_name(origin)
+        else:
+            stay = self.data_service.get_fan_current_hotel(fan, simulated_date) if fan else None
+            start = ("hotels", stay["hotel"]) if stay else None
+        if destination is not None:
+            end = self.data_service.find_place_by_name(destination)
+        else:
+            stadium = leg["stadium"] if leg else None
+            end = ("stadiums", self.data_service.get_stadium_by_id(stadium["id"])) if stadium else None
+        for name, place, default in ((origin, start, "the fan's hotel"), (destination, end, "the fan's next stadium")):
+            if place is None:
+                return {"error": f"No place named '{name}'" if name else f"Could not find {default}; name the place"}
 
-    def _get_attractions_by_city(self, city: str):
-        return self.data_service.get_attractions_by_city(city)
+        trips = self.data_service.get_travel(start[0], start[1]['id'], end[0], end[1]['id'])
+        if not trips:
+            return {"error": "No coordinates known for one of these places"}
+        return {"origin": start[1]['name'], "destination": end[1]['name'],
+                **{k: trips[0][k] for k in ("distance_km", "travel_minutes", "mode")}}
 
-    def _get_games_within_this_week(self, simulated_date: str):
-        return self.data_service.get_games_within_this_week(simulated_date)
-        
\ No newline at end of file
+    def _search(self, query: str, category: Optional[str] = None, city: Optional[str] = None, limit: int = 5):
+        results = self.data_service.search(query, [category] if category else None, limit, city)
+        return [{"category": r["category"], **PROJECTIONS[r["category"]](r["item"])} for r in results]
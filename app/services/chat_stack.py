@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Optional
+from services.chat_service import ChatService
+from services.metrics import metrics
+
+
+class ChatStack:
+    """
+    Everything the chat endpoints need from the LLM libraries (LangChain,
+    LangGraph, OpenAI): the agent graph and its tools, the chat histories and
+    the conversation context. The libraries are imported here, not at module
+    level, so an instance that never answers a chat request never loads them.
+    """
+
+    def __init__(self, chat_service: ChatService):
+        from langchain_core.messages import AIMessage, HumanMessage
+        from services.agent_tools import build_agent_tools
+        from services.context_service import create_conversation_context
+        from services.history_service import create_history_store
+        from services.langgraph_service import chatbot, chatbot_config, get_llm
+
+        self.AIMessage = AIMessage
+        self.HumanMessage = HumanMessage
+        self.chatbot_config = chatbot_config
+        self.tools = build_agent_tools(chat_service)
+        self.histories = create_history_store()
+        self.context = create_conversation_context(self.histories, get_llm)
+        self._chatbot = chatbot
+
+    def graph(self):
+        """The compiled agent graph with the chat tools"""
+        return self._chatbot(self.tools)
+
+
+class LazyChatStack:
+    """Builds the ChatStack on first use, once, and records how long that took"""
+
+    def __init__(self, chat_service: ChatService):
+        self.chat_service = chat_service
+        self.load_seconds = 0.0
+        self._stack: Optional[ChatStack] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._stack is not None
+
+    def get(self) -> ChatStack:
+        stack = self._stack
+        if stack is None:
+            with self._lock:
+                if self._stack is None:
+                    started = time.perf_counter()
+                    with metrics.span("chat_stack_load"):
+                        self._stack = ChatStack(self.chat_service)
+                    self.load_seconds = time.perf_counter() - started
+                stack = self._stack
+        return stack
@@ -0,0 +1,78 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class QueueFullError(Exception):
+    """Raised when a request cannot get an upstream slot; carries a Retry-After hint in seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many concurrent requests, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Caps concurrent upstream (LLM) calls at `max_concurrent`, lets at most
+    `max_queue` more requests wait for a slot, and rejects the rest straight
+    away with QueueFullError. Thread-safe, so one limiter is shared by every
+    request thread of a worker.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: Optional[float] = 30.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        # Moving average of how long a slot is held, for Retry-After
+        self._avg_hold = 1.0
+
+    def retry_after(self) -> int:
+        backlog = (self.waiting + self.active) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(self._avg_hold * backlog))
+
+    def _enqueue(self):
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(self.retry_after())
+            self.waiting += 1
+
+    def _dequeue(self, acquired: bool):
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.active += 1
+            else:
+                self.rejected += 1
+
+    def _release(self, started: float):
+        with self._lock:
+            self.active -= 1
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * (time.monotonic() - started)
+        self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        """Hold an upstream slot for the duration of a block"""
+        if not self._slots.acquire(blocking=False):
+            self._enqueue()
+            acquired = self._slots.acquire(timeout=self.queue_timeout) if self.queue_timeout is not None else self._slots.acquire()
+            self._dequeue(acquired)
+            if not acquired:
+                raise QueueFullError(self.retry_after())
+        else:
+            with self._lock:
+                self.active += 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(started)
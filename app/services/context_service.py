@@ -0,0 +1,133 @@
+import os
+from typing import Any, Callable, List, Optional
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from services.history_service import HistoryStore
+
+Summarizer = Callable[[str, List[BaseMessage]], str]
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def _message_tokens(message: BaseMessage) -> int:
+    return count_tokens(str(message.content)) + 4
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def extractive_summarizer(summary_tokens: int) -> Summarizer:
+    """Fold turns into the summary as clipped one-liners, dropping the oldest lines past the budget"""
+    def summarize(previous: str, messages: List[BaseMessage]) -> str:
+        lines = previous.splitlines() if previous else []
+        for message in messages:
+            speaker = "Fan" if message.type == "human" else "Assistant"
+            lines.append(f"- {speaker}: {_clip(message.content, 160)}")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > summary_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+    return summarize
+
+
+def llm_summarizer(llm: Any, summary_tokens: int) -> Summarizer:
+    """Fold turns into the summary by asking the chat model to update it"""
+    def summarize(previous: str, messages: List[BaseMessage]) -> str:
+        transcript = "\n".join(
+            f"{'Fan' if m.type == 'human' else 'Assistant'}: {m.content}" for m in messages
+        )
+        prompt = (
+            f"Update the running summary of a conversation between a World Cup fan and their assistant. "
+            f"Keep names, places, dates and preferences the fan mentioned. "
+            f"Stay under {summary_tokens * 3 // 4} words.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"
+        )
+        return str(llm.invoke([HumanMessage(content=prompt)]).content)
+    return summarize
+
+
+class ConversationContext:
+    """
+    Builds the message list sent to the model for each turn: the most recent
+    turns that fit in `token_budget`, preceded by a rolling summary of every
+    older turn. Summaries are kept with the conversation in the history store
+    (so they are evicted, expire and are cleared along with it) and record the
+    sequence number of the last message they cover, so only the turns that
+    fell out of the window since the last call are folded in.
+    """
+
+    def __init__(self, history: HistoryStore, token_budget: int = 3000, summary_tokens: int = 500,
+                 summarizer: Optional[Summarizer] = None):
+        self.history = history
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or extractive_summarizer(summary_tokens)
+
+    def build(self, user_id: Any, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Get the windowed messages for a conversation, summarizing what falls outside"""
+        start = self._window_start(messages)
+        upto, summary = self.history.get_summary(user_id)
+
+        older = messages[:start]
+        unfolded = older[self._folded_count(older, upto):]
+        if unfolded:
+            summary = self.summarizer(summary, unfolded)
+            upto = self._sequence(older[-1])
+            if upto is not None:
+                self.history.set_summary(user_id, upto, summary)
+
+        window = messages[start:]
+        if not summary:
+            return window
+        return [SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")] + window
+
+    def _window_start(self, messages: List[BaseMessage]) -> int:
+        # Walk back from the newest message while it fits, always keeping the
+        # latest one, then move forward so the window starts on a fan turn.
+        used = 0
+        start = len(messages)
+        while start > 0:
+            cost = _message_tokens(messages[start - 1])
+            if start < len(messages) and used + cost > self.token_budget:
+                break
+            used += cost
+            start -= 1
+        while start < len(messages) - 1 and messages[start].type != "human":
+            start += 1
+        return start
+
+    @staticmethod
+    def _sequence(message: BaseMessage) -> Optional[int]:
+        return int(message.id) if message.id and str(message.id).isdigit() else None
+
+    def _folded_count(self, older: List[BaseMessage], upto: Optional[int]) -> int:
+        # Messages numbered up to `upto` are in the summary; anything after
+        # them (including everything, once they were trimmed) is new
+        if upto is None:
+            return 0
+        count = 0
+        for message in older:
+            sequence = self._sequence(message)
+            if sequence is None or sequence > upto:
+                break
+            count += 1
+        return count
+
+
+def create_conversation_context(history: HistoryStore, llm_factory: Callable[[], Any] = None) -> ConversationContext:
+    """
+    Build the conversation context from the environment:
+    DALIL_CONTEXT_TOKEN_BUDGET, DALIL_CONTEXT_SUMMARY_TOKENS and
+    DALIL_CONTEXT_SUMMARIZER ("extractive" or "llm").
+    """
+    token_budget = int(os.environ.get("DALIL_CONTEXT_TOKEN_BUDGET", 3000))
+    summary_tokens = int(os.environ.get("DALIL_CONTEXT_SUMMARY_TOKENS", 500))
+    summarizer = None
+    if os.environ.get("DALIL_CONTEXT_SUMMARIZER", "extractive") == "llm" and llm_factory:
+        def summarizer(previous, messages):
+            return llm_summarizer(llm_factory(), summary_tokens)(previous, messages)
+
+    return ConversationContext(history, token_budget, summary_tokens, summarizer)
@@ -1,24 +1,155 @@
 import os
-import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from services.timeline import GameTimeline, date_ordinal
+from services.geo_service import coordinates
+from services import fast_json
+from services.snapshot import ensure_snapshot
+from services.dataset import (
+    Dataset, DataValidationError, DATA_FILES, PLACE_CATEGORIES, SEARCH_CATEGORIES, validate_collections
+)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+def standings_payload(dataset: Dataset, date: str, group: Optional[str] = None) -> Dict[str, Any]:
+    """Group tables (all, or one group) and the knockout bracket of a dataset as of a date"""
+    tables = dataset.standings.tables(date)
+    if group is not None:
+        tables = {g: table for g, table in tables.items() if g.lower() == group.lower()}
+    return {"date": date, "groups": tables, "knockout": dataset.standings.bracket(date)}
+
 
 class DataService:
     """
     Service for handling all data operations related to the World Cup 2034 application.
     This centralizes data loading, processing, and querying functionality.
+
+    The loaded data, the simulated date and the games view for that date are
+    held together in one tuple that is replaced as a whole, so reload() and
+    update_simulated_date() never expose a half-updated state to readers.
+
+    With a snapshot path, records are read from a memory-mapped snapshot of
+    the data directory (compiled when missing or stale) instead of parsed
+    JSON, so worker processes share one copy of the data.
     """
     
-    def __init__(self, simulated_date):
-        self.raw_games = self.load_games()
-        self.stadiums = self.load_stadiums()
-        self.fans = self.load_fans()
-        self.hotels = self.load_hotels()
-        self.restaurants = self.load_restaurants()
-        self.attractions = self.load_attractions()
-        
-        self.simulated_date = simulated_date
-        self.games = self.process_games_for_date(self.raw_games, self.simulated_date)
+    def __init__(self, simulated_date, data_dir: Optional[str] = None, compact: bool = False,
+                 snapshot: Optional[str] = None):
+        self.data_dir = data_dir or DEFAULT_DATA_DIR
+        self.compact = compact
+        self.snapshot = snapshot
+        self._listeners: List[Callable[..., None]] = []
+        self._write_lock = threading.Lock()
+        dataset = self._load_dataset(version=1, previous=None)
+        self._state: Tuple[Dataset, str, List[Dict[str, Any]]] = (
+            dataset, simulated_date, dataset.timeline.view(simulated_date)
+        )
+    
+    @property
+    def state(self) -> Tuple[Dataset, str, List[Dict[str, Any]]]:
+        """(dataset, simulated date, games view), read together so they always match"""
+        return self._state
+
+    @property
+    def dataset(self) -> Dataset:
+        return self._state[0]
+    
+    @property
+    def simulated_date(self) -> str:
+        return self._state[1]
+    
+    @property
+    def games(self) -> List[Dict[str, Any]]:
+        return self._state[2]
+    
+    @property
+    def data_version(self) -> int:
+        return self._state[0].version
+    
+    @property
+    def raw_games(self) -> List[Dict[str, Any]]:
+        return self._state[0].raw_games
+    
+    @property
+    def stadiums(self) -> List[Dict[str, Any]]:
+        return self._state[0].stadiums
+    
+    @property
+    def fans(self) -> List[Dict[str, Any]]:
+        return self._state[0].fans
+    
+    @property
+    def hotels(self) -> List[Dict[str, Any]]:
+        return self._state[0].hotels
+    
+    @property
+    def restaurants(self) -> List[Dict[str, Any]]:
+        return self._state[0].restaurants
+    
+    @property
+    def attractions(self) -> List[Dict[str, Any]]:
+        return self._state[0].attractions
+    
+    @property
+    def store(self):
+        return self._state[0].store
+    
+    @property
+    def timeline(self) -> GameTimeline:
+        return self._state[0].timeline
+    
+    @property
+    def geo(self):
+        return self._state[0].geo
+    
+    def subscribe(self, listener: Callable[..., None]):
+        """Register a callback run as listener(event, **details) when the data or the simulated date changes.
+
+        Events are "date" (with previous_date and date) and "reload" (with version).
+        """
+        self._listeners.append(listener)
+    
+    def _notify(self, event: str, **details):
+        for listener in list(self._listeners):
+            listener(event, **details)
+    
+    def _load_dataset(self, version: int, previous: Optional[Dataset]) -> Dataset:
+        """Load and validate every data file, then build a new Dataset with its indexes"""
+        if self.snapshot:
+            # Validated when the snapshot was compiled; the tables are already read-only
+            collections = ensure_snapshot(self.data_dir, self.snapshot).tables
+            return Dataset(version, previous=previous, **collections)
+        collections = {
+            'games': self.load_games(),
+            'stadiums': self.load_stadiums(),
+            'fans': self.load_fans(),
+            'hotels': self.load_hotels(),
+            'restaurants': self.load_restaurants(),
+            'attractions': self.load_attractions(),
+        }
+        errors = validate_collections(collections)
+        if errors:
+            raise DataValidationError(errors)
+        return Dataset(version, compact=self.compact, previous=previous, **collections)
+    
+    def reload(self) -> int:
+        """Reload the data directory and swap it in, returning the new data version.
+
+        Raises DataValidationError (and keeps serving the current data) if the files are invalid.
+        """
+        with self._write_lock:
+            previous, simulated_date, _ = self._state
+            dataset = self._load_dataset(previous.version + 1, previous)
+            self._state = (dataset, simulated_date, dataset.timeline.view(simulated_date))
+        self._notify("reload", version=dataset.version)
+        return dataset.version
+    
+    def data_files(self) -> List[str]:
+        """Paths of the data files a reload reads"""
+        if self.snapshot and not os.path.isdir(self.data_dir):
+            return [self.snapshot]
+        return [os.path.join(self.data_dir, filename) for filename in DATA_FILES.values()]
     
     def load_games(self) -> List[Dict[str, Any]]:
         """Load games data from JSON file"""
@@ -47,61 +178,113 @@ class DataService:
     def _load_data(self, filename: str) -> List[Dict[str, Any]]:
         """Load data from JSON files"""
         try:
-            filepath = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', filename)
-            with open(filepath, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading {filename}: {e}")
-            return []
+            return fast_json.load_file(os.path.join(self.data_dir, filename))
+        except (OSError, ValueError) as e:
+            raise DataValidationError([f"{filename}: {e}"]) from e
     
     def get_game_by_id(self, game_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific game by ID"""
-        return next((g for g in self.games if g['id'] == game_id), None)
+        dataset, _, games = self._state
+        position = dataset.store.games.position(game_id)
+        return None if position is None else games[position]
     
     def get_stadium_by_id(self, stadium_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific stadium by ID"""
-        return next((s for s in self.stadiums if s['id'] == stadium_id), None)
+        return self.store.stadiums.get(stadium_id)
     
     def get_fan_by_id(self, fan_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific fan by ID"""
-        return next((f for f in self.fans if f['id'] == fan_id), None)
+        return self.store.fans.get(fan_id)
     
     def get_hotel_by_id(self, hotel_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific hotel by ID"""
-        return next((h for h in self.hotels if h['id'] == hotel_id), None)
+        return self.store.hotels.get(hotel_id)
     
     def get_restaurant_by_id(self, restaurant_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific restaurant by ID"""
-        return next((r for r in self.restaurants if r['id'] == restaurant_id), None)
+        return self.store.restaurants.get(restaurant_id)
     
     def get_attraction_by_id(self, attraction_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific attraction by ID"""
-        return next((a for a in self.attractions if a['id'] == attraction_id), None)
+        return self.store.attractions.get(attraction_id)
     
     def get_games_for_date(self, date: str) -> List[Dict[str, Any]]:
         """Get all games scheduled for a specific date"""
-        return [g for g in self.games if g['date'] == date]
+        dataset, _, games = self._state
+        return [games[p] for p in dataset.store.games.positions('date', date)]
     
     def get_games_for_team(self, team_name: str, current_date: str = None) -> List[Dict[str, Any]]:
         """Get all games for a specific team, optionally filtered by current date"""
+        dataset, _, games = self._state
+        team = team_name.lower()
+        positions = set()
+        for key in dataset.store.games.keys('team'):
+            if team in key:
+                positions.update(dataset.store.games.positions('team', key))
+        
+        current = date_ordinal(current_date) if current_date else None
         team_games = []
-        for game in self.games:
+        for position in sorted(positions):
+            game = games[position]
             is_team_involved = (
-                team_name.lower() in game["team_a"].lower() or
-                team_name.lower() in game["team_b"].lower()
+                team in game["team_a"].lower() or
+                team in game["team_b"].lower()
             )
             
             if is_team_involved:
-                if current_date:
-                    game_date = datetime.strptime(game['date'], "%Y-%m-%d")
-                    current = datetime.strptime(current_date, "%Y-%m-%d")
-                    if game_date < current:
-                        continue
+                if current_date and dataset.timeline.ordinals[position] < current:
+                    continue
                 
                 team_games.append(game)
         
         return team_games
     
+    def query_games(self, ids: Optional[List[int]] = None, date_from: Optional[str] = None,
+                    date_to: Optional[str] = None, team: Optional[str] = None, stage: Optional[str] = None,
+                    city: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the games matching every given filter (dates inclusive), in date order, from the indexes"""
+        dataset, _, games = self._state
+        index = dataset.store.games
+        candidates = []
+        if ids is not None:
+            candidates.append({p for p in map(index.position, ids) if p is not None})
+        if date_from or date_to:
+            start = date_ordinal(date_from) if date_from else 0
+            end = date_ordinal(date_to) + 1 if date_to else date_ordinal("9999-12-31")
+            candidates.append(set(dataset.timeline.positions_between(start, end)))
+        if team:
+            candidates.append(set(index.positions('team', team.lower())))
+        if stage:
+            candidates.append(set(index.positions('stage', stage)))
+        if city:
+            candidates.append(set(index.positions('city', city.lower())))
+        
+        positions = set.intersection(*candidates) if candidates else range(len(games))
+        if team:
+            # Knockout teams stay "TBD" in the view until the game's date
+            team = team.lower()
+            positions = [p for p in positions if team in (games[p]['team_a'].lower(), games[p]['team_b'].lower())]
+        ordinals = dataset.timeline.ordinals
+        return [games[p] for p in sorted(positions, key=lambda p: (ordinals[p], p))]
+    
+    def query_fans(self, ids: Optional[List[int]] = None, team: Optional[str] = None,
+                   city: Optional[str] = None, game_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the fans matching every given filter (city of any hotel stay, attending a game), in id order"""
+        dataset = self.dataset
+        index = dataset.store.fans
+        candidates = []
+        if ids is not None:
+            candidates.append({p for p in map(index.position, ids) if p is not None})
+        if team:
+            candidates.append(set(index.positions('team', team.lower())))
+        if city:
+            candidates.append(set(index.positions('city', city.lower())))
+        if game_id is not None:
+            candidates.append(set(index.positions('game', game_id)))
+        
+        positions = set.intersection(*candidates) if candidates else range(len(dataset.fans))
+        return [dataset.fans[p] for p in sorted(positions)]
+    
     def get_restaurants(self) -> List[Dict[str, Any]]:
         """Get all restaurants"""
         return self.restaurants
@@ -112,142 +295,173 @@ class DataService:
 
     def get_restaurants_by_city(self, city: str) -> List[Dict[str, Any]]:
         """Get restaurants by city, safely handling missing 'city' fields"""
-        return [r for r in self.restaurants if r.get('city', '').lower() == city.lower()]
+        return self.store.restaurants.find('city', city.lower())
     
     def get_attractions_by_city(self, city: str) -> List[Dict[str, Any]]:
         """Get attractions by city, safely handling missing 'city' fields"""
-        return [a for a in self.attractions if a.get('city', '').lower() == city.lower()]
+        return self.store.attractions.find('city', city.lower())
+    
+    def get_fan_itinerary(self, fan: Dict[str, Any]):
+        """Get the fan's materialized itinerary (stays and games joined and sorted by date)"""
+        return self.dataset.itineraries.get(fan)
     
     def get_fan_current_hotel(self, fan: Dict[str, Any], current_date: str) -> Optional[Dict[str, Any]]:
         """Get a fan's current hotel based on the simulated date"""
         if 'hotel_stays' not in fan:
             return None
-        
-        current = datetime.strptime(current_date, "%Y-%m-%d")
-        
-        for stay in fan['hotel_stays']:
-            check_in = datetime.strptime(stay['check_in'], "%Y-%m-%d")
-            check_out = datetime.strptime(stay['check_out'], "%Y-%m-%d")
-            
-            if check_in <= current < check_out:
-                hotel = self.get_hotel_by_id(stay['hotel_id'])
-                if hotel:
-                    return {
-                        "hotel": hotel,
-                        "check_in": stay['check_in'],
-                        "check_out": stay['check_out'],
-                        "days_left": (check_out - current).days
-                    }
-        
-        return None
+        return self.get_fan_itinerary(fan).current_stay(date_ordinal(current_date))
     
     def get_fan_next_hotel(self, fan: Dict[str, Any], current_date: str) -> Optional[Dict[str, Any]]:
         """Get a fan's next hotel stay after the current date"""
         if 'hotel_stays' not in fan:
             return None
-        
-        current = datetime.strptime(current_date, "%Y-%m-%d")
-        
-        future_stays = [
-            stay for stay in fan['hotel_stays']
-            if datetime.strptime(stay['check_in'], "%Y-%m-%d") > current
-        ]
-        
-        if not future_stays:
-            return None
-        
-        next_stay = min(future_stays, key=lambda s: datetime.strptime(s['check_in'], "%Y-%m-%d"))
-        hotel = self.get_hotel_by_id(next_stay['hotel_id'])
-        
-        if hotel:
-            check_in = datetime.strptime(next_stay['check_in'], "%Y-%m-%d")
-            return {
-                "hotel": hotel,
-                "check_in": next_stay['check_in'],
-                "check_out": next_stay['check_out'],
-                "days_until": (check_in - current).days
-            }
-        
-        return None
+        return self.get_fan_itinerary(fan).next_stay(date_ordinal(current_date))
     
     def get_fan_hotel_stays(self, fan: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get all hotel stays for a fan with hotel details"""
         if 'hotel_stays' not in fan:
             return []
-        
-        hotel_stays = []
-        for stay in fan['hotel_stays']:
-            hotel = self.get_hotel_by_id(stay['hotel_id'])
-            if hotel:
-                hotel_stays.append({
-                    "hotel": hotel,
-                    "check_in": stay['check_in'],
-                    "check_out": stay['check_out']
-                })
-        
-        return hotel_stays
+        return [dict(stay) for stay in self.get_fan_itinerary(fan).stays]
     
     def get_fan_attending_games(self, fan: Dict[str, Any], current_date: str = None) -> List[Dict[str, Any]]:
         """Get all games a fan is attending, with optional date filtering"""
         if 'attending_games' not in fan:
             return []
-        
-        games = []
-        for game_id in fan['attending_games']:
-            game = self.get_game_by_id(game_id)
-            if game:
-                if current_date:
-                    game_date = datetime.strptime(game['date'], "%Y-%m-%d")
-                    current = datetime.strptime(current_date, "%Y-%m-%d")
-                    game['is_past'] = game_date < current
-                
-                stadium = self.get_stadium_by_id(game['stadium_id'])
-                if stadium:
-                    game['stadium_name'] = stadium['name']
-                    game['stadium_city'] = stadium['city']
-                
-                games.append(game)
-        
-        if games:
-            games.sort(key=lambda g: datetime.strptime(g['date'], "%Y-%m-%d"))
-        
-        return games
+        dataset, _, games = self._state
+        current = date_ordinal(current_date) if current_date else None
+        # Annotated copies: the game dicts in the view are shared between requests
+        return dataset.itineraries.get(fan).games(games, current)
     
     def process_games_for_date(self, games: List[Dict[str, Any]], current_date: str) -> List[Dict[str, Any]]:
         """Process games based on the current date to hide/show appropriate information"""
-        current = datetime.strptime(current_date, "%Y-%m-%d")
-        processed_games = []
-        
-        for game in games:
-            game_copy = game.copy()
-            game_date = datetime.strptime(game['date'], "%Y-%m-%d")
-            one_day_before = game_date - timedelta(days=1)
-            
-            if game['stage'] != 'group':
-                if current < one_day_before + timedelta(days=1):  
-                    game_copy['team_a'] = "TBD"
-                    game_copy['team_b'] = "TBD"
-                    game_copy['result'] = None
-                    game_copy['winner'] = None
-                elif current < game_date:
-                    game_copy['result'] = None
-                    game_copy['winner'] = None
-            elif current < game_date:
-                game_copy['result'] = None
-                game_copy['winner'] = None
-            processed_games.append(game_copy)
-        
-        return processed_games
+        dataset = self.dataset
+        timeline = dataset.timeline if games is dataset.raw_games else GameTimeline(games)
+        return timeline.view(current_date)
     
     def update_simulated_date(self, new_date: str):
         """Update the simulated date and refresh processed games"""
-        self.simulated_date = new_date
-        self.games = self.process_games_for_date(self.raw_games, self.simulated_date)
+        with self._write_lock:
+            dataset, previous_date, _ = self._state
+            self._state = (dataset, new_date, dataset.timeline.view(new_date))
+        self._notify("date", previous_date=previous_date, date=new_date)
     
     def get_games_within_this_week(self, simulated_date: str) -> List[Dict[str, Any]]:
         """Get all games within the next week and previous week from the simulated date"""
-        current = datetime.strptime(simulated_date, "%Y-%m-%d")
-        one_week_later = current + timedelta(days=7)
-        one_week_ago = current - timedelta(days=7)
-        return [g for g in self.games if one_week_ago <= datetime.strptime(g['date'], "%Y-%m-%d") < one_week_later]
-       
\ No newline at end of file
+        current = date_ordinal(simulated_date)
+        dataset, _, games = self._state
+        return [games[p] for p in dataset.timeline.positions_between(current - 7, current + 7)]
+    
+    def get_standings(self, date: Optional[str] = None, group: Optional[str] = None) -> Dict[str, Any]:
+        """Group tables and the knockout bracket as of a date (the simulated date by default)"""
+        dataset, simulated_date, _ = self._state
+        return standings_payload(dataset, date or simulated_date, group)
+    
+    def get_team_standing(self, team_name: str, date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """A team's group table, knockout results, status and next game as of a date, or None if unknown"""
+        dataset, simulated_date, _ = self._state
+        date = date or simulated_date
+        team = dataset.standings.find_team(team_name)
+        if team is None:
+            return None
+        standing = dataset.standings.team(team, date)
+        return {"date": date, **standing, "table": dataset.standings.tables(date)[standing["group"]]}
+    
+    def get_place(self, category: str, place_id: int) -> Optional[Dict[str, Any]]:
+        """Get a hotel, restaurant, attraction or stadium by category and ID"""
+        if category not in PLACE_CATEGORIES:
+            return None
+        return getattr(self.store, category).get(place_id)
+    
+    def find_place_by_name(self, name: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Find a hotel, stadium or attraction by (partial) name, preferring exact matches"""
+        name = name.strip().lower()
+        partial = None
+        for category in ('hotels', 'stadiums', 'attractions', 'restaurants'):
+            for place in getattr(self, category):
+                place_name = place.get('name', '').lower()
+                if place_name == name:
+                    return category, place
+                if partial is None and name and name in place_name:
+                    partial = (category, place)
+        return partial
+    
+    def get_nearby_places(self, category: str, lat: float, lon: float,
+                          limit: int = 5, radius_km: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Get the closest places of a category to a point, with their distance in km"""
+        results = self.geo.nearest(category, lat, lon, limit, radius_km)
+        return [{**place, "distance_km": round(distance, 2)} for distance, place in results]
+    
+    def get_places_near_place(self, category: str, near_category: str, near_id: int,
+                              limit: int = 5, radius_km: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """Get the closest places of a category to a hotel, restaurant, attraction or stadium"""
+        place = self.get_place(near_category, near_id)
+        point = coordinates(place) if place else None
+        if point is None:
+            return None
+        # Over-fetch by one so the reference place itself can be left out
+        nearby = self.get_nearby_places(category, point[0], point[1], limit + 1, radius_km)
+        return [p for p in nearby if not (category == near_category and p['id'] == near_id)][:limit]
+    
+    def get_travel(self, from_category: str, from_id: int, to_category: str,
+                   to_id: Optional[int] = None, limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """Distance and estimated travel time from a place to one place, or to every place of a category (quickest first)"""
+        travel = self.dataset.travel
+        if from_category not in PLACE_CATEGORIES or to_category not in PLACE_CATEGORIES \
+                or travel.row(from_category, from_id) is None:
+            return None
+        if to_id is None:
+            return [{**place, **trip} for place, trip in travel.from_place(from_category, from_id, to_category, limit)]
+        trip = travel.trips(from_category, [from_id], to_category, [to_id])[0]
+        if trip is None:
+            return None
+        return [{**self.get_place(to_category, to_id), **trip}]
+    
+    def get_fan_trips(self, fans: List[Dict[str, Any]], current_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """For each fan, the trip from their hotel on the day of their next game to its stadium, in one batch"""
+        dataset, simulated_date, games = self._state
+        if current_date:
+            games = dataset.timeline.view(current_date)
+        current = date_ordinal(current_date or simulated_date)
+        legs = []
+        for fan in fans:
+            itinerary = dataset.itineraries.get(fan)
+            index = bisect_left(itinerary.game_ordinals, current)
+            if index == len(itinerary.game_positions):
+                legs.append((fan, None, None, None))
+                continue
+            stay = itinerary.current_stay(itinerary.game_ordinals[index]) or itinerary.current_stay(current)
+            legs.append((fan, games[itinerary.game_positions[index]], stay['hotel'] if stay else None,
+                         itinerary.game_stadiums[index]))
+
+        trips = dataset.travel.trips(
+            'hotels', [hotel['id'] if hotel else None for _, _, hotel, _ in legs],
+            'stadiums', [stadium['id'] if stadium else None for _, _, _, stadium in legs],
+        )
+        return [
+            {
+                "fan_id": fan['id'],
+                "game": game,
+                "hotel": {"id": hotel['id'], "name": hotel['name'], "city": hotel['city']} if hotel else None,
+                "stadium": {"id": stadium['id'], "name": stadium['name'], "city": stadium['city']} if stadium else None,
+                "trip": trip,
+            }
+            for (fan, game, hotel, stadium), trip in zip(legs, trips)
+        ]
+    
+    def get_places_in_bbox(self, categories: List[str], south: float, west: float,
+                           north: float, east: float) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the places of each category inside a bounding box, for the map view"""
+        return {
+            category: self.geo.in_bbox(category, south, west, north, east)
+            for category in categories if category in PLACE_CATEGORIES
+        }
+    
+    def search(self, query: str, categories: Optional[List[str]] = None, limit: int = 10,
+               city: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Full-text search over hotels, restaurants, attractions, stadiums and teams, best match first"""
+        if categories:
+            categories = [c for c in categories if c in SEARCH_CATEGORIES]
+        return [
+            {"category": category, "score": round(score, 3), "item": record}
+            for score, category, record in self.dataset.search.search(query, categories, limit, city)
+        ]
@@ -0,0 +1,62 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from services.dataset import DataValidationError
+
+
+class DataWatcher:
+    """
+    Polls the data files every `interval` seconds and reloads the DataService
+    once a change has settled (the files look the same on two polls in a row),
+    so a copy that is still being written is not picked up half-way. A reload
+    that fails validation is logged and the current data keeps being served
+    until the files change again.
+    """
+
+    def __init__(self, data_service, interval: float = 2.0):
+        self.data_service = data_service
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _fingerprint(self) -> Tuple[Tuple[str, int, int], ...]:
+        stamps = []
+        for path in self.data_service.data_files():
+            try:
+                stat = os.stat(path)
+                stamps.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append((path, -1, -1))
+        return tuple(stamps)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dalil-data-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        loaded = self._fingerprint()
+        pending = None
+        while not self._stop.wait(self.interval):
+            current = self._fingerprint()
+            if current == loaded:
+                pending = None
+                continue
+            if current != pending:
+                # Changed since the last poll; wait for the writer to finish
+                pending = current
+                continue
+            loaded, pending = current, None
+            try:
+                version = self.data_service.reload()
+                print(f"Reloaded data (version {version})")
+            except DataValidationError as e:
+                print(f"Rejected data reload: {e}")
+            except Exception as e:
+                print(f"Error reloading data: {e}")
+
+    def status(self) -> Dict[str, object]:
+        return {"interval": self.interval, "running": bool(self._thread and self._thread.is_alive())}
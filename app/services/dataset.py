@@ -0,0 +1,148 @@
+from typing import Dict, List, Any, Optional
+from services.entity_store import EntityStore
+from services.timeline import GameTimeline, date_ordinal
+from services.geo_service import GeoIndex
+from services.records import RecordTable
+from services.search_service import SearchIndex, team_documents
+from services.itinerary import ItineraryStore
+from services.standings import Standings
+from services.travel import TravelMatrix
+
+PLACE_CATEGORIES = ('hotels', 'restaurants', 'attractions', 'stadiums')
+SEARCH_CATEGORIES = PLACE_CATEGORIES + ('teams',)
+
+DATA_FILES = {
+    'games': 'games.json',
+    'stadiums': 'stadiums.json',
+    'fans': 'fans.json',
+    'hotels': 'hotels.json',
+    'restaurants': 'restaurants.json',
+    'attractions': 'attractions.json',
+}
+
+REQUIRED_FIELDS = {
+    'games': ('team_a', 'team_b', 'date', 'stage', 'stadium_id'),
+    'stadiums': ('name', 'city'),
+    'fans': ('name', 'nationality', 'team_supported'),
+    'hotels': ('name', 'city'),
+    'restaurants': ('name',),
+    'attractions': ('name',),
+}
+
+
+class DataValidationError(Exception):
+    """Raised when the data files cannot be loaded or do not form a consistent dataset"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors[:5]) + (f" (+{len(errors) - 5} more)" if len(errors) > 5 else ""))
+        self.errors = errors
+
+
+def _valid_date(value: Any) -> bool:
+    try:
+        date_ordinal(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_key(value: Any) -> bool:
+    # JSON arrays and objects cannot be ids (nor be looked up in a set of them)
+    return not isinstance(value, (list, dict))
+
+
+def validate_collections(collections: Dict[str, Any]) -> List[str]:
+    """Check the shape of every collection and the references between them"""
+    errors = []
+    ids: Dict[str, set] = {}
+
+    for name, fields in REQUIRED_FIELDS.items():
+        records = collections.get(name)
+        if not isinstance(records, list):
+            errors.append(f"{DATA_FILES[name]}: expected a list of records")
+            ids[name] = set()
+            continue
+        seen = set()
+        for position, record in enumerate(records):
+            if not isinstance(record, dict) or 'id' not in record or not _is_key(record['id']):
+                errors.append(f"{DATA_FILES[name]}[{position}]: expected an object with an id")
+                continue
+            if record['id'] in seen:
+                errors.append(f"{DATA_FILES[name]}: duplicate id {record['id']}")
+            seen.add(record['id'])
+            missing = [field for field in fields if record.get(field) is None]
+            if missing:
+                errors.append(f"{DATA_FILES[name]} id {record['id']}: missing {', '.join(missing)}")
+        ids[name] = seen
+
+    for game in collections.get('games') or []:
+        if not isinstance(game, dict):
+            continue
+        if 'date' in game and not _valid_date(game['date']):
+            errors.append(f"games.json id {game.get('id')}: invalid date {game['date']!r}")
+        stadium_id = game.get('stadium_id')
+        if stadium_id is not None and not (_is_key(stadium_id) and stadium_id in ids['stadiums']):
+            errors.append(f"games.json id {game.get('id')}: unknown stadium_id {stadium_id}")
+
+    for fan in collections.get('fans') or []:
+        if not isinstance(fan, dict):
+            continue
+        stays = fan.get('hotel_stays', [])
+        if not isinstance(stays, list):
+            errors.append(f"fans.json id {fan.get('id')}: hotel_stays must be a list")
+            stays = []
+        for position, stay in enumerate(stays):
+            if not isinstance(stay, dict):
+                errors.append(f"fans.json id {fan.get('id')}: hotel_stays[{position}] must be an object")
+                continue
+            if not (_valid_date(stay.get('check_in')) and _valid_date(stay.get('check_out'))):
+                errors.append(f"fans.json id {fan.get('id')}: invalid hotel stay dates")
+            hotel_id = stay.get('hotel_id')
+            if not (_is_key(hotel_id) and hotel_id in ids['hotels']):
+                errors.append(f"fans.json id {fan.get('id')}: unknown hotel_id {hotel_id}")
+        games = fan.get('attending_games', [])
+        if not isinstance(games, list):
+            errors.append(f"fans.json id {fan.get('id')}: attending_games must be a list")
+            games = []
+        for game_id in games:
+            if not (_is_key(game_id) and game_id in ids['games']):
+                errors.append(f"fans.json id {fan.get('id')}: unknown game {game_id}")
+
+    return errors
+
+
+class Dataset:
+    """
+    One complete, validated load of the data directory with every index built
+    over it. A Dataset is never modified once built: reloading builds a new
+    one off to the side and DataService swaps it in with a single assignment,
+    so readers always see either the old data or the new data, never a mix.
+
+    With `compact`, games, hotels and fans are held in column-oriented
+    RecordTables instead of lists of dicts to cut resident memory. Fan
+    itineraries still valid in the `previous` load are carried over.
+    """
+
+    def __init__(self, version: int, games, stadiums, fans, hotels, restaurants, attractions,
+                 compact: bool = False, previous: Optional["Dataset"] = None):
+        if compact:
+            games, hotels, fans = RecordTable(games), RecordTable(hotels), RecordTable(fans)
+        self.version = version
+        self.compact = compact
+        self.raw_games = games
+        self.stadiums = stadiums
+        self.fans = fans
+        self.hotels = hotels
+        self.restaurants = restaurants
+        self.attractions = attractions
+
+        self.timeline = GameTimeline(games)
+        self.standings = Standings(games, self.timeline)
+        self.store = EntityStore(games, stadiums, fans, hotels, restaurants, attractions)
+        self.geo = GeoIndex({category: getattr(self, category) for category in PLACE_CATEGORIES})
+        self.travel = TravelMatrix({category: getattr(self, category) for category in PLACE_CATEGORIES})
+        self.search = SearchIndex({
+            **{category: getattr(self, category) for category in PLACE_CATEGORIES},
+            'teams': team_documents(games),
+        })
+        self.itineraries = ItineraryStore(self, previous.itineraries if previous is not None else None)
@@ -0,0 +1,117 @@
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Callable, Iterable, Hashable
+
+KeyFunc = Callable[[Dict[str, Any]], Iterable[Hashable]]
+
+
+class EntityCollection:
+    """
+    A list of records with an id map and any number of secondary indexes.
+    Indexes hold row positions rather than records, so they also resolve
+    against any list with the same row order (e.g. the games view for the
+    simulated date) without rebuilding anything.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], indexes: Dict[str, KeyFunc] = None):
+        self.records = records
+        self._ids: Dict[Any, int] = {}
+        self._indexes: Dict[str, Dict[Hashable, List[int]]] = {}
+
+        for position, record in enumerate(records):
+            if 'id' in record:
+                self._ids.setdefault(record['id'], position)
+
+        for name, key_func in (indexes or {}).items():
+            index = defaultdict(list)
+            for position, record in enumerate(records):
+                for key in set(key_func(record)):
+                    index[key].append(position)
+            self._indexes[name] = dict(index)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, record_id: Any) -> Optional[Dict[str, Any]]:
+        """Get a record by id"""
+        position = self._ids.get(record_id)
+        return None if position is None else self.records[position]
+
+    def position(self, record_id: Any) -> Optional[int]:
+        """Get the row position of a record by id"""
+        return self._ids.get(record_id)
+
+    def keys(self, index: str) -> Iterable[Hashable]:
+        """Get all the distinct keys of a secondary index"""
+        return self._indexes[index].keys()
+
+    def positions(self, index: str, key: Hashable) -> List[int]:
+        """Get the row positions matching a key, in row order"""
+        return self._indexes[index].get(key, [])
+
+    def find(self, index: str, key: Hashable) -> List[Dict[str, Any]]:
+        """Get the records matching a key, in row order"""
+        records = self.records
+        return [records[p] for p in self.positions(index, key)]
+
+
+def _lower(field: str) -> KeyFunc:
+    def key(record: Dict[str, Any]) -> Iterable[Hashable]:
+        value = record.get(field)
+        return (value.lower(),) if isinstance(value, str) else ()
+    return key
+
+
+def _value(field: str) -> KeyFunc:
+    def key(record: Dict[str, Any]) -> Iterable[Hashable]:
+        return (record[field],) if record.get(field) is not None else ()
+    return key
+
+
+def _each(field: str) -> KeyFunc:
+    def key(record: Dict[str, Any]) -> Iterable[Hashable]:
+        return record.get(field) or ()
+    return key
+
+
+def _teams(record: Dict[str, Any]) -> Iterable[Hashable]:
+    teams = [record[side].lower() for side in ('team_a', 'team_b') if record.get(side)]
+    if record.get('stage') != 'group':
+        # Knockout teams are shown as "TBD" until the simulated date reveals them
+        teams.append('tbd')
+    return teams
+
+
+class EntityStore:
+    """
+    O(1) id lookups and secondary indexes for every dataset the app serves.
+    Rebuilt from scratch whenever the data is loaded.
+    """
+
+    def __init__(self, games, stadiums, fans, hotels, restaurants, attractions):
+        self.stadiums = EntityCollection(stadiums, {'city': _lower('city')})
+        hotel_cities = {h['id']: h.get('city', '').lower() for h in hotels}
+
+        def stay_cities(fan: Dict[str, Any]) -> Iterable[Hashable]:
+            stays = fan.get('hotel_stays') or ()
+            return [hotel_cities[s['hotel_id']] for s in stays if s.get('hotel_id') in hotel_cities]
+
+        self.fans = EntityCollection(fans, {
+            'team': _lower('team_supported'),
+            'game': _each('attending_games'),
+            'city': stay_cities,
+        })
+        self.hotels = EntityCollection(hotels, {'city': _lower('city')})
+        self.restaurants = EntityCollection(restaurants, {'city': _lower('city')})
+        self.attractions = EntityCollection(attractions, {'city': _lower('city')})
+
+        # Games are indexed on the raw fixture list so that team names hidden
+        # by the simulated date are still indexed; callers resolve positions
+        # against the view for the simulated date and re-check it.
+        stadium_cities = {s['id']: s.get('city', '').lower() for s in stadiums}
+        self.games = EntityCollection(games, {
+            'date': _value('date'),
+            'stage': _value('stage'),
+            'team': _teams,
+            'stadium': _value('stadium_id'),
+            'city': lambda g: (stadium_cities[g['stadium_id']],) if g.get('stadium_id') in stadium_cities else (),
+        })
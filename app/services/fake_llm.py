@@ -0,0 +1,68 @@
+import asyncio
+import time
+import itertools
+from typing import Any, List, Optional, Sequence
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+_call_ids = itertools.count()
+
+CITIES = ["Riyadh", "Jeddah", "Dammam", "Khobar", "Abha", "Medina", "Makkah", "NEOM", "Al-Ula", "Tabuk", "Taif"]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for the OpenAI chat model, for local load tests
+    and benchmarks (DALIL_FAKE_LLM=1). It calls the same tools a real model
+    would for restaurant, attraction and game questions, answers from the tool
+    results, and sleeps `latency` seconds per call to mimic the upstream
+    round-trip.
+    """
+
+    latency: float = 0.0
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "dalil-fake"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        names = [getattr(t, "name", getattr(t, "__name__", "")) for t in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            results = [m for m in reversed(messages) if isinstance(m, ToolMessage)]
+            names = ", ".join(sorted({m.name for m in results if m.name}))
+            return AIMessage(content=f"Here is what I found using {names}: {str(last.content)[:200]}")
+
+        text = str(last.content).lower()
+        city = next((c for c in CITIES if c.lower() in text), "Riyadh")
+        calls = []
+        if any(w in text for w in ("restaurant", "food", "eat", "itinerary", "what to do")):
+            calls.append(("get_restaurants_by_city", {"city": city}))
+        if any(w in text for w in ("attraction", "visit", "see", "itinerary", "what to do")):
+            calls.append(("get_attractions_by_city", {"city": city}))
+        if any(w in text for w in ("game", "match", "fixture", "schedule")):
+            calls.append(("get_games_within_this_week", {"simulated_date": "2034-06-13"}))
+        calls = [(name, args) for name, args in calls if name in self.tool_names]
+
+        if not calls:
+            return AIMessage(content=f"Happy to help with that! You asked: {str(last.content)[:200]}")
+        return AIMessage(content="", tool_calls=[
+            {"name": name, "args": args, "id": f"call_{next(_call_ids)}"} for name, args in calls
+        ])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
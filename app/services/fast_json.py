@@ -0,0 +1,82 @@
+import json
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+from flask.json.provider import DefaultJSONProvider
+from services.records import Record, RecordTable
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+
+def _default(value: Any) -> Any:
+    # Compact records and tables serialize like the dicts and lists they stand in for
+    if isinstance(value, RecordTable):
+        return value.to_dicts()
+    if isinstance(value, Record):
+        return value.copy()
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (Sequence, set, frozenset)) and not isinstance(value, (str, bytes)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def loads(data) -> Any:
+        return orjson.loads(data)
+
+    def dumps(value: Any, sort_keys: bool = True) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(value, default=_default, option=option)
+elif msgspec is not None:
+    _encoder = msgspec.json.Encoder(enc_hook=_default, order="sorted")
+    _unsorted_encoder = msgspec.json.Encoder(enc_hook=_default)
+
+    def loads(data) -> Any:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(value: Any, sort_keys: bool = True) -> bytes:
+        return (_encoder if sort_keys else _unsorted_encoder).encode(value)
+else:
+    def loads(data) -> Any:
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+    def dumps(value: Any, sort_keys: bool = True) -> bytes:
+        return json.dumps(value, default=_default, sort_keys=sort_keys, separators=(",", ":")).encode()
+
+
+def load_file(path: str) -> Any:
+    """Read and decode a JSON file with the fastest available backend"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using the fast backend for compact responses, and the stdlib for pretty-printed ones"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs.get("indent") is not None:
+            kwargs.setdefault("default", _default)
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return loads(s)
@@ -0,0 +1,145 @@
+import math
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def coordinates(record: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Get (lat, lon) from either the flat lat/lon or the nested location schema, None if missing or not finite"""
+    if record.get('lat') is not None and record.get('lon') is not None:
+        point = float(record['lat']), float(record['lon'])
+    else:
+        location = record.get('location') or {}
+        if location.get('latitude') is None or location.get('longitude') is None:
+            return None
+        point = float(location['latitude']), float(location['longitude'])
+    return point if math.isfinite(point[0]) and math.isfinite(point[1]) else None
+
+
+class GeoIndex:
+    """
+    Grid index over the coordinates of each place category (hotels,
+    restaurants, attractions, stadiums), built once per data load. Points are
+    bucketed into square cells of `cell_deg` degrees; nearest-neighbour
+    searches expand ring by ring around the query cell and stop as soon as no
+    unvisited cell can hold a closer point. Cells hold row positions and
+    results are resolved through the category's own records, so no second
+    copy of the records is kept (a snapshot table decodes them on demand).
+    """
+
+    def __init__(self, places: Dict[str, List[Dict[str, Any]]], cell_deg: float = 0.25):
+        self.cell_deg = cell_deg
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        self._points: Dict[str, List[Tuple[float, float, int]]] = {}
+        self._cells: Dict[str, Dict[Tuple[int, int], List[int]]] = {}
+        self._extent: Dict[str, Tuple[int, int, int, int]] = {}
+
+        for category, records in places.items():
+            points = []
+            cells = defaultdict(list)
+            for position, record in enumerate(records):
+                point = coordinates(record)
+                if point is None:
+                    continue
+                cells[self._cell(*point)].append(len(points))
+                points.append((point[0], point[1], position))
+            self._records[category] = records
+            self._points[category] = points
+            self._cells[category] = dict(cells)
+            if cells:
+                rows = [c[0] for c in cells]
+                cols = [c[1] for c in cells]
+                self._extent[category] = (min(rows), max(rows), min(cols), max(cols))
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._points)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def _ring(self, center: Tuple[int, int], radius: int) -> Iterable[Tuple[int, int]]:
+        row, col = center
+        if radius == 0:
+            yield center
+            return
+        for d in range(-radius, radius + 1):
+            yield row - radius, col + d
+            yield row + radius, col + d
+        for d in range(-radius + 1, radius):
+            yield row + d, col - radius
+            yield row + d, col + radius
+
+    def _max_ring(self, category: str, center: Tuple[int, int]) -> int:
+        min_row, max_row, min_col, max_col = self._extent[category]
+        return max(abs(center[0] - min_row), abs(center[0] - max_row),
+                   abs(center[1] - min_col), abs(center[1] - max_col))
+
+    def _degree_km(self, lat: float, radius: int) -> float:
+        widest_lat = min(abs(lat) + (radius + 1) * self.cell_deg, 89.0)
+        return self.cell_deg * KM_PER_DEGREE * math.cos(math.radians(widest_lat))
+
+    def nearest(self, category: str, lat: float, lon: float, limit: int = 5,
+                max_km: Optional[float] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """Get the `limit` closest places of a category as (distance_km, record), closest first"""
+        if category not in self._extent or limit <= 0:
+            return []
+        records = self._records[category]
+        points = self._points[category]
+        cells = self._cells[category]
+        center = self._cell(lat, lon)
+
+        found: List[Tuple[float, Dict[str, Any]]] = []
+        for radius in range(self._max_ring(category, center) + 1):
+            # Lower bound on the distance to any point not yet visited: the
+            # width of the rings in between, measured where longitude
+            # degrees are narrowest.
+            bound = (radius - 1) * self._degree_km(lat, radius) if radius else 0.0
+            if max_km is not None and bound > max_km:
+                break
+            if len(found) >= limit and bound > found[limit - 1][0]:
+                break
+            for cell in self._ring(center, radius):
+                for index in cells.get(cell, ()):
+                    p_lat, p_lon, position = points[index]
+                    distance = haversine_km(lat, lon, p_lat, p_lon)
+                    if max_km is None or distance <= max_km:
+                        found.append((distance, position))
+            found.sort(key=lambda item: item[0])
+        return [(distance, records[position]) for distance, position in found[:limit]]
+
+    def within(self, category: str, lat: float, lon: float, radius_km: float) -> List[Tuple[float, Dict[str, Any]]]:
+        """Get every place of a category within `radius_km`, closest first"""
+        return self.nearest(category, lat, lon, len(self._points.get(category, ())), radius_km)
+
+    def in_bbox(self, category: str, south: float, west: float, north: float, east: float) -> List[Dict[str, Any]]:
+        """Get the places of a category inside a bounding box"""
+        if category not in self._extent:
+            return []
+        min_row, min_col = self._cell(south, west)
+        max_row, max_col = self._cell(north, east)
+        min_row, max_row = max(min_row, self._extent[category][0]), min(max_row, self._extent[category][1])
+        min_col, max_col = max(min_col, self._extent[category][2]), min(max_col, self._extent[category][3])
+
+        records = self._records[category]
+        points = self._points[category]
+        cells = self._cells[category]
+        results = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                for index in cells.get((row, col), ()):
+                    p_lat, p_lon, position = points[index]
+                    if south <= p_lat <= north and west <= p_lon <= east:
+                        results.append(records[position])
+        return results
@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+
+class HistoryStore(ABC):
+    """
+    Interface for per-fan conversation storage.
+    Messages are appended in batches (typically one user/assistant turn at a time).
+    Stores that keep a rolling summary number the messages of a conversation:
+    each stored message comes back with its sequence number as its `id`, which
+    only grows, so the summary can say exactly which messages it covers.
+    """
+
+    @abstractmethod
+    def get_messages(self, user_id: Any) -> List[BaseMessage]:
+        """All stored messages of a conversation, oldest first"""
+
+    @abstractmethod
+    def append(self, user_id: Any, messages: List[BaseMessage]):
+        """Add messages to the end of a conversation"""
+
+    @abstractmethod
+    def clear(self, user_id: Any):
+        """Forget a conversation"""
+
+    def get_summary(self, user_id: Any) -> Tuple[Optional[int], str]:
+        """Rolling summary of the older turns, as (sequence number of the last folded message, text)"""
+        return None, ""
+
+    def set_summary(self, user_id: Any, upto: int, summary: str):
+        """Keep the rolling summary with the conversation, if the store can"""
+
+
+class MemoryHistoryStore(HistoryStore):
+    """
+    Bounded in-memory history: least recently used conversations are evicted
+    past `max_users`, idle ones expire after `ttl_seconds`, and each one keeps
+    at most `max_messages`. When given a `backing` store it acts as a
+    write-through cache in front of it: every read still asks the backing
+    store for the conversation's latest sequence number (one indexed lookup,
+    so appends from other workers are seen), and a hit only saves fetching
+    and decoding the messages. The rolling summary of a conversation is kept
+    in its entry, so it is evicted and expires with it, or with a backing
+    store in the backing store, so every worker sees the same one.
+    """
+
+    def __init__(self, max_users: int = 10000, ttl_seconds: Optional[float] = 86400,
+                 max_messages: Optional[int] = 200, backing: Optional["SQLiteHistoryStore"] = None):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.backing = backing
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_messages(self, user_id: Any) -> List[BaseMessage]:
+        key = str(user_id)
+        version = self.backing.version(key) if self.backing else None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry) and entry[2] == version:
+                self._entries.move_to_end(key)
+                return list(entry[0])
+
+        if self.backing:
+            messages = self.backing.get_messages(key)
+        elif entry is not None and not self._expired(entry):
+            messages = entry[0]
+        else:
+            messages = []
+
+        with self._lock:
+            self._put(key, messages, version)
+        return list(messages)
+
+    def append(self, user_id: Any, messages: List[BaseMessage]):
+        key = str(user_id)
+        if self.backing:
+            # The cached messages go stale with the backing version
+            self.backing.append(key, messages)
+            return
+
+        with self._lock:
+            entry = self._entries.get(key)
+            current = entry[0] if entry is not None and not self._expired(entry) else []
+            seq = int(current[-1].id) if current else 0
+            numbered = [m.model_copy(update={"id": str(seq + i)}) for i, m in enumerate(messages, 1)]
+            self._put(key, current + numbered, None)
+
+    def clear(self, user_id: Any):
+        key = str(user_id)
+        if self.backing:
+            self.backing.clear(key)
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_summary(self, user_id: Any) -> Tuple[Optional[int], str]:
+        if self.backing:
+            return self.backing.get_summary(user_id)
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None or self._expired(entry):
+                return None, ""
+            return entry[3]
+
+    def set_summary(self, user_id: Any, upto: int, summary: str):
+        if self.backing:
+            self.backing.set_summary(user_id, upto, summary)
+            return
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is not None and not self._expired(entry):
+                self._entries[str(user_id)] = entry[:3] + ((upto, summary),)
+
+    def _expired(self, entry: tuple) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - entry[1] > self.ttl_seconds
+
+    def _put(self, key: str, messages: List[BaseMessage], version: Optional[int]):
+        if self.max_messages is not None:
+            messages = messages[-self.max_messages:]
+        entry = self._entries.get(key)
+        summary = entry[3] if entry is not None and not self._expired(entry) else (None, "")
+        self._entries[key] = (messages, time.monotonic(), version, summary)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    Durable history in a local SQLite database in WAL mode, so every worker
+    process on a node can read and append concurrently. Each conversation is
+    trimmed to its last `max_messages` on append. Rolling summaries live in
+    their own table, keyed by conversation, and are deleted with it.
+    """
+
+    def __init__(self, path: str, max_messages: Optional[int] = 200):
+        self.path = path
+        self.max_messages = max_messages
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_messages ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " user_id TEXT NOT NULL,"
+                " message TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_user ON chat_messages (user_id, seq)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_summaries ("
+                " user_id TEXT PRIMARY KEY,"
+                " upto_seq INTEGER NOT NULL,"
+                " summary TEXT NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def version(self, user_id: Any) -> Optional[int]:
+        """Sequence number of the latest message, used to detect writes from other workers"""
+        row = self._connection().execute(
+            "SELECT MAX(seq) FROM chat_messages WHERE user_id = ?", (str(user_id),)
+        ).fetchone()
+        return row[0]
+
+    def get_messages(self, user_id: Any) -> List[BaseMessage]:
+        rows = self._connection().execute(
+            "SELECT seq, message FROM chat_messages WHERE user_id = ? ORDER BY seq", (str(user_id),)
+        ).fetchall()
+        messages = messages_from_dict([json.loads(row[1]) for row in rows])
+        for (seq, _), message in zip(rows, messages):
+            message.id = str(seq)
+        return messages
+
+    def append(self, user_id: Any, messages: List[BaseMessage]):
+        key = str(user_id)
+        now = time.time()
+        rows = [(key, json.dumps(message_to_dict(m)), now) for m in messages]
+        with self._connection() as conn:
+            conn.executemany("INSERT INTO chat_messages (user_id, message, created_at) VALUES (?, ?, ?)", rows)
+            if self.max_messages is not None:
+                conn.execute(
+                    "DELETE FROM chat_messages WHERE user_id = ? AND seq NOT IN ("
+                    " SELECT seq FROM chat_messages WHERE user_id = ? ORDER BY seq DESC LIMIT ?)",
+                    (key, key, self.max_messages)
+                )
+
+    def clear(self, user_id: Any):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM chat_messages WHERE user_id = ?", (str(user_id),))
+            conn.execute("DELETE FROM chat_summaries WHERE user_id = ?", (str(user_id),))
+
+    def get_summary(self, user_id: Any) -> Tuple[Optional[int], str]:
+        row = self._connection().execute(
+            "SELECT upto_seq, summary FROM chat_summaries WHERE user_id = ?", (str(user_id),)
+        ).fetchone()
+        return (row[0], row[1]) if row else (None, "")
+
+    def set_summary(self, user_id: Any, upto: int, summary: str):
+        # Workers may fold the same turns concurrently; never replace a summary that covers more
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO chat_summaries (user_id, upto_seq, summary) VALUES (?, ?, ?)"
+                " ON CONFLICT (user_id) DO UPDATE SET upto_seq = excluded.upto_seq, summary = excluded.summary"
+                " WHERE excluded.upto_seq >= chat_summaries.upto_seq",
+                (str(user_id), upto, summary)
+            )
+
+
+def create_history_store() -> HistoryStore:
+    """
+    Build the history store from the environment:
+    DALIL_HISTORY_BACKEND ("memory" or "sqlite"), DALIL_HISTORY_DB,
+    DALIL_HISTORY_MAX_USERS, DALIL_HISTORY_TTL and DALIL_HISTORY_MAX_MESSAGES.
+    """
+    max_messages = int(os.environ.get("DALIL_HISTORY_MAX_MESSAGES", 200))
+    backing = None
+    if os.environ.get("DALIL_HISTORY_BACKEND", "memory") == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "chat_history.db")
+        backing = SQLiteHistoryStore(os.environ.get("DALIL_HISTORY_DB", default_path), max_messages)
+
+    return MemoryHistoryStore(
+        max_users=int(os.environ.get("DALIL_HISTORY_MAX_USERS", 10000)),
+        ttl_seconds=float(os.environ.get("DALIL_HISTORY_TTL", 86400)),
+        max_messages=max_messages,
+        backing=backing,
+    )
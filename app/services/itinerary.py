@@ -0,0 +1,131 @@
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Any, Optional, Tuple
+from services.timeline import date_ordinal
+
+
+class Itinerary:
+    """
+    One fan's hotel stays and games, joined with their hotels and stadiums
+    and sorted by date once. Never modified after it is built: the hotel for
+    any date is found by binary search over the stay boundaries, and games
+    are read from the games view of the date being asked about.
+    """
+
+    __slots__ = ('fan', 'stays', '_boundaries', '_current', '_by_check_in', '_check_ins',
+                 'game_positions', 'game_ordinals', 'game_stadiums', '_hotel_sources', '_game_sources')
+
+    def __init__(self, fan: Dict[str, Any], dataset):
+        self.fan = fan
+        store = dataset.store
+        raw_stays = fan.get('hotel_stays') or []
+        self._hotel_sources = tuple((stay['hotel_id'], store.hotels.get(stay['hotel_id'])) for stay in raw_stays)
+
+        # (check_in, check_out, stay) in the fan's own order; stay is None when the hotel is unknown
+        resolved: List[Tuple[int, int, Optional[Dict[str, Any]]]] = []
+        for stay, (_, hotel) in zip(raw_stays, self._hotel_sources):
+            entry = {"hotel": hotel, "check_in": stay['check_in'], "check_out": stay['check_out']} if hotel else None
+            resolved.append((date_ordinal(stay['check_in']), date_ordinal(stay['check_out']), entry))
+        self.stays = tuple(entry for _, _, entry in resolved if entry is not None)
+
+        # The current stay only changes on check-in/check-out dates, so resolve it
+        # once per interval; the first stay in the fan's order with a known hotel wins
+        self._boundaries = sorted({d for check_in, check_out, _ in resolved for d in (check_in, check_out)})
+        self._current = [
+            next(((entry, check_out) for check_in, check_out, entry in resolved
+                  if entry is not None and check_in <= boundary < check_out), None)
+            for boundary in self._boundaries
+        ]
+
+        # Every stay (known hotel or not) by check-in date, for the next stay after a date
+        order = sorted(range(len(resolved)), key=lambda i: resolved[i][0])
+        self._by_check_in = [(resolved[i][0], resolved[i][2]) for i in order]
+        self._check_ins = [check_in for check_in, _ in self._by_check_in]
+
+        positions = [store.games.position(game_id) for game_id in fan.get('attending_games') or []]
+        positions = sorted((p for p in positions if p is not None), key=lambda p: dataset.timeline.ordinals[p])
+        self.game_positions = tuple(positions)
+        self.game_ordinals = tuple(dataset.timeline.ordinals[p] for p in positions)
+        self.game_stadiums = tuple(store.stadiums.get(dataset.raw_games[p]['stadium_id']) for p in positions)
+        self._game_sources = tuple(dataset.raw_games[p] for p in positions)
+
+    def current_stay(self, current: int) -> Optional[Dict[str, Any]]:
+        """The stay covering a date ordinal, with days_left"""
+        index = bisect_right(self._boundaries, current) - 1
+        if index < 0 or self._current[index] is None:
+            return None
+        entry, check_out = self._current[index]
+        return {**entry, "days_left": check_out - current}
+
+    def next_stay(self, current: int) -> Optional[Dict[str, Any]]:
+        """The first stay checking in after a date ordinal, with days_until (None if its hotel is unknown)"""
+        index = bisect_right(self._check_ins, current)
+        if index == len(self._by_check_in):
+            return None
+        check_in, entry = self._by_check_in[index]
+        if entry is None:
+            return None
+        return {**entry, "days_until": check_in - current}
+
+    def games(self, view: List[Dict[str, Any]], current: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The fan's games as shown in a games view, annotated with is_past and their stadium, in date order"""
+        games = []
+        for position, ordinal, stadium in zip(self.game_positions, self.game_ordinals, self.game_stadiums):
+            game = dict(view[position])
+            if current is not None:
+                game['is_past'] = ordinal < current
+            if stadium:
+                game['stadium_name'] = stadium['name']
+                game['stadium_city'] = stadium['city']
+            games.append(game)
+        return games
+
+    def still_valid(self, fan: Dict[str, Any], dataset) -> bool:
+        """Whether this itinerary also holds for a fan record and the data of another load"""
+        if fan != self.fan:
+            return False
+        store = dataset.store
+        if any(store.hotels.get(hotel_id) != hotel for hotel_id, hotel in self._hotel_sources):
+            return False
+        for position, game, stadium in zip(self.game_positions, self._game_sources, self.game_stadiums):
+            if store.games.position(game['id']) != position or dataset.raw_games[position] != game:
+                return False
+            if store.stadiums.get(game['stadium_id']) != stadium:
+                return False
+        return True
+
+
+class ItineraryStore:
+    """
+    Itineraries of one data load, built lazily the first time each fan is
+    asked about. A fan record that differs from the one its itinerary was
+    built from gets a fresh one; after a reload, itineraries from the previous load
+    are carried over for fans whose record, hotels, stadiums and games did not
+    change, so only the affected fans are rebuilt.
+    """
+
+    def __init__(self, dataset, previous: Optional["ItineraryStore"] = None):
+        self.dataset = dataset
+        # fan id -> (fan record it was built for, itinerary)
+        self._itineraries: Dict[Any, Tuple[Dict[str, Any], Itinerary]] = {}
+        self._previous = dict(previous._itineraries) if previous is not None else {}
+        self._lock = threading.Lock()
+        self.built = 0
+        self.carried_over = 0
+
+    def get(self, fan: Dict[str, Any]) -> Itinerary:
+        """The itinerary of a fan record"""
+        cached = self._itineraries.get(fan['id'])
+        if cached is not None and (cached[0] is fan or cached[0] == fan):
+            return cached[1]
+
+        previous = self._previous.pop(fan['id'], None)
+        if previous is not None and previous[1].still_valid(fan, self.dataset):
+            itinerary = previous[1]
+            self.carried_over += 1
+        else:
+            itinerary = Itinerary(fan, self.dataset)
+            self.built += 1
+        with self._lock:
+            self._itineraries[fan['id']] = (fan, itinerary)
+        return itinerary
@@ -1,27 +1,197 @@
+import os
+import json
+import time
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from langchain_openai.chat_models import ChatOpenAI
-from typing import List, Callable, Any
+from typing import List, Callable, Any, Dict, Tuple, Optional
+from threading import RLock
 from langgraph.graph import StateGraph, START
 from langgraph.graph import MessagesState
-from langchain_core.messages import SystemMessage
-from langgraph.prebuilt import tools_condition, ToolNode
+from langchain_core.messages import SystemMessage, ToolMessage, HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.prebuilt import tools_condition
+from services.metrics import metrics
 
-def chatbot(sysMessage: str, tools: List[Callable[..., Any]]):
-    llm = ChatOpenAI(model="gpt-4o")
-    llm_with_tools = llm.bind_tools(tools)
+# The chat model and the compiled graphs are built once per process and shared
+# by every request; the per-fan system prompt arrives through the run config.
+_lock = RLock()
+_llm = None
+_graphs: Dict[Tuple[str, ...], Any] = {}
 
-    sysMessage = SystemMessage(content=sysMessage)
- 
-    def assistant(state: MessagesState):
-        return {"messages": [llm_with_tools.invoke([sysMessage] + state["messages"])]}
 
+def get_llm():
+    """Get the process-wide chat model, reusing its HTTP client and connection pool"""
+    global _llm
+    with _lock:
+        if _llm is None:
+            if os.environ.get("DALIL_FAKE_LLM") == "1":
+                from services.fake_llm import FakeChatModel
+                _llm = FakeChatModel(latency=float(os.environ.get("DALIL_FAKE_LLM_LATENCY", 0)))
+            else:
+                _llm = ChatOpenAI(model="gpt-4o", timeout=float(os.environ.get("DALIL_LLM_TIMEOUT", 60)))
+        return _llm
+
+
+def chatbot_config(sysMessage: str, thread_id: Any, **configurable) -> RunnableConfig:
+    """Build the run config carrying the per-fan system prompt and any extra tool context"""
+    return {"configurable": {"thread_id": thread_id, "system_message": sysMessage, **configurable}}
+
+
+def chatbot(tools: List[Callable[..., Any]]):
+    """Get the compiled graph for a set of tools, compiling it on first use"""
+    key = tuple(getattr(t, "name", getattr(t, "__name__", repr(t))) for t in tools)
+    with _lock:
+        graph = _graphs.get(key)
+        if graph is None:
+            with metrics.span("graph_compile"):
+                graph = _build_graph(tools)
+            _graphs[key] = graph
+        return graph
+
+
+class ParallelToolNode:
+    """
+    Runs every tool call of an assistant message concurrently and returns the
+    results in call order. Identical calls (same tool and arguments) made
+    earlier in the same fan turn, or twice in one message, are answered from
+    the earlier result instead of running again.
+
+    Each message gets its own pool of up to `max_workers` threads, so calls
+    never queue behind other conversations' tools. A call's timeout counts
+    from when it starts running; one still queued behind the message's other
+    calls after as long again is cancelled. Python cannot interrupt a running
+    thread, so a call that times out keeps running in the background and its
+    result is discarded; only its own message's pool is held up by it.
+    """
+
+    def __init__(self, tools: List[Any], max_workers: int = 8, timeout: float = 15.0,
+                 timeouts: Optional[Dict[str, float]] = None):
+        self.tools_by_name = {t.name: t for t in tools}
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _key(call: Dict[str, Any]) -> Tuple[str, str]:
+        return call["name"], json.dumps(call["args"], sort_keys=True, default=str)
+
+    @staticmethod
+    def _turn_results(messages: List[Any]) -> Dict[Tuple[str, str], str]:
+        # Results of tool calls already made since the fan's last message
+        results_by_id = {}
+        calls = []
+        for message in reversed(messages[:-1]):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, ToolMessage) and message.status != "error":
+                results_by_id[message.tool_call_id] = message.content
+            elif isinstance(message, AIMessage):
+                calls.extend(message.tool_calls)
+        return {
+            ParallelToolNode._key(call): results_by_id[call["id"]]
+            for call in calls if call["id"] in results_by_id
+        }
+
+    def _run(self, call: Dict[str, Any], config: RunnableConfig) -> str:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            raise ValueError(f"Unknown tool '{call['name']}', use one of {list(self.tools_by_name)}")
+        with metrics.span("tool", tool=call["name"]):
+            output = tool.invoke(call["args"], config)
+        return output if isinstance(output, str) else json.dumps(output, ensure_ascii=False, default=str)
+
+    def _start(self, started: Dict[Tuple[str, str], float], key: Tuple[str, str],
+               call: Dict[str, Any], config: RunnableConfig) -> str:
+        started[key] = time.monotonic()
+        return self._run(call, config)
+
+    @staticmethod
+    def _result(future: Future, started: Dict[Tuple[str, str], float], key: Tuple[str, str],
+                timeout: float) -> str:
+        """Wait for a call, allowing `timeout` from when it started running"""
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            begun = started.get(key)
+            if begun is None:
+                # Still queued behind the message's other calls
+                raise
+            return future.result(timeout=max(0.0, begun + timeout - time.monotonic()))
+
+    def __call__(self, state: MessagesState, config: RunnableConfig):
+        calls = state["messages"][-1].tool_calls
+        earlier = self._turn_results(state["messages"])
+
+        pending, started = {}, {}
+        for call in calls:
+            key = self._key(call)
+            if key not in earlier and key not in pending:
+                pending[key] = call
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(pending), self.max_workers)),
+                                      thread_name_prefix="dalil-tool")
+        try:
+            for key, call in pending.items():
+                context = contextvars.copy_context()
+                pending[key] = executor.submit(context.run, self._start, started, key, call, config)
+
+            results = []
+            for call in calls:
+                key = self._key(call)
+                status = "success"
+                if key in earlier:
+                    content, status = earlier[key], "reused"
+                else:
+                    future = pending[key]
+                    timeout = self.timeouts.get(call["name"], self.timeout)
+                    try:
+                        content = self._result(future, started, key, timeout)
+                    except FutureTimeoutError:
+                        # Only stops a call that has not started yet
+                        future.cancel()
+                        content, status = f"Error: {call['name']} timed out after {timeout:g}s", "error"
+                    except Exception as e:
+                        content, status = f"Error: {e}", "error"
+                metrics.inc("dalil_tool_calls_total", tool=call["name"], status=status)
+                results.append(ToolMessage(content=content, name=call["name"], tool_call_id=call["id"],
+                                           status="error" if status == "error" else "success"))
+        finally:
+            # Do not wait for calls that timed out; their threads finish on their own
+            executor.shutdown(wait=False, cancel_futures=True)
+        return {"messages": results}
+
+
+def _build_graph(tools: List[Callable[..., Any]]):
+    llm_with_tools = get_llm().bind_tools(tools)
+
+    def prompt(state: MessagesState, config: RunnableConfig) -> List[Any]:
+        sysMessage = SystemMessage(content=config["configurable"].get("system_message", ""))
+        return [sysMessage] + state["messages"]
+
+    def record(reply: AIMessage) -> Dict[str, Any]:
+        metrics.inc("dalil_llm_calls_total")
+        usage = getattr(reply, "usage_metadata", None)
+        if usage:
+            metrics.inc("dalil_llm_tokens_total", usage.get("input_tokens", 0), direction="input")
+            metrics.inc("dalil_llm_tokens_total", usage.get("output_tokens", 0), direction="output")
+        return {"messages": [reply]}
+
+    def assistant(state: MessagesState, config: RunnableConfig):
+        with metrics.span("llm"):
+            reply = llm_with_tools.invoke(prompt(state, config))
+        return record(reply)
 
     builder = StateGraph(MessagesState)
     builder.add_node("assistant", assistant)
-    builder.add_node("tools", ToolNode(tools))
+    builder.add_node("tools", ParallelToolNode(
+        tools,
+        max_workers=int(os.environ.get("DALIL_TOOL_WORKERS", 8)),
+        timeout=float(os.environ.get("DALIL_TOOL_TIMEOUT", 15)),
+    ))
 
     builder.add_edge(START, "assistant")
     builder.add_conditional_edges("assistant", tools_condition,)
     builder.add_edge("tools", "assistant")
 
     graph = builder.compile()
-    return graph
\ No newline at end of file
+    return graph
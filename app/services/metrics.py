@@ -0,0 +1,191 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Id of the request being served, attached to structured span logs
+request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("dalil_request_id", default=None)
+
+_logger = logging.getLogger("dalil.metrics")
+_NULL_SPAN = nullcontext()
+
+
+def _labels(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """
+    In-process counters, histograms and scrape-time gauges, rendered in the
+    Prometheus text format. When disabled every recording call returns
+    straight away and span() hands back a shared no-op context manager, so
+    instrumented code costs one attribute check. With `log_spans`, each
+    finished span is also written as a JSON log line tagged with the request id.
+    """
+
+    def __init__(self, enabled: bool = True, log_spans: bool = False,
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.log_spans = log_spans
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._gauges: Dict[str, Callable[[], Dict[LabelKey, float]]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a value (usually seconds) in a histogram"""
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            histogram.counts[bisect_left(self.buckets, value)] += 1
+            histogram.total += value
+            histogram.count += 1
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], object], label: Optional[str] = None):
+        """Register a gauge read at scrape time; read() returns a number, or {label value: number} when `label` is given"""
+        self.describe(name, "gauge", help_text)
+
+        def collect() -> Dict[LabelKey, float]:
+            value = read()
+            if label is None:
+                return {(): value}
+            return {((label, str(k)),): v for k, v in value.items()}
+
+        self._gauges[name] = collect
+
+    def span(self, stage: str, **labels):
+        """Time a block as one stage of request handling"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(stage, labels)
+
+    @contextmanager
+    def _span(self, stage: str, labels: Dict[str, object]):
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe("dalil_stage_duration_seconds", elapsed, stage=stage, **labels)
+            if self.log_spans:
+                record = {"span": stage, "ms": round(elapsed * 1000, 3), "request_id": request_id.get(), **labels}
+                if error:
+                    record["error"] = error
+                _logger.info(json.dumps(record, default=str))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        def header(name: str, default_kind: str):
+            kind, help_text = self._help.get(name, (default_kind, name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {key: (list(h.counts), h.total, h.count) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+        for name in sorted(counters):
+            header(name, "counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+        for name in sorted(histograms):
+            header(name, "histogram")
+            for key, (counts, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+        for name in sorted(self._gauges):
+            try:
+                values = self._gauges[name]()
+            except Exception as e:
+                print(f"Error reading gauge {name}: {e}")
+                continue
+            header(name, "gauge")
+            for key, value in sorted(values.items()):
+                lines.append(f"{name}{_format_labels(key)} {float(value):g}")
+
+        return "\n".join(lines) + "\n"
+
+
+def create_metrics() -> Metrics:
+    """Build the process-wide metrics registry from the DALIL_METRICS* environment variables"""
+    log_spans = os.environ.get("DALIL_METRICS_LOG", "0") == "1"
+    if log_spans and not _logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+    return Metrics(enabled=os.environ.get("DALIL_METRICS", "1") != "0", log_spans=log_spans)
+
+
+metrics = create_metrics()
+metrics.describe("dalil_http_requests_total", "counter", "HTTP requests by route, method and status")
+metrics.describe("dalil_http_request_duration_seconds", "histogram", "HTTP request latency by route")
+metrics.describe("dalil_stage_duration_seconds", "histogram", "Time spent in each stage of request handling")
+metrics.describe("dalil_tool_calls_total", "counter", "Agent tool invocations by tool and status")
+metrics.describe("dalil_llm_calls_total", "counter", "Chat model calls")
+metrics.describe("dalil_llm_tokens_total", "counter", "Chat model token usage by direction")
@@ -0,0 +1,121 @@
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Any, Iterator
+
+_MISSING = object()
+
+
+def _column(values: List[Any]):
+    """Pack a column into a typed array when every value allows it"""
+    if values and all(type(v) is int for v in values):
+        try:
+            return array('q', values)
+        except OverflowError:
+            return values
+    if values and all(type(v) is float for v in values):
+        return array('d', values)
+    return values
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record(Mapping):
+    """Read-only dict-like view of one row of a RecordTable"""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: "RecordTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, field: str) -> Any:
+        column = self._table._columns.get(field)
+        if column is None:
+            raise KeyError(field)
+        value = column[self._row]
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def get(self, field: str, default: Any = None) -> Any:
+        column = self._table._columns.get(field)
+        if column is None:
+            return default
+        value = column[self._row]
+        return default if value is _MISSING else value
+
+    def __contains__(self, field: object) -> bool:
+        column = self._table._columns.get(field)
+        return column is not None and column[self._row] is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        row = self._row
+        return (f for f, column in self._table._columns.items() if column[row] is not _MISSING)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record) and other._table is self._table and other._row == self._row:
+            return True
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def copy(self) -> Dict[str, Any]:
+        """A plain, mutable dict with the same fields"""
+        row = self._row
+        return {f: v for f, column in self._table._columns.items() if (v := column[row]) is not _MISSING}
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+
+class RecordTable(Sequence):
+    """
+    Column-oriented storage for a list of records sharing the same schema.
+    Each field is one column (a typed array for all-int or all-float fields,
+    otherwise a list of interned values), so a row costs a few pointers per
+    field instead of a whole dict. Rows are handed out as lightweight Record
+    views that read like the original dicts; nested values (lists of stays,
+    preference dicts) are kept as they were decoded.
+    """
+
+    __slots__ = ('_columns', '_length')
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        fields: Dict[str, None] = {}
+        for record in records:
+            fields.update(dict.fromkeys(record))
+        self._length = len(records)
+        self._columns = {
+            sys.intern(field): _column([_intern(r.get(field, _MISSING)) for r in records])
+            for field in fields
+        }
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Record(self, row) for row in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("record index out of range")
+        return Record(self, index)
+
+    def column(self, field: str) -> Sequence:
+        """All values of one field, in row order"""
+        return self._columns[field]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize every row as a plain dict"""
+        columns = list(self._columns.items())
+        return [
+            {f: v for f, column in columns if (v := column[row]) is not _MISSING}
+            for row in range(self._length)
+        ]
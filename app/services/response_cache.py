@@ -0,0 +1,58 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class CachedBody:
+    """A serialized response body with its strong ETag and optional gzip variant"""
+
+    __slots__ = ('body', 'etag', 'gzipped')
+
+    def __init__(self, body: bytes, gzip_min_size: Optional[int]):
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.gzipped = None
+        if gzip_min_size is not None and len(body) >= gzip_min_size:
+            self.gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class ResponseCache:
+    """
+    Serialized bodies for read-only endpoints, keyed by whatever the response
+    depends on (typically the endpoint name, data version and simulated date),
+    so a body is encoded and compressed once and served as bytes afterwards.
+    Stale keys simply stop being asked for and age out of the LRU.
+    """
+
+    def __init__(self, serialize: Callable[[Any], bytes], max_entries: int = 256,
+                 gzip_min_size: Optional[int] = 1024):
+        self.serialize = serialize
+        self.max_entries = max_entries
+        self.gzip_min_size = gzip_min_size
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, producer: Callable[[], Any]) -> CachedBody:
+        """Get the cached body for a key, serializing producer() on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = CachedBody(self.serialize(producer()), self.gzip_min_size)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
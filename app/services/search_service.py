@@ -0,0 +1,169 @@
+import heapq
+import math
+import re
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+STOPWORDS = frozenset("""
+a an the and or of in on at to for from with by near nearby around close best good some any
+is are me my i we our you your what where which show find get recommend
+""".split())
+
+# (field, weight) per category; dotted fields reach into nested objects and lists are joined
+SEARCH_FIELDS = {
+    'restaurants': (('name', 3.0), ('cuisine', 2.0), ('popular_dishes', 1.5), ('city', 1.5),
+                    ('description', 1.0), ('location.address', 1.0), ('near_stadium', 1.0)),
+    'attractions': (('name', 3.0), ('type', 2.0), ('tags', 2.0), ('city', 1.5),
+                    ('description', 1.0), ('location.address', 1.0), ('near_stadium', 1.0)),
+    'hotels': (('name', 3.0), ('amenities', 2.0), ('city', 1.5), ('description', 1.0)),
+    'stadiums': (('name', 3.0), ('city', 1.5), ('description', 1.0)),
+    'teams': (('name', 3.0), ('group', 1.0)),
+}
+
+# How much a term matched only as a prefix of the query word counts against an exact match
+PREFIX_WEIGHT = 0.6
+MAX_PREFIX_EXPANSIONS = 20
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, lightly stemmed word tokens of a text, without stopwords"""
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _field_text(record: Dict[str, Any], field: str) -> str:
+    value: Any = record
+    for part in field.split('.'):
+        value = value.get(part) if hasattr(value, 'get') else None
+        if value is None:
+            return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def team_documents(games: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One searchable record per team, taken from the group stage where the teams are always known"""
+    teams: Dict[str, Dict[str, Any]] = {}
+    for game in games:
+        if game.get('stage') != 'group':
+            continue
+        for side in ('team_a', 'team_b'):
+            name = game.get(side)
+            if name and name not in teams:
+                teams[name] = {"id": len(teams) + 1, "name": name, "group": game.get('group')}
+    return list(teams.values())
+
+
+class SearchIndex:
+    """
+    BM25 full-text index over the places (and team names) of one data load.
+    Each record's searchable fields are tokenized with per-field weights into
+    one posting list per term, so a query only touches the postings of its
+    own terms. The last query word, and any word with no exact match, also
+    matches the indexed terms it is a prefix of ("sea" finds "seafood"), at a
+    discount against exact matches. Documents are kept as row positions in
+    their collection and only the returned records are resolved.
+    """
+
+    def __init__(self, collections: Dict[str, List[Dict[str, Any]]], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._collections = collections
+        self._docs: List[Tuple[str, int]] = []
+        self._cities: List[str] = []
+        self._lengths: List[float] = []
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        self._avg_length: Dict[str, float] = {}
+
+        for category, records in collections.items():
+            fields = SEARCH_FIELDS[category]
+            total = 0.0
+            for position, record in enumerate(records):
+                doc = len(self._docs)
+                weights: Dict[str, float] = defaultdict(float)
+                for field, weight in fields:
+                    for token in tokenize(_field_text(record, field)):
+                        weights[token] += weight
+                for term, frequency in weights.items():
+                    self._postings[term].append((doc, frequency))
+                length = sum(weights.values())
+                self._docs.append((category, position))
+                self._cities.append(sys.intern(str(record.get('city') or '').lower()))
+                self._lengths.append(length)
+                total += length
+            self._avg_length[category] = total / len(records) if records else 1.0
+
+        self._postings = dict(self._postings)
+        self._terms = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _expand(self, token: str, prefix: bool) -> List[Tuple[str, float]]:
+        """Indexed terms a query token matches, with their weight"""
+        matches = [(token, 1.0)] if token in self._postings else []
+        if len(token) >= 3 and (prefix or not matches):
+            start = bisect_left(self._terms, token)
+            for term in self._terms[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+                if not term.startswith(token):
+                    break
+                if term != token:
+                    matches.append((term, PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query: str, categories: Optional[Iterable[str]] = None, limit: int = 10,
+               city: Optional[str] = None) -> List[Tuple[float, str, Dict[str, Any]]]:
+        """Best matches for a query as (score, category, record), highest score first"""
+        wanted = set(categories) if categories else None
+        city = city.lower() if city else None
+        doc_count = len(self._docs)
+        scores: Dict[int, float] = defaultdict(float)
+
+        tokens = list(dict.fromkeys(tokenize(query)))
+        for position, token in enumerate(tokens):
+            # A token scores each document once, exactly if it can, else through its best
+            # prefix match. Only the last word (still being typed) or one with no exact
+            # match is expanded.
+            exact_scores: Dict[int, float] = {}
+            prefix_scores: Dict[int, float] = {}
+            for term, weight in self._expand(token, prefix=position == len(tokens) - 1):
+                term_scores = exact_scores if term == token else prefix_scores
+                postings = self._postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc, frequency in postings:
+                    category = self._docs[doc][0]
+                    if wanted is not None and category not in wanted:
+                        continue
+                    norm = 1 - self.b + self.b * self._lengths[doc] / self._avg_length[category]
+                    score = weight * idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+                    if score > term_scores.get(doc, 0.0):
+                        term_scores[doc] = score
+            # Short documents (team names) would otherwise let a prefix hit ("spa" in
+            # "Spain") outscore the exact ones, so prefix hits stay below them
+            cap = PREFIX_WEIGHT * min(exact_scores.values()) if exact_scores else None
+            for doc, score in prefix_scores.items():
+                if doc not in exact_scores:
+                    scores[doc] += score if cap is None else min(score, cap)
+            for doc, score in exact_scores.items():
+                scores[doc] += score
+
+        if city is not None:
+            scores = {doc: s for doc, s in scores.items() if self._cities[doc] == city}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        results = []
+        for doc, score in best:
+            category, position = self._docs[doc]
+            results.append((score, category, self._collections[category][position]))
+        return results
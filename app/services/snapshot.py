@@ -0,0 +1,176 @@
+"""
+Binary snapshot of the data directory, shared read-only between worker
+processes through mmap.
+
+    cd app && python -m services.snapshot data data.snapshot
+
+Layout: an 8-byte magic, the length of a JSON header, the header (source
+file fingerprints and where each collection starts), then per collection an
+array of count + 1 native uint64 offsets followed by the records, each
+encoded as its own JSON document. Records are decoded from the mapped pages
+only when they are accessed, so every worker shares one copy of the data in
+the page cache instead of holding a private parse of every file.
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
+
+from services import fast_json
+from services.dataset import DATA_FILES, DataValidationError, validate_collections
+
+MAGIC = b"DALSNAP1"
+_LENGTH = struct.Struct("<Q")
+_OFFSET_SIZE = 8
+
+
+def source_fingerprints(data_dir: str) -> Dict[str, List[int]]:
+    """Size and modification time of every data file, to tell when a snapshot is stale"""
+    fingerprints = {}
+    for filename in DATA_FILES.values():
+        try:
+            stat = os.stat(os.path.join(data_dir, filename))
+            fingerprints[filename] = [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            fingerprints[filename] = [-1, -1]
+    return fingerprints
+
+
+def compile_snapshot(data_dir: str, path: str) -> Dict[str, int]:
+    """Validate the data directory and write it as a snapshot file, atomically replacing any old one"""
+    fingerprints = source_fingerprints(data_dir)
+    collections = {}
+    for name, filename in DATA_FILES.items():
+        try:
+            collections[name] = fast_json.load_file(os.path.join(data_dir, filename))
+        except (OSError, ValueError) as e:
+            raise DataValidationError([f"{filename}: {e}"]) from e
+    errors = validate_collections(collections)
+    if errors:
+        raise DataValidationError(errors)
+
+    blocks = {}
+    for name, records in collections.items():
+        encoded = [fast_json.dumps(record, sort_keys=False) for record in records]
+        offsets = [0]
+        for body in encoded:
+            offsets.append(offsets[-1] + len(body))
+        offset_bytes = memoryview(bytearray(_OFFSET_SIZE * len(offsets))).cast('Q')
+        for i, offset in enumerate(offsets):
+            offset_bytes[i] = offset
+        blocks[name] = (len(records), offset_bytes.cast('B').tobytes(), b"".join(encoded))
+
+    # The header stores absolute block positions, which depend on the header's own
+    # length; fixed-width numbers make that length independent of their values.
+    def header_for(start: int) -> bytes:
+        layout, position = {}, start
+        for name, (count, offset_bytes, data) in blocks.items():
+            layout[name] = {"offset": f"{position:016d}", "count": count}
+            position += len(offset_bytes) + len(data)
+        return fast_json.dumps({"byteorder": sys.byteorder, "sources": fingerprints, "collections": layout})
+
+    header = header_for(0)
+    header = header_for(len(MAGIC) + _LENGTH.size + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(_LENGTH.pack(len(header)))
+            f.write(header)
+            for count, offset_bytes, data in blocks.values():
+                f.write(offset_bytes)
+                f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return {name: block[0] for name, block in blocks.items()}
+
+
+class SnapshotTable(Sequence):
+    """
+    Read-only list view of one collection in a mapped snapshot. Indexing
+    decodes the record from the shared pages; the most recently used records
+    are kept decoded so hot ones (and their identity) are stable.
+    """
+
+    def __init__(self, buffer: memoryview, offset: int, count: int, cache_size: int = 4096):
+        self._count = count
+        end = offset + _OFFSET_SIZE * (count + 1)
+        self._offsets = buffer[offset:end].cast('Q')
+        self._data = buffer[end:]
+        self._decode = lru_cache(maxsize=cache_size)(self._decode_record)
+
+    def _decode_record(self, index: int) -> Dict[str, Any]:
+        return fast_json.loads(self._data[self._offsets[index]:self._offsets[index + 1]])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("record index out of range")
+        return self._decode(index)
+
+    def __iter__(self):
+        # Full scans (index builds, whole-list responses) bypass the cache
+        for i in range(self._count):
+            yield self._decode_record(i)
+
+
+class Snapshot:
+    """A memory-mapped snapshot file and the tables of its collections"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise DataValidationError([f"{path}: not a data snapshot"])
+        (header_length,) = _LENGTH.unpack_from(buffer, len(MAGIC))
+        start = len(MAGIC) + _LENGTH.size
+        header = fast_json.loads(bytes(buffer[start:start + header_length]))
+        if header["byteorder"] != sys.byteorder:
+            raise DataValidationError([f"{path}: written on a {header['byteorder']}-endian machine"])
+        self.path = path
+        self.sources = header["sources"]
+        self.tables = {
+            name: SnapshotTable(buffer, int(layout["offset"]), layout["count"])
+            for name, layout in header["collections"].items()
+        }
+
+
+_lock = threading.Lock()
+
+
+def ensure_snapshot(data_dir: str, path: str) -> Snapshot:
+    """Open the snapshot at path, compiling it first if it is missing or older than the data files"""
+    with _lock:
+        snapshot: Optional[Snapshot] = None
+        if os.path.exists(path):
+            snapshot = Snapshot(path)
+            if os.path.isdir(data_dir) and snapshot.sources != source_fingerprints(data_dir):
+                snapshot = None
+        if snapshot is None:
+            compile_snapshot(data_dir, path)
+            snapshot = Snapshot(path)
+        return snapshot
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m services.snapshot <data_dir> <snapshot_path>")
+    print(fast_json.dumps(compile_snapshot(sys.argv[1], sys.argv[2])).decode())
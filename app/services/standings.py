@@ -0,0 +1,221 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Any, Optional, Tuple
+from services.timeline import GameTimeline, date_ordinal
+
+KNOCKOUT_STAGES = ('round_of_32', 'round_of_16', 'quarter_final', 'semi_final', 'third_place', 'final')
+POINTS_FOR_WIN = 3
+POINTS_FOR_DRAW = 1
+
+# Tally columns per team
+PLAYED, WON, DRAWN, LOST, GOALS_FOR, GOALS_AGAINST = range(6)
+
+
+def _score(game: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    result = game.get('result')
+    if not isinstance(result, dict) or result.get('score_a') is None or result.get('score_b') is None:
+        return None
+    return result['score_a'], result['score_b']
+
+
+def _points(tally: List[int]) -> int:
+    return tally[WON] * POINTS_FOR_WIN + tally[DRAWN] * POINTS_FOR_DRAW
+
+
+class Standings:
+    """
+    Group tables and knockout progression as of any date.
+
+    Like the games views, standings only change on match days, so they are
+    kept per epoch of the timeline. The tally of an epoch (played, won,
+    drawn, lost and goals per team) is derived from the nearest cached one by
+    adding, or taking back, only the group results revealed in between, and
+    the ranked tables are built once per cached epoch. Teams level on points,
+    goal difference and goals scored are separated by the same three criteria
+    over the games between them, then by name.
+    """
+
+    def __init__(self, games: List[Dict[str, Any]], timeline: GameTimeline, max_snapshots: int = 64):
+        self._games = games
+        self._timeline = timeline
+        # Epoch from which each game's result is shown
+        self._reveal_epochs = [timeline.epoch(game['date']) for game in games]
+
+        self.groups: Dict[str, List[str]] = {}
+        self._group_games: Dict[str, List[int]] = {}
+        self._knockout: Dict[str, List[int]] = {}
+        for position, game in enumerate(games):
+            if game.get('stage') == 'group' and game.get('group'):
+                teams = self.groups.setdefault(game['group'], [])
+                for side in ('team_a', 'team_b'):
+                    if game.get(side) and game[side] not in teams:
+                        teams.append(game[side])
+                self._group_games.setdefault(game['group'], []).append(position)
+            elif game.get('stage') in KNOCKOUT_STAGES:
+                self._knockout.setdefault(game['stage'], []).append(position)
+        for positions in self._knockout.values():
+            positions.sort(key=lambda p: (timeline.ordinals[p], p))
+        self.groups = dict(sorted(self.groups.items()))
+        self._team_groups = {team: group for group, teams in self.groups.items() for team in teams}
+        self._group_complete_epoch = {
+            group: max(self._reveal_epochs[p] for p in positions) for group, positions in self._group_games.items()
+        }
+
+        self._max_snapshots = max_snapshots
+        # epoch -> [tally, ranked tables or None]
+        self._snapshots: OrderedDict = OrderedDict()
+        self._snapshots[0] = [{team: [0] * 6 for team in self._team_groups}, None]
+        self._lock = Lock()
+
+    def _apply(self, tally: Dict[str, List[int]], position: int, sign: int):
+        game = self._games[position]
+        if game.get('stage') != 'group' or not game.get('group'):
+            return
+        score = _score(game)
+        if score is None:
+            return
+        for team, scored, conceded in ((game['team_a'], score[0], score[1]), (game['team_b'], score[1], score[0])):
+            row = tally[team]
+            row[PLAYED] += sign
+            row[WON if scored > conceded else DRAWN if scored == conceded else LOST] += sign
+            row[GOALS_FOR] += sign * scored
+            row[GOALS_AGAINST] += sign * conceded
+
+    def _snapshot(self, epoch: int) -> list:
+        with self._lock:
+            snapshot = self._snapshots.get(epoch)
+            if snapshot is not None:
+                self._snapshots.move_to_end(epoch)
+                return snapshot
+
+            nearest = min(self._snapshots, key=lambda e: abs(e - epoch))
+            tally = {team: list(row) for team, row in self._snapshots[nearest][0].items()}
+            sign = 1 if nearest < epoch else -1
+            for position in self._timeline.changed_between(nearest, epoch):
+                self._apply(tally, position, sign)
+
+            snapshot = self._snapshots[epoch] = [tally, None]
+            if len(self._snapshots) > self._max_snapshots:
+                self._snapshots.popitem(last=False)
+            return snapshot
+
+    def _rank(self, group: str, tally: Dict[str, List[int]], epoch: int) -> List[str]:
+        def key(row: List[int]) -> Tuple[int, int, int]:
+            return -_points(row), row[GOALS_AGAINST] - row[GOALS_FOR], -row[GOALS_FOR]
+
+        ranked = sorted(self.groups[group], key=lambda team: key(tally[team]))
+        result: List[str] = []
+        start = 0
+        while start < len(ranked):
+            end = start + 1
+            while end < len(ranked) and key(tally[ranked[end]]) == key(tally[ranked[start]]):
+                end += 1
+            tied = ranked[start:end]
+            if len(tied) > 1:
+                head_to_head = {team: [0] * 6 for team in tied}
+                for position in self._group_games[group]:
+                    game = self._games[position]
+                    if self._reveal_epochs[position] <= epoch and game['team_a'] in head_to_head \
+                            and game['team_b'] in head_to_head:
+                        self._apply(head_to_head, position, 1)
+                tied.sort(key=lambda team: (key(head_to_head[team]), team))
+            result.extend(tied)
+            start = end
+        return result
+
+    def _tables(self, epoch: int) -> Dict[str, List[Dict[str, Any]]]:
+        snapshot = self._snapshot(epoch)
+        if snapshot[1] is None:
+            tally = snapshot[0]
+            tables = {}
+            for group in self.groups:
+                tables[group] = [
+                    {
+                        "position": rank, "team": team,
+                        "played": tally[team][PLAYED], "won": tally[team][WON],
+                        "drawn": tally[team][DRAWN], "lost": tally[team][LOST],
+                        "goals_for": tally[team][GOALS_FOR], "goals_against": tally[team][GOALS_AGAINST],
+                        "goal_difference": tally[team][GOALS_FOR] - tally[team][GOALS_AGAINST],
+                        "points": _points(tally[team]),
+                        "group_complete": epoch >= self._group_complete_epoch[group],
+                    }
+                    for rank, team in enumerate(self._rank(group, tally, epoch), start=1)
+                ]
+            snapshot[1] = tables
+        return snapshot[1]
+
+    def _qualifiers(self, tables: Dict[str, List[Dict[str, Any]]]) -> Optional[set]:
+        """Teams going through to the first knockout round, once every group is complete"""
+        if not tables or not all(table[0]['group_complete'] for table in tables.values()):
+            return None
+        first_round = next((stage for stage in KNOCKOUT_STAGES if stage in self._knockout), None)
+        if first_round is None:
+            return set()
+        slots = 2 * len(self._knockout[first_round])
+        per_group = min(2, slots // len(tables))
+        qualified = {row['team'] for table in tables.values() for row in table[:per_group]}
+        # Remaining places go to the best of the next-placed teams across groups
+        runners_up = [table[per_group] for table in tables.values() if len(table) > per_group]
+        runners_up.sort(key=lambda r: (-r['points'], -r['goal_difference'], -r['goals_for'], r['team']))
+        qualified.update(row['team'] for row in runners_up[:slots - len(qualified)])
+        return qualified
+
+    def tables(self, date: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Ranked table of every group as of a date"""
+        return self._tables(self._timeline.epoch(date))
+
+    def bracket(self, date: str) -> List[Dict[str, Any]]:
+        """Knockout rounds in order, each with its games as shown on a date"""
+        view = self._timeline.view(date)
+        return [{"stage": stage, "games": [view[p] for p in self._knockout[stage]]}
+                for stage in KNOCKOUT_STAGES if stage in self._knockout]
+
+    def find_team(self, name: str) -> Optional[str]:
+        """The team a name refers to: an exact match ignoring case, or the only team containing it"""
+        name = name.strip().lower()
+        matches = [team for team in self._team_groups if name in team.lower()]
+        exact = [team for team in matches if team.lower() == name]
+        if exact or len(matches) == 1:
+            return (exact or matches)[0]
+        return None
+
+    def team(self, team: str, date: str) -> Dict[str, Any]:
+        """How a team stands on a date: its group row, knockout results, status and next game"""
+        epoch = self._timeline.epoch(date)
+        tables = self._tables(epoch)
+        group = self._team_groups[team]
+        row = next(r for r in tables[group] if r['team'] == team)
+
+        status, eliminated_in = "group_stage", None
+        qualifiers = self._qualifiers(tables)
+        if qualifiers is not None:
+            status = "knockout" if team in qualifiers else "eliminated"
+            eliminated_in = None if team in qualifiers else "group"
+
+        knockout = []
+        for stage in KNOCKOUT_STAGES:
+            for position in self._knockout.get(stage, ()):
+                game = self._games[position]
+                if self._reveal_epochs[position] > epoch or team not in (game['team_a'], game['team_b']):
+                    continue
+                knockout.append(game)
+                if not game.get('winner'):
+                    continue
+                won = game['winner'] == team
+                if stage == 'final':
+                    status = "champion" if won else "runner_up"
+                elif stage == 'third_place':
+                    status = "third_place" if won else "fourth_place"
+                elif not won and stage != 'semi_final':
+                    status, eliminated_in = "eliminated", stage
+
+        view = self._timeline.view(date)
+        current = date_ordinal(date)
+        upcoming = [p for p in range(len(view)) if self._timeline.ordinals[p] >= current
+                    and team in (view[p]['team_a'], view[p]['team_b'])]
+        next_game = view[min(upcoming, key=lambda p: (self._timeline.ordinals[p], p))] if upcoming else None
+
+        return {
+            "team": team, "group": group, "standing": row, "status": status,
+            "eliminated_in": eliminated_in, "knockout_games": knockout, "next_game": next_game,
+        }
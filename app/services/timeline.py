@@ -0,0 +1,90 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, List, Any
+
+
+@lru_cache(maxsize=8192)
+def date_ordinal(date: str) -> int:
+    """Parse a YYYY-MM-DD date into a day ordinal, once per distinct string"""
+    return datetime.strptime(date, "%Y-%m-%d").toordinal()
+
+
+class GameTimeline:
+    """
+    Serves the games view for any simulated date.
+
+    A game only ever has two views: hidden (before its date: no result, and
+    "TBD" teams for knockout games) and revealed (on or after its date). Both
+    are built once, and since views only change on match days the timeline is
+    split into epochs, one per distinct game date. The view for an epoch is a
+    list of references to the prebuilt dicts, kept in an LRU of snapshots and
+    derived from the nearest cached snapshot by applying only the games that
+    were revealed or hidden in between.
+    """
+
+    def __init__(self, games: List[Dict[str, Any]], max_snapshots: int = 128):
+        self.ordinals = [date_ordinal(g['date']) for g in games]
+        self._hidden = [self._hide(g) for g in games]
+        # Revealed views are the game records themselves, which are never modified
+        # (rows of a compact RecordTable are turned into plain dicts)
+        self._revealed = [g if isinstance(g, dict) else g.copy() for g in games]
+
+        self._epochs = sorted(set(self.ordinals))
+        self._transitions: List[List[int]] = [[] for _ in self._epochs]
+        for position, ordinal in enumerate(self.ordinals):
+            self._transitions[bisect_left(self._epochs, ordinal)].append(position)
+
+        self._by_date = sorted(range(len(games)), key=lambda p: self.ordinals[p])
+        self._sorted_ordinals = [self.ordinals[p] for p in self._by_date]
+
+        self._max_snapshots = max_snapshots
+        self._snapshots: OrderedDict = OrderedDict()
+        self._snapshots[0] = list(self._hidden)
+        self._lock = Lock()
+
+    @staticmethod
+    def _hide(game: Dict[str, Any]) -> Dict[str, Any]:
+        game_copy = game.copy()
+        if game['stage'] != 'group':
+            game_copy['team_a'] = "TBD"
+            game_copy['team_b'] = "TBD"
+        game_copy['result'] = None
+        game_copy['winner'] = None
+        return game_copy
+
+    def epoch(self, date: str) -> int:
+        """Number of game dates on or before the given date"""
+        return bisect_right(self._epochs, date_ordinal(date))
+
+    def view(self, date: str) -> List[Dict[str, Any]]:
+        """Get the games as they should be shown on the given date"""
+        epoch = self.epoch(date)
+        with self._lock:
+            snapshot = self._snapshots.get(epoch)
+            if snapshot is not None:
+                self._snapshots.move_to_end(epoch)
+                return snapshot
+
+            nearest = min(self._snapshots, key=lambda e: abs(e - epoch))
+            snapshot = list(self._snapshots[nearest])
+            for position in self.changed_between(nearest, epoch):
+                snapshot[position] = self._revealed[position] if nearest < epoch else self._hidden[position]
+
+            self._snapshots[epoch] = snapshot
+            if len(self._snapshots) > self._max_snapshots:
+                self._snapshots.popitem(last=False)
+            return snapshot
+
+    def changed_between(self, from_epoch: int, to_epoch: int) -> List[int]:
+        """Positions of the games whose view differs between two epochs"""
+        low, high = sorted((from_epoch, to_epoch))
+        return [p for transition in self._transitions[low:high] for p in transition]
+
+    def positions_between(self, start_ordinal: int, end_ordinal: int) -> List[int]:
+        """Positions of the games dated in [start, end), in row order"""
+        low = bisect_left(self._sorted_ordinals, start_ordinal)
+        high = bisect_left(self._sorted_ordinals, end_ordinal)
+        return sorted(self._by_date[low:high])
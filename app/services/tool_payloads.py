@@ -0,0 +1,160 @@
+import re
+from typing import Dict, List, Any, Optional, Iterable, Set
+
+# Projections and preference ranking for agent tool results. Everything a tool
+# returns is serialized into the model context, so tools hand back only the
+# fields the assistant needs to answer, best matches first.
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def _words(values: Iterable[Any]) -> Set[str]:
+    words = set()
+    for value in values:
+        for word in _WORD.findall(str(value).lower()):
+            words.add(word[:-1] if len(word) > 3 and word.endswith('s') else word)
+    return words
+
+
+def _compact(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in record.items() if v not in (None, "", [])}
+
+
+def preference_words(fan: Optional[Dict[str, Any]], category: str) -> Set[str]:
+    """Words from one of the fan's preference categories (e.g. "food", "activities")"""
+    if not fan:
+        return set()
+    values = fan.get('preferences', {}).get(category, [])
+    return _words(values if isinstance(values, list) else [values])
+
+
+def project_restaurant(restaurant: Dict[str, Any]) -> Dict[str, Any]:
+    return _compact({
+        "name": restaurant.get('name'),
+        "cuisine": restaurant.get('cuisine'),
+        "price": restaurant.get('price_range'),
+        "rating": restaurant.get('rating'),
+        "hours": restaurant.get('hours'),
+        "near_stadium": restaurant.get('near_stadium'),
+        "popular_dishes": restaurant.get('popular_dishes', [])[:3],
+        "reservations_required": restaurant.get('reservations_required') or None,
+        "distance_km": restaurant.get('distance_km'),
+    })
+
+
+def project_attraction(attraction: Dict[str, Any]) -> Dict[str, Any]:
+    return _compact({
+        "name": attraction.get('name'),
+        "type": attraction.get('type'),
+        "price": attraction.get('price_range'),
+        "rating": attraction.get('rating'),
+        "hours": attraction.get('hours'),
+        "visit_length": attraction.get('suggested_visit_length'),
+        "tags": attraction.get('tags'),
+        "distance_km": attraction.get('distance_km'),
+    })
+
+
+def project_hotel(hotel: Dict[str, Any]) -> Dict[str, Any]:
+    return _compact({
+        "name": hotel.get('name'),
+        "city": hotel.get('city'),
+        "rating": hotel.get('rating'),
+        "amenities": hotel.get('amenities'),
+        "distance_km": hotel.get('distance_km'),
+    })
+
+
+def project_stadium(stadium: Dict[str, Any]) -> Dict[str, Any]:
+    return _compact({
+        "name": stadium.get('name'),
+        "city": stadium.get('city'),
+        "capacity": stadium.get('capacity'),
+        "distance_km": stadium.get('distance_km'),
+    })
+
+
+def project_game(game: Dict[str, Any], stadium: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    result = game.get('result')
+    return _compact({
+        "id": game['id'],
+        "date": game['date'],
+        "time": game.get('time'),
+        "stage": game.get('stage'),
+        "group": game.get('group'),
+        "match": f"{game['team_a']} vs {game['team_b']}",
+        "stadium": f"{stadium['name']}, {stadium['city']}" if stadium else None,
+        "score": f"{result['score_a']}-{result['score_b']}" if result else None,
+        "winner": game.get('winner'),
+    })
+
+
+def project_team(team: Dict[str, Any]) -> Dict[str, Any]:
+    return _compact({"name": team.get('name'), "group": team.get('group')})
+
+
+def project_standing(standing: Dict[str, Any], stadium_lookup) -> Dict[str, Any]:
+    """A team's standing with its group table as one line per team and its games projected"""
+    next_game = standing.get('next_game')
+    return _compact({
+        "team": standing['team'],
+        "group": standing['group'],
+        "status": standing['status'],
+        "eliminated_in": standing.get('eliminated_in'),
+        "table": [
+            f"{row['position']}. {row['team']} P{row['played']} W{row['won']} D{row['drawn']} L{row['lost']} "
+            f"GD{row['goal_difference']:+d} Pts{row['points']}"
+            for row in standing['table']
+        ],
+        "knockout_games": [project_game(g, stadium_lookup(g['stadium_id'])) for g in standing['knockout_games']],
+        "next_game": project_game(next_game, stadium_lookup(next_game['stadium_id'])) if next_game else None,
+    })
+
+
+PROJECTIONS = {
+    'restaurants': project_restaurant,
+    'attractions': project_attraction,
+    'hotels': project_hotel,
+    'stadiums': project_stadium,
+    'teams': project_team,
+}
+
+
+def _score(place: Dict[str, Any], wanted: Set[str], fields: List[str]) -> float:
+    values = []
+    for field in fields:
+        value = place.get(field)
+        values.extend(value if isinstance(value, list) else [value])
+    matches = len(wanted & _words(v for v in values if v))
+    return 2 * matches + float(place.get('rating') or 0) / 5
+
+
+def rank_restaurants(restaurants: List[Dict[str, Any]], fan: Optional[Dict[str, Any]],
+                     limit: int) -> List[Dict[str, Any]]:
+    """Project restaurants, best match for the fan's food preferences first"""
+    wanted = preference_words(fan, 'food')
+    ranked = sorted(restaurants, key=lambda r: -_score(r, wanted, ['cuisine', 'popular_dishes', 'name']))
+    return [project_restaurant(r) for r in ranked[:limit]]
+
+
+def rank_attractions(attractions: List[Dict[str, Any]], fan: Optional[Dict[str, Any]],
+                     limit: int) -> List[Dict[str, Any]]:
+    """Project attractions, best match for the fan's activity preferences first"""
+    wanted = preference_words(fan, 'activities')
+    ranked = sorted(attractions, key=lambda a: -_score(a, wanted, ['type', 'tags', 'name']))
+    return [project_attraction(a) for a in ranked[:limit]]
+
+
+def select_games(games: List[Dict[str, Any]], fan: Optional[Dict[str, Any]], limit: int,
+                 stadium_lookup) -> List[Dict[str, Any]]:
+    """Project games in date order, keeping the fan's own team and tickets when trimming to `limit`"""
+    attending = set(fan.get('attending_games', [])) if fan else set()
+    team = fan.get('team_supported', '').lower() if fan else ''
+
+    def priority(game):
+        involved = bool(team) and team in (game['team_a'].lower(), game['team_b'].lower())
+        return (game['id'] not in attending, not involved)
+
+    kept = sorted(games, key=priority)[:limit]
+    kept.sort(key=lambda g: (g['date'], g.get('time') or ''))
+    return [project_game(g, stadium_lookup(g['stadium_id'])) for g in kept]
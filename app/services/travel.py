@@ -0,0 +1,143 @@
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from services.geo_service import EARTH_RADIUS_KM, coordinates
+
+# Travel time is estimated from the great-circle distance: roads run about a
+# third longer than the straight line, city traffic is slow, intercity roads
+# fast, and beyond FLIGHT_MIN_KM flying (with time for getting to and through
+# the airport) is assumed.
+ROAD_FACTOR = 1.3
+CITY_KM = 30.0
+CITY_SPEED_KMH = 35.0
+ROAD_SPEED_KMH = 90.0
+FLIGHT_MIN_KM = 600.0
+FLIGHT_SPEED_KMH = 750.0
+FLIGHT_OVERHEAD_MINUTES = 150.0
+
+# Category pairs whose full matrices are built with the data and kept; any
+# other pair is computed for just the places asked about
+EAGER_PAIRS = (('hotels', 'stadiums'),)
+
+
+def haversine(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km between points given in radians, element-wise with broadcasting"""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km between every point of one set (rows) and another (columns), in radians"""
+    return haversine(lat1[:, None], lon1[:, None], lat2[None, :], lon2[None, :])
+
+
+def travel_minutes(distance_km: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Estimated door-to-door minutes for great-circle distances, and whether each trip is a flight"""
+    road_km = distance_km * ROAD_FACTOR
+    city = np.minimum(road_km, CITY_KM)
+    driving = (city / CITY_SPEED_KMH + (road_km - city) / ROAD_SPEED_KMH) * 60
+    flight = distance_km >= FLIGHT_MIN_KM
+    flying = FLIGHT_OVERHEAD_MINUTES + distance_km / FLIGHT_SPEED_KMH * 60
+    return np.where(flight, flying, driving), flight
+
+
+class TravelMatrix:
+    """
+    Distances and estimated travel times between the places of one data
+    load. Coordinates of each category are held as NumPy arrays. The full
+    matrices of EAGER_PAIRS (hotels to stadiums) are computed with the data in
+    one vectorized haversine pass, so lookups for many pairs at once are a
+    single gather; for any other pair only the requested row or pairs are
+    computed, so no request can make the matrix of two large categories.
+    Matrix rows are mapped to row positions in the category's records, which
+    are resolved only for the places returned.
+    """
+
+    def __init__(self, places: Dict[str, List[Dict[str, Any]]]):
+        self._rows: Dict[str, Dict[Any, int]] = {}
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        self._positions: Dict[str, List[int]] = {}
+        self._radians: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for category, records in places.items():
+            rows, kept, points = {}, [], []
+            for position, record in enumerate(records):
+                point = coordinates(record)
+                if point is None:
+                    continue
+                rows[record['id']] = len(kept)
+                kept.append(position)
+                points.append(point)
+            radians = np.radians(np.array(points, dtype=np.float64).reshape(-1, 2))
+            self._rows[category] = rows
+            self._records[category] = records
+            self._positions[category] = kept
+            self._radians[category] = (radians[:, 0], radians[:, 1])
+
+        self._matrices: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for pair in EAGER_PAIRS:
+            if all(category in self._rows for category in pair):
+                distance = haversine_matrix(*self._radians[pair[0]], *self._radians[pair[1]])
+                self._matrices[pair] = (distance, *travel_minutes(distance))
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._rows)
+
+    def row(self, category: str, place_id: Any) -> Optional[int]:
+        """Row of a place in its category's matrices, or None if it has no coordinates"""
+        return self._rows.get(category, {}).get(place_id)
+
+    def _eager(self, from_category: str, to_category: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        matrices = self._matrices.get((from_category, to_category))
+        if matrices is None:
+            reverse = self._matrices.get((to_category, from_category))
+            if reverse is not None:
+                matrices = tuple(m.T for m in reverse)
+        return matrices
+
+    def _trip_arrays(self, from_category: str, rows: np.ndarray, to_category: str,
+                     cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(distance_km, minutes, is_flight) from rows[i] to cols[i], broadcast like NumPy indexing"""
+        matrices = self._eager(from_category, to_category)
+        if matrices is not None:
+            return tuple(m[rows, cols] for m in matrices)
+        (lat1, lon1), (lat2, lon2) = self._radians[from_category], self._radians[to_category]
+        distance = haversine(lat1[rows], lon1[rows], lat2[cols], lon2[cols])
+        return (distance, *travel_minutes(distance))
+
+    def trips(self, from_category: str, from_ids: List[Any], to_category: str,
+              to_ids: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Distance and travel time for each (from_ids[i], to_ids[i]) pair, None where a place is unknown"""
+        from_index, to_index = self._rows.get(from_category, {}), self._rows.get(to_category, {})
+        rows = np.fromiter((from_index.get(i, -1) for i in from_ids), dtype=np.intp, count=len(from_ids))
+        cols = np.fromiter((to_index.get(i, -1) for i in to_ids), dtype=np.intp, count=len(to_ids))
+        known = (rows >= 0) & (cols >= 0)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(from_ids)
+        if not known.any():
+            return results
+
+        distance, minutes, flight = self._trip_arrays(from_category, rows[known], to_category, cols[known])
+        km = np.round(distance, 1).tolist()
+        mins = np.rint(minutes).astype(int).tolist()
+        modes = np.where(flight, "flight", "drive").tolist()
+        for index, d, m, mode in zip(np.flatnonzero(known).tolist(), km, mins, modes):
+            results[index] = {"distance_km": d, "travel_minutes": m, "mode": mode}
+        return results
+
+    def from_place(self, from_category: str, from_id: Any, to_category: str,
+                   limit: Optional[int] = None) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Every place of a category as (record, trip) from one place, quickest first"""
+        row = self.row(from_category, from_id)
+        if row is None or to_category not in self._rows:
+            return []
+        cols = np.arange(len(self._positions[to_category]))
+        distance, minutes, flight = self._trip_arrays(from_category, row, to_category, cols)
+        order = np.argsort(minutes, kind='stable')[:limit]
+        records, positions = self._records[to_category], self._positions[to_category]
+        return [
+            (records[positions[col]],
+             {"distance_km": round(float(distance[col]), 1), "travel_minutes": int(round(minutes[col])),
+              "mode": "flight" if flight[col] else "drive"})
+            for col in order.tolist()
+        ]
@@ -0,0 +1,38 @@
+import json
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from benchmarks.synthetic import write_dataset  # noqa: E402
+
+DATA_DIR = os.path.join(APP_DIR, 'data')
+
+
+def load_collection(data_dir, name):
+    with open(os.path.join(data_dir, f'{name}.json')) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='session')
+def synthetic_dir(tmp_path_factory):
+    """A small synthetic dataset, with more fans and stays than the bundled one"""
+    data_dir = str(tmp_path_factory.mktemp('data'))
+    write_dataset(data_dir, fans=300, games=104, hotels=40, restaurants=40, attractions=40, seed=7)
+    return data_dir
+
+
+@pytest.fixture(params=['bundled', 'synthetic'])
+def data_dir(request, synthetic_dir):
+    return DATA_DIR if request.param == 'bundled' else synthetic_dir
+
+
+@pytest.fixture(scope='session')
+def client():
+    """A test client for the Flask app on the bundled data, serving the data routes only"""
+    os.environ['DALIL_SERVE'] = 'data'
+    import app
+    return app.app.test_client()
@@ -0,0 +1,53 @@
+from services.answer_cache import AnswerCache
+
+CONTEXT = ("Riyadh", "2034-06-13", "Saudi Arabia", (), 1)
+
+
+def test_paraphrase_reuses_answer():
+    cache = AnswerCache()
+    cache.store("Best seafood restaurants open late near the Riyadh stadium", CONTEXT, "riyadh answer")
+    assert cache.lookup("best seafood restaurant open late near Riyadh stadium please", CONTEXT) == "riyadh answer"
+    assert cache.lookup("Can you recommend the best seafood restaurants open late near Riyadh stadium",
+                        CONTEXT) == "riyadh answer"
+
+
+def test_different_city_does_not_reuse_answer():
+    cache = AnswerCache()
+    cache.store("Best seafood restaurants open late near the Riyadh stadium", CONTEXT, "riyadh answer")
+    assert cache.lookup("Best seafood restaurants open late near the Jeddah stadium", CONTEXT) is None
+
+
+def test_different_place_or_team_does_not_reuse_answer():
+    cache = AnswerCache()
+    cache.store("How do I get to King Fahd stadium from the airport by taxi", CONTEXT, "fahd answer")
+    cache.store("When is the next Spain game in the group stage", CONTEXT, "spain answer")
+    assert cache.lookup("How do I get to King Abdullah stadium from the airport by taxi", CONTEXT) is None
+    assert cache.lookup("When is the next Saudi Arabia game in the group stage", CONTEXT) is None
+    assert cache.lookup("How do I get to the stadium from the airport by taxi", CONTEXT) is None
+
+
+def test_different_cuisine_does_not_reuse_answer():
+    cache = AnswerCache()
+    cache.store("cheap italian restaurants in Jeddah for dinner", CONTEXT, "italian answer")
+    assert cache.lookup("cheap seafood restaurants in Jeddah for dinner", CONTEXT) is None
+    assert cache.lookup("cheap italian restaurants in Jeddah for lunch", CONTEXT) is None
+    assert cache.lookup("expensive italian restaurants in Jeddah for dinner", CONTEXT) is None
+
+
+def test_different_diet_does_not_reuse_answer():
+    cache = AnswerCache()
+    cache.store("Where can I find halal restaurants near the stadium", CONTEXT, "halal answer")
+    assert cache.lookup("Where can I find vegetarian restaurants near the stadium", CONTEXT) is None
+
+
+def test_different_date_does_not_reuse_answer():
+    cache = AnswerCache()
+    cache.store("Which games are played on June 15 in Riyadh", CONTEXT, "june 15 answer")
+    assert cache.lookup("Which games are played on June 14 in Riyadh", CONTEXT) is None
+    assert cache.lookup("Which games are played on July 15 in Riyadh", CONTEXT) is None
+
+
+def test_follow_up_is_not_cached():
+    cache = AnswerCache()
+    cache.store("What about restaurants near it", CONTEXT, "answer")
+    assert cache.lookup("What about restaurants near it", CONTEXT) is None
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from services.data_service import DataService
+
+SIMULATED_DATE = "2034-06-20"
+
+
+@pytest.fixture
+def data_service(data_dir):
+    return DataService(SIMULATED_DATE, data_dir=data_dir)
+
+
+def test_query_games_matches_brute_force(data_service):
+    games = data_service.games
+    order = {id(g): position for position, g in enumerate(games)}
+    stadium_city = {s['id']: s['city'].lower() for s in data_service.stadiums}
+    teams = sorted({g['team_a'] for g in games})[:6] + ['TBD', 'nowhere']
+    cities = sorted({c.title() for c in stadium_city.values()})[:3] + ['nowhere']
+    rng = random.Random(3)
+    for _ in range(200):
+        kw = {}
+        if rng.random() < 0.5:
+            kw['team'] = rng.choice(teams)
+        if rng.random() < 0.5:
+            kw['stage'] = rng.choice(['group', 'final', 'round_of_32'])
+        if rng.random() < 0.5:
+            kw['city'] = rng.choice(cities)
+        if rng.random() < 0.5:
+            kw['date_from'] = '2034-06-%02d' % rng.randint(10, 30)
+        if rng.random() < 0.5:
+            kw['date_to'] = '2034-07-%02d' % rng.randint(1, 30)
+        if rng.random() < 0.3:
+            kw['ids'] = rng.sample([g['id'] for g in games] + [-1], min(20, len(games)))
+        expected = [
+            g for g in games
+            if (not kw.get('team') or kw['team'].lower() in (g['team_a'].lower(), g['team_b'].lower()))
+            and (not kw.get('stage') or g['stage'] == kw['stage'])
+            and (not kw.get('city') or stadium_city.get(g['stadium_id']) == kw['city'].lower())
+            and (not kw.get('date_from') or g['date'] >= kw['date_from'])
+            and (not kw.get('date_to') or g['date'] <= kw['date_to'])
+            and (kw.get('ids') is None or g['id'] in kw['ids'])
+        ]
+        expected.sort(key=lambda g: (g['date'], order[id(g)]))
+        assert data_service.query_games(**kw) == expected, kw
+
+
+def test_query_fans_matches_brute_force(data_service):
+    fans = data_service.fans
+    hotel_city = {h['id']: h['city'].lower() for h in data_service.hotels}
+    teams = sorted({f['team_supported'] for f in fans})[:5] + ['nowhere']
+    cities = sorted(set(hotel_city.values()))[:3] + ['nowhere']
+    game_ids = sorted({g for f in fans for g in f.get('attending_games', [])})[:10] + [-1]
+    rng = random.Random(5)
+    for _ in range(200):
+        kw = {}
+        if rng.random() < 0.5:
+            kw['team'] = rng.choice(teams).upper()
+        if rng.random() < 0.5:
+            kw['city'] = rng.choice(cities)
+        if rng.random() < 0.5:
+            kw['game_id'] = rng.choice(game_ids)
+        if rng.random() < 0.3:
+            kw['ids'] = rng.sample([f['id'] for f in fans] + [-1], min(20, len(fans)))
+        expected = [
+            f for f in fans
+            if (not kw.get('team') or f['team_supported'].lower() == kw['team'].lower())
+            and (not kw.get('city') or kw['city'] in {hotel_city.get(s['hotel_id']) for s in f.get('hotel_stays', [])})
+            and (kw.get('game_id') is None or kw['game_id'] in f.get('attending_games', []))
+            and (kw.get('ids') is None or f['id'] in kw['ids'])
+        ]
+        assert data_service.query_fans(**kw) == sorted(expected, key=lambda f: fans.index(f)), kw
+
+
+def test_games_batch_pages_and_projects(client):
+    body = client.post('/api/games/batch', json={"ids": [3, 1, 2, 10 ** 6], "fields": ["date"], "limit": 2}).get_json()
+    assert body["total"] == 3 and body["next_offset"] == 2 and body["missing"] == [10 ** 6]
+    assert all(set(item) == {"id", "date"} for item in body["items"])
+    rest = client.get('/api/games/batch?ids=3,1,2&fields=date&limit=2&offset=2').get_json()
+    assert len(rest["items"]) == 1 and rest["next_offset"] is None
+    assert {item["id"] for item in body["items"] + rest["items"]} == {1, 2, 3}
+
+    assert client.get('/api/games/batch?limit=100000').get_json()["limit"] == 500
+
+
+@pytest.mark.parametrize('path, kwargs', [
+    ('/api/games/batch', {"json": [1, 2]}),
+    ('/api/games/batch', {"json": {"ids": 5}}),
+    ('/api/games/batch', {"json": {"ids": [1, "x"]}}),
+    ('/api/games/batch', {"json": {"fields": [1]}}),
+    ('/api/games/batch', {"json": {"team": ["Spain"]}}),
+    ('/api/games/batch', {"json": {"date_from": "June 1"}}),
+    ('/api/fans/batch', {"json": {"game_id": "x"}}),
+    ('/api/fans/batch', {"json": {}}),
+])
+def test_batch_rejects_malformed_requests(client, path, kwargs):
+    assert client.post(path, **kwargs).status_code == 400
@@ -0,0 +1,71 @@
+import pytest
+
+from services.change_feed import ChangeFeed
+from services.data_service import DataService
+from tests.conftest import DATA_DIR
+from tests.test_timeline import process_games_for_date
+
+
+@pytest.fixture
+def service():
+    return DataService("2034-06-13", data_dir=DATA_DIR)
+
+
+def _ids(events):
+    return [sequence for sequence, _, _ in events]
+
+
+def test_without_an_id_a_client_starts_from_now(service):
+    feed = ChangeFeed(service)
+    service.update_simulated_date("2034-06-20")
+    assert feed.since(None) == ([], False)
+    assert feed.since("") == ([], False)
+
+
+def test_replays_the_events_after_an_id(service):
+    feed = ChangeFeed(service)
+    start = feed.last_event_id
+    for current in ("2034-06-14", "2034-06-20", "2034-06-25"):
+        service.update_simulated_date(current)
+    events, reset = feed.since(start)
+    assert (_ids(events), reset) == ([1, 2, 3], False)
+    assert _ids(feed.since(feed.event_id(2))[0]) == [3]
+    assert feed.since(feed.last_event_id) == ([], False)
+
+
+def test_unknown_ahead_or_expired_ids_reset(service):
+    feed = ChangeFeed(service, max_events=2)
+    for current in ("2034-06-14", "2034-06-20", "2034-06-25", "2034-07-01"):
+        service.update_simulated_date(current)
+    # Events 3 and 4 are kept, so an id of 2 still replays exactly what was missed
+    events, reset = feed.since(feed.event_id(2))
+    assert (_ids(events), reset) == ([3, 4], False)
+    for last_event_id in (feed.event_id(1), feed.event_id(0), feed.event_id(5), "0000000-2", "garbage",
+                          f"{feed.stream_id}-x"):
+        assert feed.since(last_event_id) == ([], True), last_event_id
+    assert ChangeFeed(service).since(feed.event_id(4)) == ([], True)
+
+
+def test_date_events_list_the_revealed_and_hidden_games(service):
+    feed = ChangeFeed(service)
+    raw = service.raw_games
+    service.update_simulated_date("2034-07-05")
+    service.update_simulated_date("2034-06-13")
+    (_, forward_name, forward), (_, back_name, back) = feed.since(feed.event_id(0))[0]
+
+    before, after = process_games_for_date(raw, "2034-06-13"), process_games_for_date(raw, "2034-07-05")
+    assert forward_name == back_name == "date"
+    assert (forward['previous_date'], forward['date']) == ("2034-06-13", "2034-07-05")
+    assert [g['id'] for g in forward['results_revealed']] == \
+        [a['id'] for b, a in zip(before, after) if b['result'] is None and a['result'] is not None]
+    assert [g['id'] for g in forward['teams_revealed']] == \
+        [a['id'] for b, a in zip(before, after) if (b['team_a'], b['team_b']) != (a['team_a'], a['team_b'])]
+    assert forward['hidden'] == []
+    assert back['hidden'] == [b['id'] for b, a in zip(before, after) if b != a]
+    assert back['results_revealed'] == back['teams_revealed'] == []
+
+
+def test_reload_publishes_the_new_version(service):
+    feed = ChangeFeed(service)
+    version = service.reload()
+    assert feed.since(feed.event_id(0))[0] == [(1, "reload", {"data_version": version, "date": "2034-06-13"})]
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from services.concurrency import ConcurrencyLimiter, QueueFullError
+
+
+def _hold(limiter, entered, release):
+    with limiter.slot():
+        entered.set()
+        release.wait(5)
+
+
+def test_queue_full_is_rejected_with_retry_after():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=5)
+    entered, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=_hold, args=(limiter, entered, release))
+    holder.start()
+    entered.wait(5)
+
+    queued = threading.Thread(target=_hold, args=(limiter, threading.Event(), release))
+    queued.start()
+    while limiter.waiting < 1:
+        time.sleep(0.01)
+
+    with pytest.raises(QueueFullError) as error:
+        with limiter.slot():
+            pass
+    assert error.value.retry_after >= 1
+    assert limiter.rejected == 1
+
+    release.set()
+    holder.join(5)
+    queued.join(5)
+    assert (limiter.active, limiter.waiting) == (0, 0)
+
+
+def test_queued_request_times_out():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=4, queue_timeout=0.1)
+    entered, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=_hold, args=(limiter, entered, release))
+    holder.start()
+    entered.wait(5)
+
+    with pytest.raises(QueueFullError):
+        with limiter.slot():
+            pass
+    assert (limiter.active, limiter.waiting, limiter.rejected) == (1, 0, 1)
+
+    release.set()
+    holder.join(5)
+    with limiter.slot():
+        assert limiter.active == 1
+
+
+def test_slots_cap_concurrency():
+    limiter = ConcurrencyLimiter(max_concurrent=3, max_queue=100, queue_timeout=5)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def work():
+        with limiter.slot():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert peak[0] == 3
+    assert limiter.rejected == 0
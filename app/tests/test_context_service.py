@@ -0,0 +1,103 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from services.context_service import ConversationContext
+from services.history_service import MemoryHistoryStore, SQLiteHistoryStore
+
+
+def _turns(count):
+    messages = []
+    for i in range(count):
+        messages += [HumanMessage(content=f"question {i} " + "x" * 200), AIMessage(content=f"answer {i} " + "y" * 200)]
+    return messages
+
+
+def _summary(messages):
+    first = messages[0]
+    return first.content if first.type == "system" else None
+
+
+def test_older_turns_are_summarized_once():
+    history = MemoryHistoryStore()
+    context = ConversationContext(history, token_budget=300, summary_tokens=5000)
+    history.append(1, _turns(10))
+    built = context.build(1, history.get_messages(1) + [HumanMessage(content="next")])
+    assert "question 0" in _summary(built)
+    assert built[-1].content == "next"
+
+    history.append(1, [HumanMessage(content="next"), AIMessage(content="ok")])
+    again = context.build(1, history.get_messages(1) + [HumanMessage(content="more")])
+    assert _summary(again).count("question 0") == 1
+
+
+def test_summary_expires_with_the_history():
+    history = MemoryHistoryStore(ttl_seconds=60)
+    context = ConversationContext(history, token_budget=300, summary_tokens=5000)
+    history.append(1, _turns(10))
+    assert _summary(context.build(1, history.get_messages(1) + [HumanMessage(content="next")]))
+
+    # The history (and its summary) expired: a new conversation starts without one
+    key = "1"
+    messages, _, version, summary = history._entries[key]
+    history._entries[key] = (messages, 0.0, version, summary)
+    built = context.build(1, history.get_messages(1) + [HumanMessage(content="hello, new conversation")])
+    assert [m.content for m in built] == ["hello, new conversation"]
+
+
+def test_summary_is_cleared_and_evicted_with_the_history():
+    history = MemoryHistoryStore(max_users=1)
+    context = ConversationContext(history, token_budget=300, summary_tokens=5000)
+    history.append(1, _turns(10))
+    context.build(1, history.get_messages(1) + [HumanMessage(content="next")])
+    history.clear(1)
+    assert history.get_summary(1) == (None, "")
+
+    history.append(1, _turns(10))
+    context.build(1, history.get_messages(1) + [HumanMessage(content="next")])
+    history.append(2, _turns(1))
+    history.get_messages(2)
+    assert history.get_summary(1) == (None, "")
+    assert context.build(1, [HumanMessage(content="hello")])[0].content == "hello"
+
+
+def test_repeated_messages_do_not_hide_turns():
+    # Every answer is the same, so the last folded message also appears later on
+    history = MemoryHistoryStore()
+    context = ConversationContext(history, token_budget=300, summary_tokens=5000)
+    for i in range(6):
+        history.append(1, [HumanMessage(content=f"question {i} " + "x" * 200), AIMessage(content="Sure!")])
+    context.build(1, history.get_messages(1) + [HumanMessage(content="next")])
+    for i in range(6, 12):
+        history.append(1, [HumanMessage(content=f"question {i} " + "x" * 200), AIMessage(content="Sure!")])
+
+    built = context.build(1, history.get_messages(1) + [HumanMessage(content="more")])
+    seen = "\n".join(str(m.content) for m in built)
+    for i in range(12):
+        assert seen.count(f"question {i} ") == 1
+
+
+def test_summary_is_shared_through_sqlite(tmp_path):
+    path = str(tmp_path / "history.db")
+    workers = [MemoryHistoryStore(backing=SQLiteHistoryStore(path)) for _ in range(2)]
+    folded = []
+
+    def summarizer(previous, messages):
+        folded.extend(m.content for m in messages)
+        return "\n".join(filter(None, [previous] + [m.content[:12] for m in messages]))
+
+    contexts = [ConversationContext(worker, token_budget=300, summary_tokens=5000, summarizer=summarizer)
+                for worker in workers]
+    workers[0].append(1, _turns(10))
+    contexts[0].build(1, workers[0].get_messages(1) + [HumanMessage(content="next")])
+    assert workers[1].get_summary(1) == workers[0].get_summary(1)
+    assert workers[1].get_summary(1)[1]
+
+    # The other worker only folds the turns that left the window since
+    count = len(folded)
+    workers[1].append(1, _turns(2))
+    built = contexts[1].build(1, workers[1].get_messages(1) + [HumanMessage(content="more")])
+    assert len(folded) - count == 4
+    assert len(folded) == len(set(folded))
+    assert "question 0" in _summary(built)
+
+    workers[1].clear(1)
+    assert workers[0].get_summary(1) == (None, "")
@@ -0,0 +1,35 @@
+import copy
+
+import pytest
+
+from services.dataset import DATA_FILES, validate_collections
+from tests.conftest import load_collection
+
+
+@pytest.fixture(scope='module')
+def collections():
+    from tests.conftest import DATA_DIR
+    return {name: load_collection(DATA_DIR, name) for name in DATA_FILES}
+
+
+def test_bundled_data_is_valid(collections):
+    assert validate_collections(collections) == []
+
+
+@pytest.mark.parametrize('name, change, expected', [
+    ('fans', lambda fans: fans[0].update(hotel_stays=["not a stay"]), "hotel_stays[0] must be an object"),
+    ('fans', lambda fans: fans[0].update(hotel_stays={"hotel_id": 1}), "hotel_stays must be a list"),
+    ('fans', lambda fans: fans[0].update(attending_games=7), "attending_games must be a list"),
+    ('fans', lambda fans: fans[0].update(attending_games=[[1]]), "unknown game [1]"),
+    ('fans', lambda fans: fans[0]['hotel_stays'][0].update(hotel_id={"id": 1}), "unknown hotel_id"),
+    ('fans', lambda fans: fans.append("not a fan"), "expected an object with an id"),
+    ('games', lambda games: games.append(["not", "a", "game"]), "expected an object with an id"),
+    ('games', lambda games: games[0].update(id=[1]), "expected an object with an id"),
+    ('games', lambda games: games[0].update(stadium_id=[1]), "unknown stadium_id"),
+    ('hotels', lambda hotels: hotels.insert(0, None), "expected an object with an id"),
+])
+def test_malformed_records_are_reported(collections, name, change, expected):
+    broken = copy.deepcopy(collections)
+    change(broken[name])
+    errors = validate_collections(broken)
+    assert any(expected in error for error in errors), errors
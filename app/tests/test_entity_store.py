@@ -0,0 +1,59 @@
+import pytest
+
+from services.data_service import DataService
+from tests.conftest import load_collection
+from tests.test_timeline import all_dates, process_games_for_date
+
+SIMULATED_DATE = "2034-06-20"
+
+
+@pytest.fixture(params=[False, True], ids=['dicts', 'compact'])
+def service(request, data_dir):
+    return DataService(SIMULATED_DATE, data_dir=data_dir, compact=request.param), data_dir
+
+
+def _find(records, record_id):
+    return next((r for r in records if r['id'] == record_id), None)
+
+
+def test_id_lookups_match_linear_scan(service):
+    data_service, data_dir = service
+    games = process_games_for_date(load_collection(data_dir, 'games'), SIMULATED_DATE)
+    lookups = {
+        'stadiums': data_service.get_stadium_by_id,
+        'fans': data_service.get_fan_by_id,
+        'hotels': data_service.get_hotel_by_id,
+        'restaurants': data_service.get_restaurant_by_id,
+        'attractions': data_service.get_attraction_by_id,
+    }
+    for name, lookup in lookups.items():
+        records = load_collection(data_dir, name)
+        for record_id in [r['id'] for r in records] + [-1, 10 ** 9]:
+            assert lookup(record_id) == _find(records, record_id)
+    for game_id in [g['id'] for g in games] + [-1]:
+        assert data_service.get_game_by_id(game_id) == _find(games, game_id)
+
+
+def test_game_queries_match_linear_scan(service):
+    data_service, data_dir = service
+    raw_games = load_collection(data_dir, 'games')
+    games = process_games_for_date(raw_games, SIMULATED_DATE)
+    for current in all_dates(raw_games, margin=1)[::5]:
+        assert data_service.get_games_for_date(current) == [g for g in games if g['date'] == current]
+
+    teams = {g['team_a'] for g in raw_games} | {'spain', 'ARAB', 'Nowhere'}
+    for team in sorted(teams):
+        expected = [g for g in games if team.lower() in g['team_a'].lower() or team.lower() in g['team_b'].lower()]
+        assert data_service.get_games_for_team(team) == expected
+        assert data_service.get_games_for_team(team, SIMULATED_DATE) == \
+            [g for g in expected if g['date'] >= SIMULATED_DATE]
+
+
+def test_city_lookups_match_linear_scan(service):
+    data_service, data_dir = service
+    for name, lookup in (('restaurants', data_service.get_restaurants_by_city),
+                         ('attractions', data_service.get_attractions_by_city)):
+        records = load_collection(data_dir, name)
+        cities = {r.get('city', '') for r in records} | {'RIYADH', 'nowhere'}
+        for city in sorted(cities):
+            assert lookup(city) == [r for r in records if r.get('city', '').lower() == city.lower()]
@@ -0,0 +1,69 @@
+import math
+
+import pytest
+
+from services.geo_service import GeoIndex, coordinates, haversine_km
+from tests.conftest import load_collection
+
+CATEGORIES = ('hotels', 'stadiums', 'restaurants', 'attractions')
+POINTS = [(24.7136, 46.6753), (21.5433, 39.1728), (26.4207, 50.0888), (28.3838, 36.5550), (0.0, 0.0)]
+
+
+@pytest.fixture
+def places(data_dir):
+    return {category: load_collection(data_dir, category) for category in CATEGORIES}
+
+
+def _brute_force(records, lat, lon):
+    located = [(haversine_km(lat, lon, *coordinates(r)), r['id']) for r in records if coordinates(r)]
+    return sorted(located)
+
+
+@pytest.mark.parametrize('point', POINTS)
+def test_nearest_matches_brute_force(places, point):
+    index = GeoIndex(places)
+    for category in CATEGORIES:
+        expected = _brute_force(places[category], *point)
+        for limit in (1, 5, 50):
+            found = index.nearest(category, *point, limit=limit)
+            assert [d for d, _ in found] == pytest.approx([d for d, _ in expected[:limit]])
+
+        within = index.nearest(category, *point, limit=len(expected), max_km=150)
+        assert sorted(r['id'] for _, r in within) == sorted(i for d, i in expected if d <= 150)
+
+
+def test_bbox_matches_brute_force(places):
+    index = GeoIndex(places)
+    south, west, north, east = 21.0, 39.0, 25.0, 47.0
+    for category in CATEGORIES:
+        expected = sorted(r['id'] for r in places[category]
+                          if coordinates(r) and south <= coordinates(r)[0] <= north
+                          and west <= coordinates(r)[1] <= east)
+        assert sorted(r['id'] for r in index.in_bbox(category, south, west, north, east)) == expected
+
+
+def test_places_without_finite_coordinates_are_skipped():
+    hotels = [{'id': 1, 'lat': 24.7, 'lon': 46.7}, {'id': 2, 'lat': math.nan, 'lon': 46.7},
+              {'id': 3, 'location': {'latitude': 24.8, 'longitude': math.inf}}, {'id': 4}]
+    index = GeoIndex({'hotels': hotels})
+    assert [r['id'] for _, r in index.nearest('hotels', 24.7, 46.7, limit=10)] == [1]
+
+
+@pytest.mark.parametrize('query', [
+    'lat=nan&lon=46.7', 'lat=24.7&lon=inf', 'lat=91&lon=46.7', 'lat=24.7&lon=-181',
+    'lat=24.7&lon=46.7&radius_km=nan',
+])
+def test_nearby_rejects_invalid_points(client, query):
+    assert client.get(f'/api/nearby/hotels?{query}').status_code == 400
+
+
+def test_nearby_clamps_limit_and_radius(client):
+    response = client.get('/api/nearby/hotels?lat=24.7&lon=46.7&limit=100000&radius_km=1e12')
+    assert response.status_code == 200
+    assert len(response.get_json()) <= 100
+    assert len(client.get('/api/nearby/hotels?lat=24.7&lon=46.7&limit=-3').get_json()) == 1
+
+
+@pytest.mark.parametrize('bbox', ['nan,39,25,47', '21,39,25,inf', '-95,39,25,47', '25,39,21,47', '21,47,25,39'])
+def test_map_places_rejects_invalid_bbox(client, bbox):
+    assert client.get(f'/api/map/places?bbox={bbox}').status_code == 400
@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+from services.data_service import DataService
+from tests.conftest import load_collection
+from tests.test_timeline import all_dates, process_games_for_date
+
+
+class LinearFans:
+    """The linear fan lookups the itineraries replaced"""
+
+    def __init__(self, data_dir):
+        self.hotels = load_collection(data_dir, 'hotels')
+        self.stadiums = load_collection(data_dir, 'stadiums')
+        self.raw_games = load_collection(data_dir, 'games')
+
+    def hotel(self, hotel_id):
+        return next((h for h in self.hotels if h['id'] == hotel_id), None)
+
+    def current_hotel(self, fan, current_date):
+        current = datetime.strptime(current_date, "%Y-%m-%d")
+        for stay in fan.get('hotel_stays', []):
+            check_in = datetime.strptime(stay['check_in'], "%Y-%m-%d")
+            check_out = datetime.strptime(stay['check_out'], "%Y-%m-%d")
+            if check_in <= current < check_out:
+                hotel = self.hotel(stay['hotel_id'])
+                if hotel:
+                    return {"hotel": hotel, "check_in": stay['check_in'], "check_out": stay['check_out'],
+                            "days_left": (check_out - current).days}
+        return None
+
+    def next_hotel(self, fan, current_date):
+        current = datetime.strptime(current_date, "%Y-%m-%d")
+        future = [s for s in fan.get('hotel_stays', []) if datetime.strptime(s['check_in'], "%Y-%m-%d") > current]
+        if not future:
+            return None
+        stay = min(future, key=lambda s: datetime.strptime(s['check_in'], "%Y-%m-%d"))
+        hotel = self.hotel(stay['hotel_id'])
+        if not hotel:
+            return None
+        check_in = datetime.strptime(stay['check_in'], "%Y-%m-%d")
+        return {"hotel": hotel, "check_in": stay['check_in'], "check_out": stay['check_out'],
+                "days_until": (check_in - current).days}
+
+    def hotel_stays(self, fan):
+        return [{"hotel": self.hotel(s['hotel_id']), "check_in": s['check_in'], "check_out": s['check_out']}
+                for s in fan.get('hotel_stays', []) if self.hotel(s['hotel_id'])]
+
+    def attending_games(self, fan, simulated_date):
+        view = process_games_for_date(self.raw_games, simulated_date)
+        games = []
+        for game_id in fan.get('attending_games', []):
+            game = next((g for g in view if g['id'] == game_id), None)
+            if game:
+                game['is_past'] = game['date'] < simulated_date
+                stadium = next((s for s in self.stadiums if s['id'] == game['stadium_id']), None)
+                if stadium:
+                    game['stadium_name'] = stadium['name']
+                    game['stadium_city'] = stadium['city']
+                games.append(game)
+        games.sort(key=lambda g: g['date'])
+        return games
+
+
+def _assert_matches(service, linear, fans, dates):
+    for current in dates:
+        service.update_simulated_date(current)
+        for fan in fans:
+            assert service.get_fan_current_hotel(fan, current) == linear.current_hotel(fan, current)
+            assert service.get_fan_next_hotel(fan, current) == linear.next_hotel(fan, current)
+            assert service.get_fan_attending_games(fan, current) == linear.attending_games(fan, current)
+    for fan in fans:
+        assert service.get_fan_hotel_stays(fan) == linear.hotel_stays(fan)
+
+
+def test_itineraries_match_linear_lookups(data_dir):
+    service = DataService("2034-06-13", data_dir=data_dir)
+    fans = service.fans[:60]
+    _assert_matches(service, LinearFans(data_dir), fans, all_dates(service.raw_games)[::4])
+
+
+def test_reload_carries_over_only_unchanged_itineraries(synthetic_dir, tmp_path):
+    data_dir = str(tmp_path / 'data')
+    shutil.copytree(synthetic_dir, data_dir)
+    service = DataService("2034-06-13", data_dir=data_dir)
+    for fan in service.fans:
+        service.get_fan_itinerary(fan)
+
+    # Rename one hotel and move one fan's first stay to another hotel
+    hotels = load_collection(data_dir, 'hotels')
+    hotels[0]['name'] = 'Renamed Hotel'
+    fans = load_collection(data_dir, 'fans')
+    fans[0]['hotel_stays'][0]['hotel_id'] = hotels[-1]['id']
+    for name, records in (('hotels', hotels), ('fans', fans)):
+        with open(os.path.join(data_dir, f'{name}.json'), 'w') as f:
+            json.dump(records, f)
+    service.reload()
+
+    itineraries = service.dataset.itineraries
+    for fan in service.fans:
+        service.get_fan_itinerary(fan)
+    affected = {fan['id'] for fan in fans
+                if any(stay['hotel_id'] == hotels[0]['id'] for stay in fan['hotel_stays'])} | {fans[0]['id']}
+    assert itineraries.built == len(affected)
+    assert itineraries.carried_over == len(fans) - len(affected)
+    _assert_matches(service, LinearFans(data_dir), service.fans[:60], all_dates(service.raw_games)[::7])
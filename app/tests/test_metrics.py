@@ -0,0 +1,77 @@
+import json
+import logging
+
+import pytest
+
+from services.metrics import Metrics, metrics, request_id
+
+
+def _samples(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if line and not line.startswith('#'))
+
+
+def test_counters_histograms_and_gauges_render():
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.describe("jobs_total", "counter", "Jobs by kind")
+    registry.inc("jobs_total", kind="a")
+    registry.inc("jobs_total", 2, kind="a")
+    registry.inc("jobs_total", kind='quote"d')
+    for value in (0.05, 0.5, 5.0):
+        registry.observe("wait_seconds", value, queue="q")
+    registry.gauge("depth", "Queue depth", lambda: {"q1": 3, "q2": 0}, label="queue")
+    registry.gauge("broken", "Fails to read", lambda: 1 / 0)
+
+    text = registry.render()
+    samples = _samples(text)
+    assert "# HELP jobs_total Jobs by kind\n# TYPE jobs_total counter" in text
+    assert samples['jobs_total{kind="a"}'] == '3'
+    assert samples['jobs_total{kind="quote\\"d"}'] == '1'
+    assert samples['wait_seconds_bucket{queue="q",le="0.1"}'] == '1'
+    assert samples['wait_seconds_bucket{queue="q",le="1"}'] == '2'
+    assert samples['wait_seconds_bucket{queue="q",le="+Inf"}'] == '3'
+    assert samples['wait_seconds_count{queue="q"}'] == '3'
+    assert float(samples['wait_seconds_sum{queue="q"}']) == pytest.approx(5.55)
+    assert samples['depth{queue="q1"}'] == '3'
+    assert 'broken' not in text
+
+
+def test_spans_time_stages_and_log_the_request_id(caplog):
+    registry = Metrics(log_spans=True, buckets=(10.0,))
+    token = request_id.set("req-1")
+    try:
+        with caplog.at_level(logging.INFO, logger="dalil.metrics"):
+            with registry.span("tool", tool="search"):
+                pass
+            with pytest.raises(ValueError):
+                with registry.span("llm"):
+                    raise ValueError("boom")
+    finally:
+        request_id.reset(token)
+
+    samples = _samples(registry.render())
+    assert samples['dalil_stage_duration_seconds_count{stage="tool",tool="search"}'] == '1'
+    assert samples['dalil_stage_duration_seconds_count{stage="llm"}'] == '1'
+    records = [json.loads(r.getMessage()) for r in caplog.records]
+    assert [r["span"] for r in records] == ["tool", "llm"]
+    assert all(r["request_id"] == "req-1" for r in records)
+    assert records[1]["error"] == "ValueError"
+
+
+def test_disabled_registry_records_nothing():
+    registry = Metrics(enabled=False)
+    registry.inc("jobs_total")
+    registry.observe("wait_seconds", 1.0)
+    with registry.span("tool"):
+        pass
+    assert registry.render() == "\n"
+
+
+def test_metrics_endpoint_counts_requests(client):
+    if not metrics.enabled:
+        pytest.skip("metrics are disabled")
+    response = client.get('/api/stadiums', headers={'X-Request-ID': 'abc'})
+    assert response.headers['X-Request-ID'] == 'abc'
+    text = client.get('/metrics').get_data(as_text=True)
+    assert text.startswith('# HELP')
+    samples = _samples(text)
+    assert int(samples['dalil_http_requests_total{method="GET",route="/api/stadiums",status="200"}']) >= 1
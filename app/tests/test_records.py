@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from services import fast_json
+from services.records import Record, RecordTable
+from tests.conftest import load_collection
+
+RECORDS = [
+    {"id": 1, "name": "Al Faisaliah", "city": "Riyadh", "price": 420.5, "tags": ["spa"]},
+    {"id": 2, "name": "Hilton", "city": "Jeddah", "price": 310.0},
+    {"id": 3, "name": "Unnamed", "city": None, "price": 99.0, "stars": 3},
+]
+
+
+def test_rows_read_like_the_original_dicts():
+    table = RecordTable(RECORDS)
+    assert len(table) == 3
+    for record, row in zip(RECORDS, table):
+        assert isinstance(row, Record)
+        assert row == record and record == row.copy()
+        assert len(row) == len(record) and set(row) == set(record)
+        for field, value in record.items():
+            assert row[field] == value and row.get(field) == value and field in row
+    assert 'stars' not in table[0] and table[0].get('stars', 'none') == 'none'
+    with pytest.raises(KeyError):
+        table[0]['stars']
+    assert table[2]['city'] is None and 'city' in table[2]
+    assert table[-1] == RECORDS[-1] and table[1:] == RECORDS[1:]
+    with pytest.raises(IndexError):
+        table[3]
+
+
+def test_columns_are_packed_and_strings_shared():
+    table = RecordTable(RECORDS + [{"id": 4, "name": "Hilton", "city": "Jeddah", "price": 120.0}])
+    assert table.column('id').typecode == 'q'
+    assert table.column('price').typecode == 'd'
+    assert table[1]['city'] is table[3]['city']
+
+
+def test_copy_is_independent():
+    table = RecordTable(RECORDS)
+    copy = table[0].copy()
+    copy['name'] = 'changed'
+    assert table[0]['name'] == 'Al Faisaliah'
+
+
+def test_tables_serialize_like_their_dicts(data_dir):
+    for name in ('games', 'hotels', 'fans'):
+        records = load_collection(data_dir, name)
+        table = RecordTable(records)
+        assert table.to_dicts() == records
+        assert json.loads(fast_json.dumps(table)) == records
+        assert json.loads(fast_json.dumps({"items": table[:5], "first": table[0]})) == \
+            {"items": records[:5], "first": records[0]}
@@ -0,0 +1,55 @@
+import gzip
+import json
+
+import pytest
+
+from services.response_cache import ResponseCache
+
+ENDPOINTS = ['games', 'stadiums', 'hotels', 'restaurants', 'attractions', 'fans']
+
+
+def test_body_is_serialized_once_per_key():
+    calls = []
+    cache = ResponseCache(lambda value: json.dumps(value).encode(), max_entries=2, gzip_min_size=10)
+    producer = lambda: calls.append(1) or {"items": list(range(20))}
+    first = cache.get(('games', 1), producer)
+    assert cache.get(('games', 1), producer) is first
+    assert len(calls) == 1 and (cache.hits, cache.misses) == (1, 1)
+    assert gzip.decompress(first.gzipped) == first.body
+
+    cache.get(('games', 2), producer)
+    cache.get(('games', 3), producer)
+    cache.get(('games', 1), producer)
+    assert len(calls) == 4
+
+
+@pytest.mark.parametrize('endpoint', ENDPOINTS)
+def test_strong_etag_and_not_modified(client, endpoint):
+    plain = client.get(f'/api/{endpoint}')
+    etag = plain.headers['ETag']
+    assert plain.status_code == 200 and not etag.startswith('W/')
+
+    again = client.get(f'/api/{endpoint}', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b''
+
+    zipped = client.get(f'/api/{endpoint}', headers={'Accept-Encoding': 'gzip'})
+    if zipped.headers.get('Content-Encoding') == 'gzip':
+        assert json.loads(gzip.decompress(zipped.data)) == plain.get_json()
+        assert zipped.headers['ETag'] != etag
+        assert 'Accept-Encoding' in zipped.headers['Vary']
+    else:
+        assert zipped.data == plain.data
+
+
+def test_date_change_changes_the_games_etag(client):
+    current = client.get('/api/date').get_json()['date']
+    etag = client.get('/api/games').headers['ETag']
+    try:
+        assert client.put('/api/date', json={"date": "2034-08-30"}).status_code == 200
+        response = client.get('/api/games', headers={'If-None-Match': etag})
+        assert response.status_code == 200 and response.headers['ETag'] != etag
+        assert client.get('/api/stadiums', headers={
+            'If-None-Match': client.get('/api/stadiums').headers['ETag']}).status_code == 304
+    finally:
+        client.put('/api/date', json={"date": current})
+    assert client.get('/api/games', headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,34 @@
+from services.search_service import SearchIndex
+
+COLLECTIONS = {
+    'hotels': [
+        {"id": 1, "name": "Four Seasons Hotel Riyadh", "city": "Riyadh", "amenities": ["pool", "spa", "gym"],
+         "description": "Luxury hotel in the Kingdom Centre."},
+        {"id": 2, "name": "Hilton Jeddah", "city": "Jeddah", "amenities": ["pool", "spa"],
+         "description": "Beachfront hotel with views of the Red Sea."},
+    ],
+    'restaurants': [
+        {"id": 1, "name": "Mirage", "city": "Khobar", "cuisine": "Seafood", "description": "Fresh seafood."},
+    ],
+    'teams': [{"id": 1, "name": "Spain", "group": "D"}],
+}
+
+
+def _names(results):
+    return [(category, record['name']) for _, category, record in results]
+
+
+def test_exact_match_ranks_above_prefix_match():
+    results = _names(SearchIndex(COLLECTIONS).search("spa"))
+    assert {category for category, _ in results[:2]} == {'hotels'}
+    assert results[-1] == ('teams', 'Spain')
+
+
+def test_last_word_is_prefix_expanded():
+    assert _names(SearchIndex(COLLECTIONS).search("spai")) == [('teams', 'Spain')]
+    assert ('restaurants', 'Mirage') in _names(SearchIndex(COLLECTIONS).search("red sea"))
+    assert _names(SearchIndex(COLLECTIONS).search("seaf")) == [('restaurants', 'Mirage')]
+
+
+def test_city_filter():
+    assert _names(SearchIndex(COLLECTIONS).search("spa", city="jeddah")) == [('hotels', 'Hilton Jeddah')]
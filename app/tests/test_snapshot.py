@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from services.data_service import DataService
+from services.dataset import DATA_FILES, DataValidationError
+from services.snapshot import Snapshot, compile_snapshot, ensure_snapshot
+from tests.conftest import load_collection
+
+SIMULATED_DATE = "2034-06-20"
+
+
+@pytest.fixture
+def data_copy(data_dir, tmp_path):
+    copy = str(tmp_path / 'data')
+    shutil.copytree(data_dir, copy)
+    return copy
+
+
+def test_tables_decode_the_original_records(data_copy, tmp_path):
+    path = str(tmp_path / 'data.snapshot')
+    counts = compile_snapshot(data_copy, path)
+    snapshot = Snapshot(path)
+    for name in DATA_FILES:
+        records = load_collection(data_copy, name)
+        table = snapshot.tables[name]
+        assert counts[name] == len(table) == len(records)
+        assert list(table) == records
+        assert table[-1] == records[-1] and table[1:4] == records[1:4]
+        assert table[0] is table[0]
+        with pytest.raises(IndexError):
+            table[len(records)]
+
+
+def test_stale_snapshot_is_recompiled(data_copy, tmp_path):
+    path = str(tmp_path / 'data.snapshot')
+    first = ensure_snapshot(data_copy, path)
+    assert ensure_snapshot(data_copy, path).sources == first.sources
+
+    stadiums = load_collection(data_copy, 'stadiums')
+    stadiums[0]['name'] = 'Renamed Stadium'
+    with open(os.path.join(data_copy, DATA_FILES['stadiums']), 'w') as f:
+        json.dump(stadiums, f)
+    assert ensure_snapshot(data_copy, path).tables['stadiums'][0]['name'] == 'Renamed Stadium'
+
+
+def test_invalid_data_or_file_is_rejected(data_copy, tmp_path):
+    with open(os.path.join(data_copy, DATA_FILES['fans']), 'w') as f:
+        json.dump([{"id": 1}], f)
+    with pytest.raises(DataValidationError):
+        compile_snapshot(data_copy, str(tmp_path / 'bad.snapshot'))
+
+    not_a_snapshot = tmp_path / 'other.bin'
+    not_a_snapshot.write_bytes(b'x' * 64)
+    with pytest.raises(DataValidationError):
+        Snapshot(str(not_a_snapshot))
+
+
+def test_service_on_a_snapshot_matches_the_json_files(data_copy, tmp_path):
+    plain = DataService(SIMULATED_DATE, data_dir=data_copy)
+    mapped = DataService(SIMULATED_DATE, data_dir=data_copy, snapshot=str(tmp_path / 'data.snapshot'))
+    assert list(mapped.games) == list(plain.games)
+    for fan in plain.fans[:50]:
+        mapped_fan = mapped.get_fan_by_id(fan['id'])
+        assert mapped_fan == fan
+        assert mapped.get_fan_hotel_stays(mapped_fan) == plain.get_fan_hotel_stays(fan)
+        assert mapped.get_fan_attending_games(mapped_fan) == plain.get_fan_attending_games(fan)
+    for hotel in plain.hotels:
+        assert mapped.get_hotel_by_id(hotel['id']) == hotel
+    assert mapped.get_nearby_places('hotels', 24.7, 46.7, 5) == plain.get_nearby_places('hotels', 24.7, 46.7, 5)
+    assert mapped.search('stadium', limit=5) == plain.search('stadium', limit=5)
@@ -0,0 +1,74 @@
+import random
+
+from services.standings import Standings
+from services.timeline import GameTimeline
+from tests.conftest import load_collection
+from tests.test_timeline import all_dates
+
+
+def tally_from_scratch(games, current_date):
+    """Played, won, drawn, lost, goals for and against of every group team, counting every result up to a date"""
+    rows = {}
+    for game in games:
+        if game['stage'] != 'group':
+            continue
+        for team in (game['team_a'], game['team_b']):
+            rows.setdefault(team, [0] * 6)
+        if game['date'] > current_date or not game.get('result'):
+            continue
+        score_a, score_b = game['result']['score_a'], game['result']['score_b']
+        for team, scored, conceded in ((game['team_a'], score_a, score_b), (game['team_b'], score_b, score_a)):
+            row = rows[team]
+            row[0] += 1
+            row[1 if scored > conceded else 2 if scored == conceded else 3] += 1
+            row[4] += scored
+            row[5] += conceded
+    return rows
+
+
+def _stats(row):
+    return [row['played'], row['won'], row['drawn'], row['lost'], row['goals_for'], row['goals_against']]
+
+
+def test_tables_in_random_order_match_tables_from_scratch(data_dir):
+    games = load_collection(data_dir, 'games')
+    timeline = GameTimeline(games)
+    # Few snapshots and a random order, so tallies are derived forwards and backwards
+    standings = Standings(games, timeline, max_snapshots=3)
+    dates = all_dates(games)
+    random.Random(3).shuffle(dates)
+    for current in dates:
+        tables = standings.tables(current)
+        fresh = Standings(games, timeline).tables(current)
+        assert tables == fresh, current
+
+        expected = tally_from_scratch(games, current)
+        for group, table in tables.items():
+            assert [_stats(row) for row in table] == [expected[row['team']] for row in table]
+            assert [row['position'] for row in table] == list(range(1, len(table) + 1))
+            keys = [(row['points'], row['goal_difference'], row['goals_for']) for row in table]
+            assert keys == sorted(keys, reverse=True)
+            assert all(row['points'] == 3 * row['won'] + row['drawn'] for row in table)
+
+
+def _group_games(results):
+    return [
+        {"id": i, "date": f"2034-06-{i:02d}", "stage": "group", "group": "A", "team_a": a, "team_b": b,
+         "result": {"score_a": score_a, "score_b": score_b}}
+        for i, (a, b, score_a, score_b) in enumerate(results, start=1)
+    ]
+
+
+def test_head_to_head_breaks_ties():
+    # A and B finish level on points (4), goal difference (0) and goals (3); B beat A
+    games = _group_games([("B", "A", 1, 0), ("A", "C", 2, 1), ("A", "D", 1, 1),
+                          ("C", "B", 2, 1), ("B", "D", 1, 1), ("D", "C", 3, 0)])
+    standings = Standings(games, GameTimeline(games))
+    assert [row['team'] for row in standings.tables("2034-06-30")['A']] == ["D", "B", "A", "C"]
+
+
+def test_name_breaks_ties_level_head_to_head():
+    # Each team won one game 1-0, so the head-to-head is level too
+    games = _group_games([("B", "A", 1, 0), ("A", "C", 1, 0), ("C", "B", 1, 0)])
+    standings = Standings(games, GameTimeline(games))
+    assert [row['team'] for row in standings.tables("2034-06-30")['A']] == ["A", "B", "C"]
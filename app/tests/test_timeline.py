@@ -0,0 +1,63 @@
+import random
+from datetime import date, datetime, timedelta
+
+from services.timeline import GameTimeline
+from tests.conftest import load_collection
+
+
+def process_games_for_date(games, current_date):
+    """The linear implementation the timeline replaced (its date arithmetic simplified)"""
+    current = datetime.strptime(current_date, "%Y-%m-%d")
+    processed_games = []
+    for game in games:
+        game_copy = game.copy()
+        game_date = datetime.strptime(game['date'], "%Y-%m-%d")
+        if game['stage'] != 'group':
+            if current < game_date:
+                game_copy['team_a'] = "TBD"
+                game_copy['team_b'] = "TBD"
+                game_copy['result'] = None
+                game_copy['winner'] = None
+        elif current < game_date:
+            game_copy['result'] = None
+            game_copy['winner'] = None
+        processed_games.append(game_copy)
+    return processed_games
+
+
+def all_dates(games, margin=3):
+    first = min(date.fromisoformat(g['date']) for g in games) - timedelta(days=margin)
+    last = max(date.fromisoformat(g['date']) for g in games) + timedelta(days=margin)
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+def test_view_matches_linear_implementation_for_every_date(data_dir):
+    games = load_collection(data_dir, 'games')
+    # Few snapshots and a random order, so views are derived forwards and backwards
+    timeline = GameTimeline(games, max_snapshots=4)
+    dates = all_dates(games)
+    random.Random(1).shuffle(dates)
+    for current in dates:
+        assert timeline.view(current) == process_games_for_date(games, current), current
+
+
+def test_changed_between_lists_the_games_dated_in_between(data_dir):
+    games = load_collection(data_dir, 'games')
+    timeline = GameTimeline(games)
+    dates = all_dates(games)
+    rng = random.Random(2)
+    for _ in range(100):
+        before, after = sorted((rng.choice(dates), rng.choice(dates)))
+        old, new = timeline.view(before), timeline.view(after)
+        changed = timeline.changed_between(timeline.epoch(before), timeline.epoch(after))
+        assert sorted(changed) == [p for p, g in enumerate(games) if before < g['date'] <= after]
+        assert {p for p in range(len(games)) if old[p] != new[p]} <= set(changed)
+
+
+def test_views_do_not_modify_the_game_records(data_dir):
+    games = load_collection(data_dir, 'games')
+    original = [dict(g) for g in games]
+    timeline = GameTimeline(games)
+    for current in all_dates(games):
+        timeline.view(current)
+    assert games == original
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from services.langgraph_service import ParallelToolNode
+
+runs = []
+release = threading.Event()
+
+
+@tool
+def slow(seconds: float) -> str:
+    """Sleep, then answer"""
+    runs.append(('slow', seconds))
+    time.sleep(seconds)
+    return f"slept {seconds}"
+
+
+@tool
+def hang(name: str) -> str:
+    """Block until the test releases it"""
+    runs.append(('hang', name))
+    release.wait(5)
+    return "released"
+
+
+def _state(*calls):
+    tool_calls = [{"name": name, "args": args, "id": f"call_{i}"} for i, (name, args) in enumerate(calls)]
+    return {"messages": [HumanMessage(content="hi"), AIMessage(content="", tool_calls=tool_calls)]}
+
+
+def _run(node, *calls):
+    runs.clear()
+    started = time.monotonic()
+    messages = node(_state(*calls), {})["messages"]
+    return messages, time.monotonic() - started
+
+
+def test_calls_run_in_parallel_in_call_order():
+    node = ParallelToolNode([slow, hang], max_workers=8, timeout=5)
+    messages, elapsed = _run(node, ("slow", {"seconds": 0.3}), ("slow", {"seconds": 0.2}), ("slow", {"seconds": 0.1}))
+    assert [m.content for m in messages] == ["slept 0.3", "slept 0.2", "slept 0.1"]
+    assert [m.tool_call_id for m in messages] == ["call_0", "call_1", "call_2"]
+    assert elapsed < 0.55
+
+
+def test_duplicate_calls_run_once():
+    node = ParallelToolNode([slow, hang], timeout=5)
+    messages, _ = _run(node, ("slow", {"seconds": 0.01}), ("slow", {"seconds": 0.01}))
+    assert [m.content for m in messages] == ["slept 0.01", "slept 0.01"]
+    assert runs == [('slow', 0.01)]
+
+
+def test_timeout_is_an_error_result():
+    release.clear()
+    node = ParallelToolNode([slow, hang], timeout=0.1)
+    messages, elapsed = _run(node, ("hang", {"name": "a"}), ("slow", {"seconds": 0.01}))
+    assert messages[0].status == "error" and "timed out" in messages[0].content
+    assert messages[1].content == "slept 0.01"
+    assert elapsed < 1
+    release.set()
+
+
+def test_queue_wait_does_not_count_against_the_timeout():
+    node = ParallelToolNode([slow, hang], max_workers=1, timeout=0.35)
+    messages, _ = _run(node, ("slow", {"seconds": 0.2}), ("slow", {"seconds": 0.25}))
+    assert [m.content for m in messages] == ["slept 0.2", "slept 0.25"]
+
+
+def test_call_queued_behind_a_timed_out_one_is_cancelled():
+    release.clear()
+    node = ParallelToolNode([slow, hang], max_workers=1, timeout=0.1)
+    messages, elapsed = _run(node, ("hang", {"name": "a"}), ("hang", {"name": "b"}))
+    assert all("timed out" in m.content for m in messages)
+    assert elapsed < 1
+    release.set()
+    time.sleep(0.05)
+    assert runs == [('hang', 'a')]
+
+
+def test_unknown_tool_is_an_error_result():
+    node = ParallelToolNode([slow, hang])
+    messages, _ = _run(node, ("missing", {}))
+    assert messages[0].status == "error" and "Unknown tool" in messages[0].content
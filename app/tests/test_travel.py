@@ -0,0 +1,66 @@
+import pytest
+
+from services.geo_service import coordinates, haversine_km
+from services.travel import TravelMatrix
+from tests.conftest import load_collection
+
+CATEGORIES = ('hotels', 'stadiums', 'restaurants', 'attractions')
+
+
+@pytest.fixture
+def places(data_dir):
+    return {category: load_collection(data_dir, category) for category in CATEGORIES}
+
+
+def _located(records):
+    return [record for record in records if coordinates(record) is not None]
+
+
+def _distance(a, b):
+    return haversine_km(*coordinates(a), *coordinates(b))
+
+
+@pytest.mark.parametrize('pair', [('hotels', 'stadiums'), ('stadiums', 'hotels'), ('restaurants', 'attractions')])
+def test_trips_match_haversine(places, pair):
+    travel = TravelMatrix(places)
+    origins, destinations = _located(places[pair[0]]), _located(places[pair[1]])
+    from_ids = [origin['id'] for origin in origins for _ in destinations[:5]]
+    to_ids = [destination['id'] for _ in origins for destination in destinations[:5]]
+    by_id = {record['id']: record for record in destinations}
+    origin_by_id = {record['id']: record for record in origins}
+
+    for from_id, to_id, trip in zip(from_ids, to_ids, travel.trips(pair[0], from_ids, pair[1], to_ids)):
+        expected = _distance(origin_by_id[from_id], by_id[to_id])
+        assert trip['distance_km'] == pytest.approx(expected, abs=0.06)
+        assert trip['mode'] == ('flight' if expected >= 600 else 'drive')
+
+
+def test_unknown_places_have_no_trip(places):
+    travel = TravelMatrix(places)
+    hotel = _located(places['hotels'])[0]['id']
+    stadium = _located(places['stadiums'])[0]['id']
+    trips = travel.trips('hotels', [hotel, -1, hotel], 'stadiums', [stadium, stadium, -1])
+    assert trips[0] is not None and trips[1] is None and trips[2] is None
+
+
+def test_from_place_is_quickest_first_and_limited(places):
+    travel = TravelMatrix(places)
+    origin = _located(places['restaurants'])[0]
+    everything = travel.from_place('restaurants', origin['id'], 'hotels')
+    assert len(everything) == len(_located(places['hotels']))
+    minutes = [trip['travel_minutes'] for _, trip in everything]
+    assert minutes == sorted(minutes)
+    for record, trip in everything:
+        assert trip['distance_km'] == pytest.approx(_distance(origin, record), abs=0.06)
+
+    first = travel.from_place('restaurants', origin['id'], 'hotels', limit=3)
+    assert [record['id'] for record, _ in first] == [record['id'] for record, _ in everything[:3]]
+
+
+def test_only_eager_pairs_keep_a_full_matrix(places):
+    travel = TravelMatrix(places)
+    restaurant = _located(places['restaurants'])[0]['id']
+    attraction = _located(places['attractions'])[0]['id']
+    travel.from_place('restaurants', restaurant, 'attractions')
+    travel.trips('restaurants', [restaurant], 'attractions', [attraction])
+    assert set(travel._matrices) == {('hotels', 'stadiums')}